@@ -28,9 +28,23 @@ __author__  = 'Christoph Schueler'
 __version__ = "0.10.2"
 
 
+import importlib
 from os import path
 from pya2l.logger import Logger
-import pya2l.model as model
+
+# Submodules are imported on first attribute access (PEP 562), so ``import pya2l``
+# doesn't pay for SQLAlchemy, the mapped classes or the generated parser.
+LAZY_SUBMODULES = ("a2l_listener", "aio", "functions", "instrumentation", "model", "progress")
+
+
+def __getattr__(name):
+    if name in LAZY_SUBMODULES:
+        return importlib.import_module("{}.{}".format(__name__, name))
+    raise AttributeError("module '{}' has no attribute '{}'".format(__name__, name))
+
+
+def __dir__():
+    return sorted(set(globals()) | set(LAZY_SUBMODULES))
 
 
 class InvalidA2LDatabase(Exception):
@@ -44,7 +58,8 @@ class DB(object):
 
     logger = Logger(__name__)
 
-    def import_a2l(self, file_name, debug = False, remove_existing = False):
+    def import_a2l(self, file_name, debug = False, remove_existing = False, denormalized = False, instrumentation = None,
+            progress = None, cancel = None, include_paths = None):
         """Import `.a2l` file to `.a2ldb` database.
 
 
@@ -59,21 +74,57 @@ class DB(object):
         remove_existing: bool
             ** DANGER ZONE **: Remove existing database.
 
+        denormalized: bool
+            Store single-valued optional elements in their parents,
+            see :meth:`pya2l.model.A2LDatabase.denormalize`.
+
+        instrumentation: :class:`pya2l.instrumentation.Instrumentation` or None
+            Gets notified about every import phase, e.g. :class:`pya2l.instrumentation.Reporter`.
+
+        progress: callable or None
+            Called with :class:`pya2l.progress.Progress` reports (bytes lexed, tokens, objects),
+            at most ten times per second.
+
+        cancel: :class:`pya2l.progress.CancellationToken` or None
+            Cancelling aborts the import as soon as possible; the database is removed.
+
+        include_paths: list of str
+            Directories searched for `/include`\\d files (after the directory of the including file).
+
         Returns
         -------
         SQLAlchemy session object.
 
+        The SHA-256 of the A2L file (and its includes) is recorded as :attr:`pya2l.model.A2LDatabase.source_hash`,
+        the number of syntax errors is available as :attr:`syntax_errors`, and :attr:`source_map`
+        maps lines of the expanded text to their files.
+
+        References by name are resolved into integer columns (:meth:`pya2l.model.A2LDatabase.resolve_references`),
+        references to missing elements are logged and kept in :attr:`dangling_references`.
+        Memberships in `FUNCTION`\\s and `GROUP`\\s are indexed (:meth:`pya2l.model.A2LDatabase.index_members`).
+
         Raises
         ------
         OSError
             If database already exists.
 
+        :class:`pya2l.exceptions.ImportCancelled`
+            Import was cancelled.
+
+        :class:`pya2l.exceptions.IncludeError`
+            Included file not found.
+
         Note
         ----
         ``AML`` and ``IF_DATA`` sections are currently not processed.
         """
         from os import unlink
         from pya2l.a2l_listener import ParserWrapper, A2LListener, cut_a2ml
+        from pya2l import instrumentation as instr
+        from pya2l import progress as prog
+        from pya2l.exceptions import ImportCancelled
+        from pya2l.model import search
+        from pya2l.preprocessor import Preprocessor
 
         parser = ParserWrapper('a2l', 'a2lFile', A2LListener, debug = debug)
         self._set_path_components(file_name)
@@ -84,9 +135,47 @@ class DB(object):
                 pass
         elif path.exists(self._dbfn):
             raise OSError("file '{}' already exists.".format(self._dbfn))
-        data = open(self._a2lfn).read()
-        data, a2ml = cut_a2ml(data)
-        self.session = parser.parseFromString(data, dbname = self._dbfn)
+        instrumentation = instr.get(instrumentation)
+        monitor = prog.get(progress, cancel)
+        try:
+            with instrumentation.phase("read"):
+                source = Preprocessor(include_paths).read(self._a2lfn)
+                data = source.text
+            self.source_map = source.source_map
+            with instrumentation.phase("cut_a2ml"):
+                data, a2ml = cut_a2ml(data)
+            monitor.check()
+            self.session = parser.parseFromString(data, dbname = self._dbfn, instrumentation = instrumentation,
+                progress = monitor if monitor.active else None, source_map = source.source_map
+            )
+            self.db = parser.db
+            self.syntax_errors = parser.numberOfSyntaxErrors
+            self.db.source_hash = source.source_hash
+            monitor.check()
+            with instrumentation.phase("resolve"):
+                self.dangling_references = self.db.resolve_references()
+            for dangling in self.dangling_references:
+                self.logger.warn("%s %s: %s '%s' not found.", dangling.kind, dangling.name or "#{}".format(dangling.rid),
+                    dangling.attribute, dangling.reference
+                )
+            with instrumentation.phase("members"):
+                self.db.index_members()
+            if denormalized:
+                monitor.check()
+                with instrumentation.phase("denormalize"):
+                    self.db.denormalize()
+            monitor.check()
+            with instrumentation.phase("search_index"):
+                search.build_index(self.session)
+        except ImportCancelled:
+            if getattr(parser, "db", None) is not None:
+                parser.db.close()
+            try:
+                unlink(self._dbfn)
+            except OSError:
+                pass
+            self.db = self.session = None
+            raise
         return self.session
 
     def export_a2l(self, file_name):
@@ -95,7 +184,7 @@ class DB(object):
         self._set_path_components(file_name)
         raise NotImplementedError("Export functionality not implemented yet.")
 
-    def open_existing(self, file_name):
+    def open_existing(self, file_name, read_only = False):
         """Open an existing `.a2ldb` database.
 
         Parameters
@@ -104,6 +193,9 @@ class DB(object):
             Name of your database file, resulting from :meth:`import_a2l`.
             Extension `.a2ldb` not needed.
 
+        read_only: bool
+            Don't lock or upgrade the file, see :class:`pya2l.model.A2LDatabase`.
+
         Returns
         -------
         SQLAlchemy session object.
@@ -113,11 +205,13 @@ class DB(object):
         OSError
             If database already exists.
         """
+        from pya2l import model
+
         self._set_path_components(file_name)
         if not path.exists(self._dbfn):
             raise OSError("file '{}' does not exists.".format(self._dbfn))
         else:
-            self.db = model.A2LDatabase(self._dbfn)
+            self.db = model.A2LDatabase(self._dbfn, read_only = read_only)
             self.session = self.db.session
             res = self.session.query(model.MetaData).first()
             if res:
@@ -125,13 +219,38 @@ class DB(object):
             else:
                 raise InvalidA2LDatabase("Database seems to be corrupted. No meta-data found.")
 
+    def search(self, query, kinds = None, limit = 50):
+        """Ranked full-text search over names, long identifiers, display identifiers and annotations.
+
+        See :func:`pya2l.model.search.search`.
+
+        Returns
+        -------
+        list of :class:`pya2l.model.search.SearchResult`
+        """
+        from pya2l.model import search
+
+        return search.search(self.session, query, kinds = kinds, limit = limit)
+
+    def read_session(self):
+        """Thread-safe, read-only session of the calling thread.
+
+        Intended for services querying one database from many threads,
+        see :meth:`pya2l.model.A2LDatabase.read_session`.
+
+        Returns
+        -------
+        Context manager yielding an SQLAlchemy session object.
+        """
+        return self.db.read_session()
+
     def _set_path_components(self, file_name):
         """
         """
         self._pth, self._base = path.split(file_name)
         fbase, ext = path.splitext(self._base)
         self._dbfn = "{}.a2ldb".format(fbase)
-        if not ext or ext.lower() == ".a2l" or ext.lower() == ".a2ldb":
+        if not ext or ext.lower() == ".a2ldb":
             self._a2lfn = "{}.a2l".format(fbase)
         else:
             self._a2lfn = "{}{}".format(fbase, ext)
@@ -30,6 +30,7 @@ __version__ = '0.1.0'
 import codecs
 from decimal import Decimal as D
 import importlib
+import logging
 import os
 from pprint import pprint
 import re
@@ -39,6 +40,9 @@ import antlr4
 from antlr4.BufferedTokenStream import BufferedTokenStream
 from antlr4.error.ErrorListener import ErrorListener
 
+from pya2l import instrumentation as instr
+from pya2l import progress as prog
+from pya2l.exceptions import ImportCancelled
 from pya2l.logger import Logger
 import pya2l.model as model
 from pya2l.preprocessor import blank_out
@@ -106,12 +110,72 @@ def dump(tree, level = 0):
 
 
 class MyErrorListener(ErrorListener):
+    """
+    Parameters
+    ----------
+    source_map: :class:`pya2l.preprocessor.SourceMap` or None
+        Report locations within the original (included) files.
+    """
 
-    def __init__(self):
+    def __init__(self, source_map = None):
         super().__init__()
+        self.source_map = source_map
 
     def syntaxError(self, recognizer, offendingSymbol, line, column, msg, e):
-        print("line " + str(line) + ":" + str(column) + " " + msg, file = sys.stderr)
+        if self.source_map is not None:
+            print("{}: {}".format(self.source_map.location(line, column), msg), file = sys.stderr)
+        else:
+            print("line " + str(line) + ":" + str(column) + " " + msg, file = sys.stderr)
+
+
+class CountingWalker(antlr4.ParseTreeWalker):
+    """Walker counting the visited rule nodes (terminals are counted as tokens).
+    """
+
+    def __init__(self):
+        super(CountingWalker, self).__init__()
+        self.nodes = 0
+
+    def enterRule(self, listener, r):
+        self.nodes += 1
+        super(CountingWalker, self).enterRule(listener, r)
+
+
+PROGRESS_STEP = 1024    # Tokens / rules between two progress updates.
+
+
+class ProgressWalker(CountingWalker):
+    """Walker counting created model objects, reporting progress and checking for cancellation.
+    """
+
+    def __init__(self, monitor):
+        super(ProgressWalker, self).__init__()
+        self.monitor = monitor
+        self.objects = 0
+        self._exits = 0
+
+    def exitRule(self, listener, r):
+        super(ProgressWalker, self).exitRule(listener, r)
+        if isinstance(getattr(r, "value", None), model.Base):
+            self.objects += 1
+        self._exits += 1
+        if self._exits % PROGRESS_STEP == 0:
+            self.monitor.update("listener", objects = self.objects)
+
+
+class ParseProgress(antlr4.ParseTreeListener):
+    """Parse listener reporting consumed tokens.
+    """
+
+    def __init__(self, monitor, tokenStream):
+        self.monitor = monitor
+        self.tokenStream = tokenStream
+        self._exits = 0
+
+    def exitEveryRule(self, ctx):
+        self._exits += 1
+        if self._exits % PROGRESS_STEP == 0:
+            self.monitor.update("parse", tokens = self.tokenStream.index)
 
 
 class BaseListener(antlr4.ParseTreeListener):
@@ -119,6 +183,7 @@ class BaseListener(antlr4.ParseTreeListener):
     """
 
     value = []
+    source_map = None
 
     def __init__(self, *args, **kws):
         super(BaseListener, self).__init__(*args, **kws)
@@ -180,25 +245,29 @@ class BaseListener(antlr4.ParseTreeListener):
         ctx.value = value
 
     def _formatMessage(self, msg, location):
+        if self.source_map is not None:
+            return "[{0}] {1}".format(self.source_map.location(location.start.line, location.start.column + 1), msg)
         return "[{0}:{1}] {2}".format(location.start.line, location.start.column + 1, msg)
 
-    def _log(self, method, msg, location = None):
+    def _log(self, level, msg, location = None):
+        if not self.logger.isEnabledFor(level):
+            return
         if location:
-            method(self._formatMessage(msg, location))
+            self.logger.log(self._formatMessage(msg, location), level)
         else:
-            method(msg)
+            self.logger.log(msg, level)
 
     def info(self, msg, location = None):
-        self._log(self.logger.info, msg, location)
+        self._log(logging.INFO, msg, location)
 
     def warn(self, msg, location = None):
-        self._log(self.logger.warn, msg, location)
+        self._log(logging.WARN, msg, location)
 
     def error(self, msg, location = None):
-        self._log(self.logger.error, msg, location)
+        self._log(logging.ERROR, msg, location)
 
     def debug(self, msg, location = None):
-        self._log(self.logger.debug, msg, location)
+        self._log(logging.DEBUG, msg, location)
 
 
 class ParserWrapper(object):
@@ -219,39 +288,100 @@ class ParserWrapper(object):
         klass = getattr(module, className)
         return (module, klass, )
 
-    def parse(self, input, trace = False):
-        self.db = model.A2LDatabase(self.fnbase, debug = self.debug)
+    def parse(self, input, trace = False, instrumentation = None, progress = None, cancel = None, source_map = None):
+        """
+        Parameters
+        ----------
+        instrumentation: :class:`pya2l.instrumentation.Instrumentation` or None
+            Gets notified about the phases ``setup``, ``lex``, ``parse``, ``listener`` and ``commit``.
+
+        progress: callable or None
+            Receives :class:`pya2l.progress.Progress` reports.
+
+        cancel: :class:`pya2l.progress.CancellationToken` or None
+            Cancelling rolls back the session and raises :class:`pya2l.exceptions.ImportCancelled`.
+
+        source_map: :class:`pya2l.preprocessor.SourceMap` or None
+            `input` is preprocessed, diagnostics refer to the original files.
+        """
+        self.source_map = source_map
+        instrumentation = instr.get(instrumentation)
+        monitor = prog.get(progress, cancel)
+        with instrumentation.phase("setup"):
+            self.db = model.A2LDatabase(self.fnbase, debug = self.debug)
+        try:
+            self._parse(input, trace, instrumentation, monitor)
+        except ImportCancelled:
+            self.db.session.rollback()
+            self.db.close()
+            raise
+        return self.db.session
+
+    def _parse(self, input, trace, instrumentation, monitor):
         lexer = self.lexerClass(input)
         lexer.removeErrorListeners()
-        lexer.addErrorListener(MyErrorListener())
+        lexer.addErrorListener(MyErrorListener(self.source_map))
         tokenStream = antlr4.CommonTokenStream(lexer)
 #        tokenStream = BufferedTokenStream(lexer)
+        with instrumentation.phase("lex") as phase:
+            if monitor.active:
+                tokenStream.lazyInit()
+                monitor.update("lex", force = True, total_bytes = input.size)
+                while tokenStream.fetch(PROGRESS_STEP) == PROGRESS_STEP:
+                    monitor.update("lex", bytes_lexed = input.index, tokens = len(tokenStream.tokens))
+                monitor.update("lex", force = True, bytes_lexed = input.size, tokens = len(tokenStream.tokens))
+            else:
+                tokenStream.fill()
+            phase.tokens = len(tokenStream.tokens)
         parser = self.parserClass(tokenStream)
         parser.setTrace(trace)
         parser.removeErrorListeners()
-        parser.addErrorListener(MyErrorListener())
+        parser.addErrorListener(MyErrorListener(self.source_map))
+        if monitor.active:
+            parser.addParseListener(ParseProgress(monitor, tokenStream))
         meth = getattr(parser, self.startSymbol)
-        self._syntaxErrors = parser._syntaxErrors
-        tree = meth()
+        with instrumentation.phase("parse") as phase:
+            tree = meth()
+            phase.tokens = len(tokenStream.tokens)
+        self._syntaxErrors = parser.getNumberOfSyntaxErrors()
+        if monitor.active:
+            monitor.update("parse", force = True, tokens = len(tokenStream.tokens))
         if self.listener:
             self.listener.db = self.db
             listener = self.listener()
-            walker = antlr4.ParseTreeWalker()
-            walker.walk(listener, tree)
+            listener.source_map = self.source_map
+            with instrumentation.phase("listener") as phase:
+                if monitor.active:
+                    walker = ProgressWalker(monitor)
+                elif instrumentation.counting:
+                    walker = CountingWalker()
+                else:
+                    walker = antlr4.ParseTreeWalker()
+                walker.walk(listener, tree)
+                if instrumentation.counting:
+                    phase.nodes = walker.nodes
+            if monitor.active:
+                monitor.update("listener", force = True, objects = walker.objects)
             result = listener.value
         else:
             result = tree
-        self.db.session.commit()
-        return self.db.session
-
-    def parseFromFile(self, filename, encoding = 'latin-1', trace = False):
+        with instrumentation.phase("commit") as phase:
+            if instrumentation.counting:
+                phase.objects = len(self.db.session.new)
+            if monitor.active:
+                monitor.update("commit", force = True)
+            self.db.session.commit()
+        return result
+
+    def parseFromFile(self, filename, encoding = 'latin-1', trace = False, instrumentation = None, progress = None, cancel = None):
         pth, fname = os.path.split(filename)
         self.fnbase = os.path.splitext(fname)[0]
-        return self.parse(ParserWrapper.stringStream(filename, encoding), trace)
+        return self.parse(ParserWrapper.stringStream(filename, encoding), trace, instrumentation, progress, cancel)
 
-    def parseFromString(self, buf, encoding = 'latin-1', trace = False, dbname = ":memory:"):
+    def parseFromString(self, buf, encoding = 'latin-1', trace = False, dbname = ":memory:", instrumentation = None,
+            progress = None, cancel = None, source_map = None):
         self.fnbase = dbname
-        return self.parse(antlr4.InputStream(buf), trace)
+        return self.parse(antlr4.InputStream(buf), trace, instrumentation, progress, cancel, source_map)
 
     @staticmethod
     def stringStream(fname, encoding = 'latin-1'):
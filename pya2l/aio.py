@@ -0,0 +1,259 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Asyncio facade over :class:`pya2l.model.A2LDatabase`.
+
+SQLite (and SQLAlchemy's ORM) are blocking, so every lookup is run on a worker thread
+using the thread-local read-only sessions of :meth:`pya2l.model.A2LDatabase.read_session`;
+the event loop only awaits the result.
+
+Objects returned are detached from their session, so all their elements -- including
+nested ones like ``characteristic.record_layout.fnc_values`` -- are loaded in advance.
+
+Example
+-------
+.. code-block:: python
+
+    async with AsyncA2LDatabase.open("ASAP2_Demo_V161") as db:
+        meas = await db.measurement("ASAM.M.SCALAR.UBYTE.IDENTICAL")
+        print(hex(meas.ecu_address.address))
+"""
+
+__copyright__ = """
+   pySART - Simplified AUTOSAR-Toolkit for Python.
+
+   (C) 2010-2020 by Christoph Schueler <cpu12.gems.googlemail.com>
+
+   All Rights Reserved
+
+   This program is free software; you can redistribute it and/or modify
+   it under the terms of the GNU General Public License as published by
+   the Free Software Foundation; either version 2 of the License, or
+   (at your option) any later version.
+
+   This program is distributed in the hope that it will be useful,
+   but WITHOUT ANY WARRANTY; without even the implied warranty of
+   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+   GNU General Public License for more details.
+
+   You should have received a copy of the GNU General Public License along
+   with this program; if not, write to the Free Software Foundation, Inc.,
+   51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+
+   s. FLOSS-EXCEPTION.txt
+"""
+
+import asyncio
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+from sqlalchemy import orm
+
+import pya2l.model as model
+from pya2l.model import profiles
+
+
+CharacteristicWithLayout = namedtuple("CharacteristicWithLayout", "characteristic record_layout")
+CompuMethodWithTable = namedtuple("CompuMethodWithTable", "compu_method table")
+
+CONVERSION_TABLES = (model.CompuTab, model.CompuVtab, model.CompuVtabRange)
+
+
+def _paths(mapper, exclude = (), parents = ()):
+    """Dotted paths of all relationships below `mapper`, except the ones leading back to
+    a parent and `module`.
+    """
+    parents += (mapper, )
+    for rel in mapper.relationships:
+        if rel.key in exclude or rel.key == "module":
+            continue
+        if any(rel.mapper.isa(parent) or parent.isa(rel.mapper) for parent in parents):
+            continue
+        yield rel.key
+        for path in _paths(rel.mapper, parents = parents):
+            yield "{}.{}".format(rel.key, path)
+
+
+_LOADED = {}
+
+def _loaded(klass, *exclude, flat = False):
+    """Loader options fetching the whole element tree of `klass` (see :func:`pya2l.model.profiles.path_option`).
+
+    Elements of denormalized databases (`flat`) are already re-created on load.
+    """
+    if flat:
+        exclude += tuple(element.key for element in model.FLATTENED_ELEMENTS.get(klass, ()))
+    key = (klass, exclude)
+    if key not in _LOADED:
+        _LOADED[key] = [profiles.path_option(klass, path) for path in _paths(orm.class_mapper(klass), exclude)]
+    return _LOADED[key]
+
+
+def _by_name(session, klass, name, flat = False):
+    return session.query(klass).options(*_loaded(klass, "module", flat = flat)).filter(klass.name == name).first()
+
+
+def _conversion_table(session, name):
+    for klass in CONVERSION_TABLES:
+        table = _by_name(session, klass, name)
+        if table is not None:
+            return table
+    return None
+
+
+class AsyncA2LDatabase(object):
+    """
+    Parameters
+    ----------
+    db: :class:`pya2l.model.A2LDatabase`
+        File based database.
+
+    max_workers: int
+        Number of threads (and pooled read-only connections) executing queries.
+
+    owner: bool
+        :meth:`close` closes `db` as well; otherwise `db` stays open and only read sessions
+        created here are closed.
+    """
+
+    def __init__(self, db, max_workers = model.READ_POOL_SIZE, owner = False):
+        self.db = db
+        self._owner = owner
+        self._created_sessions = db._read_sessions is None
+        self.db.create_read_sessions(pool_size = max_workers)
+        self._flat = self.db.denormalized
+        self._executor = ThreadPoolExecutor(max_workers = max_workers, thread_name_prefix = "pya2l-aio")
+
+    @classmethod
+    def open(cls, file_name, max_workers = model.READ_POOL_SIZE):
+        """Open an existing `.a2ldb` database read-only, see :meth:`pya2l.DB.open_existing`.
+        """
+        from pya2l import DB
+
+        db = DB()
+        db.open_existing(file_name, read_only = True)
+        return cls(db.db, max_workers, owner = True)
+
+    async def run(self, func, *args, **kws):
+        """Run ``func(session, *args, **kws)`` on a worker thread.
+
+        `session` is the read-only session of the worker, don't let lazy loading
+        objects escape `func`.
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, partial(self._call, func, *args, **kws))
+
+    def _call(self, func, *args, **kws):
+        with self.db.read_session() as session:
+            return func(session, *args, **kws)
+
+    async def measurement(self, name):
+        """Get `MEASUREMENT` by name.
+
+        Returns
+        -------
+        :class:`pya2l.model.Measurement` or None
+        """
+        return await self.run(_by_name, model.Measurement, name, self._flat)
+
+    async def measurements(self, names):
+        """Get several `MEASUREMENT`\\s with a single round-trip.
+
+        Returns
+        -------
+        dict
+            name -> :class:`pya2l.model.Measurement`, unknown names are omitted.
+        """
+        def query(session, names):
+            result = {}
+            names = list(names)
+            for idx in range(0, len(names), 500):
+                chunk = names[idx : idx + 500]
+                result.update((m.name, m) for m in session.query(model.Measurement).
+                    options(*_loaded(model.Measurement, "module", flat = self._flat)).filter(model.Measurement.name.in_(chunk))
+                )
+            return result
+        return await self.run(query, names)
+
+    async def characteristic(self, name):
+        """Get `CHARACTERISTIC` together with the `RECORD_LAYOUT` referenced by `deposit`.
+
+        Returns
+        -------
+        :class:`CharacteristicWithLayout` or None
+        """
+        def query(session, name):
+            chx = _by_name(session, model.Characteristic, name, self._flat)
+            if chx is None:
+                return None
+            return CharacteristicWithLayout(chx, chx.record_layout)
+        return await self.run(query, name)
+
+    async def compu_method(self, name):
+        """Get `COMPU_METHOD` together with the conversion table it references (if any).
+
+        Returns
+        -------
+        :class:`CompuMethodWithTable` or None
+        """
+        def query(session, name):
+            cm = _by_name(session, model.CompuMethod, name)
+            if cm is None:
+                return None
+            ref = cm.compu_tab_ref or cm.status_string_ref
+            table = _conversion_table(session, ref.conversionTable) if ref else None
+            return CompuMethodWithTable(cm, table)
+        return await self.run(query, name)
+
+    async def conversion(self, name):
+        """Get a ready-to-use evaluator for the `COMPU_METHOD` named `name`.
+
+        Returns
+        -------
+        :class:`pya2l.functions.CompuMethod` or None
+        """
+        def query(session, name):
+            from pya2l import functions
+
+            cm = _by_name(session, model.CompuMethod, name)
+            return functions.CompuMethod(session, cm) if cm is not None else None
+        return await self.run(query, name)
+
+    async def close(self):
+        """Shutdown worker threads and release database connections (see `owner`).
+        """
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, partial(self._executor.shutdown, wait = True))
+        if self._owner:
+            self.db.close()
+        elif self._created_sessions:
+            self.db.close_read_sessions()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.close()
+
+
+async def import_a2l(file_name, **kws):
+    """Non-blocking variant of :meth:`pya2l.DB.import_a2l`.
+
+    The import runs on a separate thread, the event loop stays responsive.
+
+    Returns
+    -------
+    :class:`AsyncA2LDatabase`
+    """
+    from pya2l import DB
+
+    def do_import():
+        db = DB()
+        db.import_a2l(file_name, **kws)
+        db.db.session.close()
+        return db.db
+
+    loop = asyncio.get_running_loop()
+    db = await loop.run_in_executor(None, do_import)
+    return AsyncA2LDatabase(db, owner = True)
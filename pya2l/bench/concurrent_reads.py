@@ -0,0 +1,109 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Throughput of concurrent, read-only lookups (see :meth:`pya2l.model.A2LDatabase.read_session`).
+
+Usage::
+
+    python -m pya2l.bench.concurrent_reads [--measurements N] [--lookups N] [--threads 1,2,4,8]
+"""
+
+__copyright__ = """
+   pySART - Simplified AUTOSAR-Toolkit for Python.
+
+   (C) 2010-2020 by Christoph Schueler <cpu12.gems.googlemail.com>
+
+   All Rights Reserved
+
+   This program is free software; you can redistribute it and/or modify
+   it under the terms of the GNU General Public License as published by
+   the Free Software Foundation; either version 2 of the License, or
+   (at your option) any later version.
+
+   This program is distributed in the hope that it will be useful,
+   but WITHOUT ANY WARRANTY; without even the implied warranty of
+   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+   GNU General Public License for more details.
+
+   You should have received a copy of the GNU General Public License along
+   with this program; if not, write to the Free Software Foundation, Inc.,
+   51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+
+   s. FLOSS-EXCEPTION.txt
+"""
+
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+import os
+import random
+import tempfile
+import time
+
+import pya2l.model as model
+
+
+def populate(db, count):
+    """Fill `db` with `count` measurements named ``SIGNAL_<n>``.
+    """
+    session = db.session
+    for idx in range(count):
+        session.add(model.Measurement(name = "SIGNAL_{}".format(idx), longIdentifier = "Signal #{}".format(idx),
+            datatype = "UWORD", conversion = "NO_COMPU_METHOD", resolution = 0, accuracy = 0.0,
+            lowerLimit = 0.0, upperLimit = 65535.0, ecu_address = model.EcuAddress(address = 0x1000 + idx * 2))
+        )
+    session.commit()
+
+
+def lookup(db, names):
+    """Resolve `names` to ECU addresses using the read-only session of the calling thread.
+    """
+    result = 0
+    with db.read_session() as session:
+        for name in names:
+            meas = session.query(model.Measurement).filter(model.Measurement.name == name).first()
+            result += meas.ecu_address.address
+    return result
+
+
+def run(db, names, threads):
+    """Spread the lookups of `names` evenly across `threads` workers.
+
+    Returns
+    -------
+    float
+        Lookups per second.
+    """
+    chunks = [names[idx : : threads] for idx in range(threads)]
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers = threads) as executor:
+        list(executor.map(lambda chunk: lookup(db, chunk), chunks))
+    elapsed = time.perf_counter() - start
+    return len(names) / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description = __doc__.splitlines()[0])
+    parser.add_argument("--measurements", type = int, default = 20000, help = "number of measurements in database")
+    parser.add_argument("--lookups", type = int, default = 2000, help = "number of lookups per run")
+    parser.add_argument("--threads", default = "1,2,4,8", help = "comma separated list of thread counts")
+    args = parser.parse_args()
+    thread_counts = [int(t) for t in args.threads.split(",")]
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        db = model.A2LDatabase(os.path.join(tmpdir, "bench"))
+        populate(db, args.measurements)
+        db.create_read_sessions(pool_size = max(thread_counts))
+        rnd = random.Random(4711)
+        names = ["SIGNAL_{}".format(rnd.randrange(args.measurements)) for _ in range(args.lookups)]
+        run(db, names[ : 100], 1)   # Warm-up.
+        baseline = None
+        print("{:>8} {:>14} {:>8}".format("threads", "lookups/s", "speedup"))
+        for threads in thread_counts:
+            throughput = run(db, names, threads)
+            baseline = baseline or throughput
+            print("{:8d} {:14.1f} {:8.2f}".format(threads, throughput, throughput / baseline))
+        db.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,436 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Generate synthetic, standard-conformant A2L files of configurable size and mix.
+"""
+
+__copyright__ = """
+   pySART - Simplified AUTOSAR-Toolkit for Python.
+
+   (C) 2009-2020 by Christoph Schueler <cpu12.gems@googlemail.com>
+
+   All Rights Reserved
+
+   This program is free software; you can redistribute it and/or modify
+   it under the terms of the GNU General Public License as published by
+   the Free Software Foundation; either version 2 of the License, or
+   (at your option) any later version.
+
+   This program is distributed in the hope that it will be useful,
+   but WITHOUT ANY WARRANTY; without even the implied warranty of
+   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+   GNU General Public License for more details.
+
+   You should have received a copy of the GNU General Public License along
+   with this program; if not, write to the Free Software Foundation, Inc.,
+   51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+
+   s. FLOSS-EXCEPTION.txt
+"""
+
+import argparse
+import io
+import random
+import sys
+
+
+CHARACTERISTIC_TYPES = ("VALUE", "VAL_BLK", "ASCII", "CURVE", "MAP", "CUBOID")
+
+COMPU_METHOD_TYPES = ("IDENTICAL", "LINEAR", "RAT_FUNC", "TAB_INTP", "TAB_VERB", "TAB_VERB_RANGE")
+
+DATATYPES = {
+    # datatype: (lower, upper, size)
+    "UBYTE": (0, 255, 1),
+    "SBYTE": (-128, 127, 1),
+    "UWORD": (0, 65535, 2),
+    "SWORD": (-32768, 32767, 2),
+    "ULONG": (0, 4294967295, 4),
+    "SLONG": (-2147483648, 2147483647, 4),
+    "FLOAT32_IEEE": (-1e12, 1e12, 4),
+}
+
+WORDS = (
+    "air", "boost", "pressure", "engine", "speed", "torque", "fuel", "injection", "lambda", "throttle",
+    "temperature", "coolant", "intake", "exhaust", "valve", "timing", "knock", "sensor", "actual", "setpoint",
+    "filtered", "raw", "limit", "offset", "gain", "battery", "voltage", "current", "wheel", "brake",
+)
+
+
+class Config(object):
+    """Size and mix of the generated file.
+
+    Parameters
+    ----------
+    measurements: int
+
+    characteristics: int
+        Spread evenly across `characteristic_types`.
+
+    characteristic_types: tuple of str
+        Subset of :data:`CHARACTERISTIC_TYPES`.
+
+    compu_methods: int
+        Cycles through :data:`COMPU_METHOD_TYPES`; table based methods get their own
+        `COMPU_TAB`, `COMPU_VTAB` or `COMPU_VTAB_RANGE`.
+
+    table_size: int
+        Number of entries of conversion tables.
+
+    axis_pts: int
+        Common axes, used by every other `CURVE`.
+
+    record_layouts: int
+        Additional `RECORD_LAYOUT`\\s, beyond the ones referenced by characteristics.
+
+    functions: int
+        Organized as binary tree via `SUB_FUNCTION`.
+
+    groups: int
+        Organized as binary tree via `SUB_GROUP`, with one `ROOT`.
+
+    if_data: float
+        Fraction of measurements and characteristics carrying an `IF_DATA` section.
+
+    annotations: float
+        Fraction of measurements and characteristics carrying an `ANNOTATION`.
+
+    seed: int
+        Same seed and parameters, same file.
+    """
+
+    def __init__(self, measurements = 1000, characteristics = 1000, characteristic_types = CHARACTERISTIC_TYPES,
+            compu_methods = 60, table_size = 16, axis_pts = 20, record_layouts = 0, functions = 50, groups = 50,
+            if_data = 0.5, annotations = 0.1, seed = 4711):
+        unknown = set(characteristic_types) - set(CHARACTERISTIC_TYPES)
+        if unknown:
+            raise ValueError("Unknown characteristic type(s): {}".format(", ".join(sorted(unknown))))
+        self.measurements = measurements
+        self.characteristics = characteristics
+        self.characteristic_types = tuple(characteristic_types)
+        self.compu_methods = max(compu_methods, 1)
+        self.table_size = max(table_size, 2)
+        self.axis_pts = axis_pts
+        self.record_layouts = record_layouts
+        self.functions = functions
+        self.groups = groups
+        self.if_data = if_data
+        self.annotations = annotations
+        self.seed = seed
+
+    def asdict(self):
+        return dict(self.__dict__)
+
+    def __repr__(self):
+        return "{}({})".format(self.__class__.__name__, ", ".join("{} = {!r}".format(k, v) for k, v in self.asdict().items()))
+
+    __str__ = __repr__
+
+
+def compu_method_name(idx):
+    return "CM.{}.{}".format(COMPU_METHOD_TYPES[idx % len(COMPU_METHOD_TYPES)], idx)
+
+
+def measurement_name(idx):
+    return "M.SIGNAL_{}".format(idx)
+
+
+def characteristic_name(idx, type_):
+    return "C.{}_{}".format(type_, idx)
+
+
+def axis_pts_name(idx):
+    return "A.AXIS_{}".format(idx)
+
+
+class Generator(object):
+    """Writes an A2L file according to :class:`Config`, line by line.
+    """
+
+    def __init__(self, config, out):
+        self.config = config
+        self.out = out
+        self.random = random.Random(config.seed)
+        self.address = 0x10000
+        self.characteristics = []
+
+    def emit(self, level, *lines):
+        prefix = "  " * level
+        for line in lines:
+            self.out.write(prefix)
+            self.out.write(line)
+            self.out.write("\n")
+
+    def words(self, count = 4):
+        return " ".join(self.random.choice(WORDS) for _ in range(count))
+
+    def next_address(self, size):
+        address = self.address
+        self.address += (size + 3) & ~3
+        return address
+
+    def conversion(self):
+        return compu_method_name(self.random.randrange(self.config.compu_methods))
+
+    def limits(self, conversion, datatype):
+        """Limits stay inside the table range of table based conversions.
+        """
+        lower, upper, _ = DATATYPES[datatype]
+        if ".TAB_" in conversion:
+            lower, upper = 0, min(upper, self.config.table_size - 1)
+        return lower, upper
+
+    def generate(self):
+        config = self.config
+        self.emit(0, "ASAP2_VERSION 1 61", '/begin PROJECT SYNTHETIC "Synthetic benchmark project"')
+        self.emit(1, '/begin HEADER "generated by pya2l.bench.generator"', '  VERSION "seed {}"'.format(config.seed), "/end HEADER")
+        self.emit(1, '/begin MODULE SYNTHETIC ""')
+        self.mod_common()
+        self.compu_methods()
+        self.record_layouts()
+        self.measurements()
+        self.axis_pts()
+        self.characteristic_list()
+        self.functions()
+        self.groups()
+        self.emit(1, "/end MODULE")
+        self.emit(0, "/end PROJECT")
+
+    def mod_common(self):
+        self.emit(2, '/begin MOD_COMMON ""', "  DEPOSIT ABSOLUTE", "  BYTE_ORDER MSB_LAST", "  ALIGNMENT_BYTE 1",
+            "  ALIGNMENT_WORD 2", "  ALIGNMENT_LONG 4", "  ALIGNMENT_FLOAT32_IEEE 4", "/end MOD_COMMON"
+        )
+
+    def compu_methods(self):
+        size = self.config.table_size
+        for idx in range(self.config.compu_methods):
+            kind = COMPU_METHOD_TYPES[idx % len(COMPU_METHOD_TYPES)]
+            name = compu_method_name(idx)
+            self.emit(2, "/begin COMPU_METHOD {}".format(name), '  "{}"'.format(self.words()))
+            if kind == "IDENTICAL":
+                self.emit(3, 'IDENTICAL "%6.0" ""')
+            elif kind == "LINEAR":
+                self.emit(3, 'LINEAR "%8.3" "km/h"', "COEFFS_LINEAR {} {}".format(idx % 7 + 1, idx % 3))
+            elif kind == "RAT_FUNC":
+                self.emit(3, 'RAT_FUNC "%8.3" "kPa"', "COEFFS 0 {} 0 0 0 1".format(idx % 5 + 1))
+            elif kind == "TAB_INTP":
+                self.emit(3, 'TAB_INTP "%8.3" "degC"', "COMPU_TAB_REF {}.REF".format(name))
+            else:
+                self.emit(3, 'TAB_VERB "%12.0" ""', "COMPU_TAB_REF {}.REF".format(name))
+            self.emit(2, "/end COMPU_METHOD")
+            if kind == "TAB_INTP":
+                self.emit(2, "/begin COMPU_TAB {}.REF".format(name), '  ""', "  TAB_INTP", "  {}".format(size))
+                self.emit(3, *["{} {}".format(n, n * 10) for n in range(size)])
+                self.emit(3, "DEFAULT_VALUE_NUMERIC 0")
+                self.emit(2, "/end COMPU_TAB")
+            elif kind == "TAB_VERB":
+                self.emit(2, "/begin COMPU_VTAB {}.REF".format(name), '  ""', "  TAB_VERB", "  {}".format(size))
+                self.emit(3, *['{} "STATE_{}"'.format(n, n) for n in range(size)])
+                self.emit(3, 'DEFAULT_VALUE "unknown"')
+                self.emit(2, "/end COMPU_VTAB")
+            elif kind == "TAB_VERB_RANGE":
+                self.emit(2, "/begin COMPU_VTAB_RANGE {}.REF".format(name), '  ""', "  {}".format(size))
+                self.emit(3, *['{} {} "RANGE_{}"'.format(n * 2, n * 2 + 1, n) for n in range(size)])
+                self.emit(2, "/end COMPU_VTAB_RANGE")
+
+    def record_layouts(self):
+        for datatype in DATATYPES:
+            self.emit(2, "/begin RECORD_LAYOUT RL.FNC.{}".format(datatype), "  FNC_VALUES 1 {} ROW_DIR DIRECT".format(datatype),
+                "/end RECORD_LAYOUT"
+            )
+            self.emit(2, "/begin RECORD_LAYOUT RL.AXIS_PTS.{}".format(datatype), "  NO_AXIS_PTS_X 1 UBYTE",
+                "  AXIS_PTS_X 2 {} INDEX_INCR DIRECT".format(datatype), "/end RECORD_LAYOUT"
+            )
+            self.emit(2, "/begin RECORD_LAYOUT RL.CURVE.{}".format(datatype), "  NO_AXIS_PTS_X 1 UBYTE",
+                "  AXIS_PTS_X 2 {} INDEX_INCR DIRECT".format(datatype), "  FNC_VALUES 3 {} ROW_DIR DIRECT".format(datatype),
+                "/end RECORD_LAYOUT"
+            )
+            self.emit(2, "/begin RECORD_LAYOUT RL.MAP.{}".format(datatype), "  NO_AXIS_PTS_X 1 UBYTE", "  NO_AXIS_PTS_Y 2 UBYTE",
+                "  AXIS_PTS_X 3 {} INDEX_INCR DIRECT".format(datatype), "  AXIS_PTS_Y 4 {} INDEX_INCR DIRECT".format(datatype),
+                "  FNC_VALUES 5 {} COLUMN_DIR DIRECT".format(datatype), "/end RECORD_LAYOUT"
+            )
+            self.emit(2, "/begin RECORD_LAYOUT RL.CUBOID.{}".format(datatype), "  NO_AXIS_PTS_X 1 UBYTE",
+                "  NO_AXIS_PTS_Y 2 UBYTE", "  NO_AXIS_PTS_Z 3 UBYTE", "  AXIS_PTS_X 4 {} INDEX_INCR DIRECT".format(datatype),
+                "  AXIS_PTS_Y 5 {} INDEX_INCR DIRECT".format(datatype), "  AXIS_PTS_Z 6 {} INDEX_INCR DIRECT".format(datatype),
+                "  FNC_VALUES 7 {} COLUMN_DIR DIRECT".format(datatype), "/end RECORD_LAYOUT"
+            )
+        for idx in range(self.config.record_layouts):
+            datatype = self.random.choice(tuple(DATATYPES))
+            self.emit(2, "/begin RECORD_LAYOUT RL.EXTRA_{}".format(idx), "  FNC_VALUES 1 {} ROW_DIR DIRECT".format(datatype),
+                "  ALIGNMENT_BYTE 1", "/end RECORD_LAYOUT"
+            )
+
+    def optional(self, level):
+        if self.random.random() < self.config.annotations:
+            self.emit(level, "/begin ANNOTATION", '  ANNOTATION_LABEL "note"', '  ANNOTATION_ORIGIN "generator"',
+                "  /begin ANNOTATION_TEXT", '    "{}"'.format(self.words(8)), "  /end ANNOTATION_TEXT", "/end ANNOTATION"
+            )
+        if self.random.random() < self.config.if_data:
+            self.emit(level, "/begin IF_DATA XCP", "  /begin DAQ_EVENT FIXED_EVENT_LIST",
+                "    EVENT 0x{:04X}".format(self.random.randrange(16)), "  /end DAQ_EVENT", "/end IF_DATA"
+            )
+
+    def measurements(self):
+        datatypes = tuple(DATATYPES)
+        for idx in range(self.config.measurements):
+            datatype = self.random.choice(datatypes)
+            conversion = self.conversion()
+            lower, upper = self.limits(conversion, datatype)
+            name = measurement_name(idx)
+            self.emit(2, "/begin MEASUREMENT {}".format(name), '  "{}"'.format(self.words()),
+                "  {} {} 0 0 {} {}".format(datatype, conversion, lower, upper),
+                "  ECU_ADDRESS 0x{:X}".format(self.next_address(DATATYPES[datatype][2])),
+                "  DISPLAY_IDENTIFIER DI.{}".format(name.replace(".", "_")),
+            )
+            if idx % 4 == 0:
+                self.emit(3, "BYTE_ORDER MSB_FIRST", "BIT_MASK 0x{:X}".format(1 << (idx % 8)))
+            if idx % 5 == 0:
+                self.emit(3, 'FORMAT "%10.2"', 'PHYS_UNIT "rpm"')
+            self.optional(3)
+            self.emit(2, "/end MEASUREMENT")
+
+    def axis_pts(self):
+        for idx in range(self.config.axis_pts):
+            datatype = "UWORD"
+            self.emit(2, "/begin AXIS_PTS {}".format(axis_pts_name(idx)), '  "{}"'.format(self.words()),
+                "  0x{:X}".format(self.next_address(1 + 2 * 8)), "  {}".format(measurement_name(idx % max(self.config.measurements, 1))),
+                "  RL.AXIS_PTS.{}".format(datatype), "  0", "  {}".format(compu_method_name(0)), "  8", "  0 65535",
+                "  DEPOSIT ABSOLUTE", "/end AXIS_PTS"
+            )
+
+    def axis_descr(self, level, idx, common = False):
+        self.emit(level, "/begin AXIS_DESCR", "  {}".format("COM_AXIS" if common else "STD_AXIS"),
+            "  {}".format(measurement_name(self.random.randrange(max(self.config.measurements, 1)))),
+            "  {}".format(compu_method_name(0)), "  8", "  0 255"
+        )
+        if common:
+            self.emit(level + 1, "AXIS_PTS_REF {}".format(axis_pts_name(idx % self.config.axis_pts)))
+        self.emit(level, "/end AXIS_DESCR")
+
+    def characteristic_list(self):
+        types = self.config.characteristic_types
+        if not types:
+            return
+        datatypes = tuple(DATATYPES)
+        for idx in range(self.config.characteristics):
+            type_ = types[idx % len(types)]
+            datatype = "UBYTE" if type_ == "ASCII" else self.random.choice(datatypes)
+            conversion = compu_method_name(0) if type_ == "ASCII" else self.conversion()
+            lower, upper = self.limits(conversion, datatype)
+            common = type_ == "CURVE" and self.config.axis_pts and idx % 2
+            if type_ in ("VALUE", "VAL_BLK", "ASCII") or common:
+                layout = "RL.FNC.{}".format(datatype)
+            else:
+                layout = "RL.{}.{}".format(type_, datatype)
+            name = characteristic_name(idx, type_)
+            self.characteristics.append(name)
+            self.emit(2, "/begin CHARACTERISTIC {}".format(name), '  "{}"'.format(self.words()), "  {}".format(type_),
+                "  0x{:X}".format(self.next_address(64)), "  {}".format(layout), "  0", "  {}".format(conversion),
+                "  {} {}".format(lower, upper)
+            )
+            if type_ == "CURVE":
+                self.axis_descr(3, idx, common)
+            elif type_ == "MAP":
+                self.axis_descr(3, idx)
+                self.axis_descr(3, idx)
+            elif type_ == "CUBOID":
+                for _ in range(3):
+                    self.axis_descr(3, idx)
+            elif type_ == "VAL_BLK":
+                self.emit(3, "MATRIX_DIM {} {} 1".format(idx % 4 + 1, idx % 3 + 2))
+            elif type_ == "ASCII":
+                self.emit(3, "NUMBER {}".format(idx % 32 + 8))
+            self.emit(3, "EXTENDED_LIMITS {} {}".format(lower, upper), "DISPLAY_IDENTIFIER DI.{}".format(name.replace(".", "_")))
+            self.optional(3)
+            self.emit(2, "/end CHARACTERISTIC")
+
+    def name_list(self, level, keyword, names):
+        if names:
+            self.emit(level, "/begin {}".format(keyword))
+            self.emit(level + 1, *names)
+            self.emit(level, "/end {}".format(keyword))
+
+    def sample(self, names, count):
+        return sorted(self.random.sample(names, min(count, len(names))))
+
+    def functions(self):
+        count = self.config.functions
+        measurements = [measurement_name(idx) for idx in range(self.config.measurements)]
+        for idx in range(count):
+            self.emit(2, '/begin FUNCTION F.FUNCTION_{} "{}"'.format(idx, self.words()))
+            self.name_list(3, "DEF_CHARACTERISTIC", self.sample(self.characteristics, 8))
+            self.name_list(3, "IN_MEASUREMENT", self.sample(measurements, 4))
+            self.name_list(3, "OUT_MEASUREMENT", self.sample(measurements, 4))
+            self.name_list(3, "SUB_FUNCTION", ["F.FUNCTION_{}".format(c) for c in (2 * idx + 1, 2 * idx + 2) if c < count])
+            self.emit(2, "/end FUNCTION")
+
+    def groups(self):
+        count = self.config.groups
+        measurements = [measurement_name(idx) for idx in range(self.config.measurements)]
+        for idx in range(count):
+            self.emit(2, '/begin GROUP G.GROUP_{} "{}"'.format(idx, self.words()))
+            if idx == 0:
+                self.emit(3, "ROOT")
+            self.name_list(3, "REF_CHARACTERISTIC", self.sample(self.characteristics, 8))
+            self.name_list(3, "REF_MEASUREMENT", self.sample(measurements, 8))
+            self.name_list(3, "SUB_GROUP", ["G.GROUP_{}".format(c) for c in (2 * idx + 1, 2 * idx + 2) if c < count])
+            self.emit(2, "/end GROUP")
+
+
+def write(out, config = None):
+    """Write generated A2L to file-like object `out`.
+    """
+    Generator(config or Config(), out).generate()
+
+
+def generate(config = None):
+    """Generated A2L as string.
+    """
+    out = io.StringIO()
+    write(out, config)
+    return out.getvalue()
+
+
+def add_arguments(parser):
+    """Add :class:`Config` parameters to an `argparse` parser.
+    """
+    defaults = Config()
+    parser.add_argument("--measurements", type = int, default = defaults.measurements)
+    parser.add_argument("--characteristics", type = int, default = defaults.characteristics)
+    parser.add_argument("--characteristic-types", default = ",".join(defaults.characteristic_types),
+        help = "comma separated subset of {}".format(", ".join(CHARACTERISTIC_TYPES))
+    )
+    parser.add_argument("--compu-methods", type = int, default = defaults.compu_methods)
+    parser.add_argument("--table-size", type = int, default = defaults.table_size)
+    parser.add_argument("--axis-pts", type = int, default = defaults.axis_pts)
+    parser.add_argument("--record-layouts", type = int, default = defaults.record_layouts)
+    parser.add_argument("--functions", type = int, default = defaults.functions)
+    parser.add_argument("--groups", type = int, default = defaults.groups)
+    parser.add_argument("--if-data", type = float, default = defaults.if_data, help = "IF_DATA density (0..1)")
+    parser.add_argument("--annotations", type = float, default = defaults.annotations, help = "ANNOTATION density (0..1)")
+    parser.add_argument("--seed", type = int, default = defaults.seed)
+
+
+def config_from_arguments(args):
+    return Config(measurements = args.measurements, characteristics = args.characteristics,
+        characteristic_types = [t for t in args.characteristic_types.split(",") if t], compu_methods = args.compu_methods,
+        table_size = args.table_size, axis_pts = args.axis_pts, record_layouts = args.record_layouts,
+        functions = args.functions, groups = args.groups, if_data = args.if_data, annotations = args.annotations,
+        seed = args.seed
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description = __doc__.splitlines()[0])
+    parser.add_argument("output", nargs = "?", help = "A2L file to write (default: stdout)")
+    add_arguments(parser)
+    args = parser.parse_args()
+    config = config_from_arguments(args)
+    if args.output:
+        with open(args.output, "w") as out:
+            write(out, config)
+    else:
+        write(sys.stdout, config)
+
+
+if __name__ == '__main__':
+    main()
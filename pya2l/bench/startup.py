@@ -0,0 +1,102 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Startup time of common entry points, each measured in a fresh interpreter.
+"""
+
+__copyright__ = """
+   pySART - Simplified AUTOSAR-Toolkit for Python.
+
+   (C) 2009-2020 by Christoph Schueler <cpu12.gems@googlemail.com>
+
+   All Rights Reserved
+
+   This program is free software; you can redistribute it and/or modify
+   it under the terms of the GNU General Public License as published by
+   the Free Software Foundation; either version 2 of the License, or
+   (at your option) any later version.
+
+   This program is distributed in the hope that it will be useful,
+   but WITHOUT ANY WARRANTY; without even the implied warranty of
+   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+   GNU General Public License for more details.
+
+   You should have received a copy of the GNU General Public License along
+   with this program; if not, write to the Free Software Foundation, Inc.,
+   51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+
+   s. FLOSS-EXCEPTION.txt
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+
+SCENARIOS = {
+    "import pya2l": "import pya2l",
+    "import pya2l.model": "import pya2l.model",
+    "import pya2l.functions": "import pya2l.functions",
+    "open_existing": "from pya2l import DB; DB().open_existing({dbname!r})",
+}
+
+TEMPLATE = """\
+import time
+start = time.perf_counter()
+{statement}
+print(time.perf_counter() - start)
+"""
+
+
+def python(code, cwd = None):
+    """Run `code` in a fresh interpreter, which imports the same `pya2l` as we do.
+    """
+    import pya2l
+
+    env = dict(os.environ)
+    root = os.path.dirname(os.path.dirname(os.path.abspath(pya2l.__file__)))
+    env["PYTHONPATH"] = os.pathsep.join(p for p in (root, env.get("PYTHONPATH")) if p)
+    return subprocess.check_output([sys.executable, "-c", code], env = env, cwd = cwd).decode()
+
+
+def measure(statement, repeat = 5, cwd = None):
+    """Best of `repeat` fresh interpreters running `statement`, in seconds.
+    """
+    return min(float(python(TEMPLATE.format(statement = statement), cwd).split()[-1]) for _ in range(repeat))
+
+
+def loaded_modules(statement):
+    """Names of all modules loaded after running `statement` in a fresh interpreter.
+    """
+    return set(python("import sys\n{}\nprint(' '.join(sorted(sys.modules)))".format(statement)).split())
+
+
+def run(repeat = 5):
+    import pya2l.model as model
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        dbname = "startup.a2ldb"
+        model.A2LDatabase(os.path.join(tmpdir, dbname)).close()
+        return {name: measure(statement.format(dbname = dbname), repeat, tmpdir) for name, statement in SCENARIOS.items()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description = __doc__.splitlines()[0])
+    parser.add_argument("--repeat", type = int, default = 5, help = "report best of REPEAT runs")
+    parser.add_argument("--json", action = "store_true", help = "print JSON instead of a table")
+    args = parser.parse_args()
+    result = run(args.repeat)
+    if args.json:
+        json.dump(result, sys.stdout, indent = 2, sort_keys = True)
+        print()
+    else:
+        print("{:<24} {:>10}".format("scenario", "ms"))
+        for name, seconds in result.items():
+            print("{:<24} {:10.1f}".format(name, seconds * 1000.0))
+
+
+if __name__ == '__main__':
+    main()
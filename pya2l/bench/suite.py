@@ -0,0 +1,200 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Import and query benchmark on synthetic A2L files.
+"""
+
+__copyright__ = """
+   pySART - Simplified AUTOSAR-Toolkit for Python.
+
+   (C) 2009-2020 by Christoph Schueler <cpu12.gems@googlemail.com>
+
+   All Rights Reserved
+
+   This program is free software; you can redistribute it and/or modify
+   it under the terms of the GNU General Public License as published by
+   the Free Software Foundation; either version 2 of the License, or
+   (at your option) any later version.
+
+   This program is distributed in the hope that it will be useful,
+   but WITHOUT ANY WARRANTY; without even the implied warranty of
+   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+   GNU General Public License for more details.
+
+   You should have received a copy of the GNU General Public License along
+   with this program; if not, write to the Free Software Foundation, Inc.,
+   51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+
+   s. FLOSS-EXCEPTION.txt
+"""
+
+import argparse
+import datetime
+import json
+import os
+import platform
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+
+import sqlalchemy
+
+import pya2l.model as model
+from pya2l.bench import generator
+from pya2l.instrumentation import Reporter
+from pya2l.preprocessor import Preprocessor
+from pya2l.version import __version__
+
+
+IMPORT_PHASES = ("generate", "preprocess", "cut_a2ml", "setup", "lex", "parse", "listener", "commit", "resolve", "members")
+
+QUERIES = ("lookup", "profile_daq", "search")
+
+
+class Timer(object):
+    """Collects elapsed wall-clock time per phase (best of all repetitions).
+    """
+
+    def __init__(self):
+        self.results = {}
+
+    def __call__(self, phase, func, *args, **kws):
+        start = time.perf_counter()
+        result = func(*args, **kws)
+        self.add(phase, time.perf_counter() - start)
+        return result
+
+    def add(self, phase, elapsed):
+        self.results[phase] = min(elapsed, self.results.get(phase, elapsed))
+
+
+def environment():
+    return {
+        "pya2l": __version__,
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "sqlalchemy": sqlalchemy.__version__,
+        "sqlite": sqlite3.sqlite_version,
+        "platform": platform.platform(),
+        "processor": platform.processor() or platform.machine(),
+        "cpus": os.cpu_count(),
+    }
+
+
+def import_phases(timer, a2l, dbname):
+    """Run the steps of :meth:`pya2l.DB.import_a2l`, parser phases are reported by instrumentation.
+
+    Returns
+    -------
+    (:class:`pya2l.model.A2LDatabase`, int)
+        Database and number of tokens.
+    """
+    from pya2l.a2l_listener import ParserWrapper, A2LListener, cut_a2ml
+
+    timer("preprocess", Preprocessor().includes.expand, a2l)
+    data, _ = timer("cut_a2ml", cut_a2ml, a2l)
+    reporter = Reporter(trace_memory = False)
+    wrapper = ParserWrapper("a2l", "a2lFile", A2LListener)
+    wrapper.parseFromString(data, dbname = dbname, instrumentation = reporter)
+    for phase in reporter.phases:
+        timer.add(phase.name, phase.elapsed)
+    timer("resolve", wrapper.db.resolve_references)
+    timer("members", wrapper.db.index_members)
+    return wrapper.db, next(phase.tokens for phase in reporter.phases if phase.name == "lex")
+
+
+def query_workloads(timer, db, config, lookups):
+    from pya2l.model import profiles, search
+
+    session = db.session
+    rnd = random.Random(config.seed)
+    names = [generator.measurement_name(rnd.randrange(config.measurements)) for _ in range(lookups)] if config.measurements else []
+
+    def lookup():
+        for name in names:
+            session.query(model.Measurement).filter(model.Measurement.name == name).first().ecu_address.address
+
+    def profile_daq():
+        for meas in profiles.apply(session.query(model.Measurement), "daq"):
+            meas.ecu_address.address, meas.compu_method
+
+    def full_text():
+        for word in generator.WORDS:
+            search.search(session, word)
+
+    search.build_index(session)
+    timer("lookup", lookup)
+    session.expunge_all()
+    timer("profile_daq", profile_daq)
+    session.expunge_all()
+    timer("search", full_text)
+
+
+def run(config, repeat = 1, lookups = 1000, directory = None):
+    """Generate an A2L file according to `config`, import and query it.
+
+    Returns
+    -------
+    dict
+        JSON serializable results; times are seconds, best of `repeat` runs.
+    """
+    phases = Timer()
+    queries = Timer()
+    with tempfile.TemporaryDirectory(dir = directory) as tmpdir:
+        for rep in range(repeat):
+            a2l = phases("generate", generator.generate, config)
+            dbname = os.path.join(tmpdir, "bench_{}.a2ldb".format(rep))
+            db, token_count = import_phases(phases, a2l, dbname)
+            query_workloads(queries, db, config, lookups)
+            db_size = os.path.getsize(dbname)
+            db.close()
+    phases.results["total"] = sum(v for k, v in phases.results.items() if k != "generate")
+    return {
+        "timestamp": datetime.datetime.utcnow().isoformat(timespec = "seconds") + "Z",
+        "environment": environment(),
+        "config": config.asdict(),
+        "repeat": repeat,
+        "sizes": {
+            "a2l_bytes": len(a2l),
+            "tokens": token_count,
+            "db_bytes": db_size,
+        },
+        "phases": phases.results,
+        "queries": dict(queries.results, lookups = lookups),
+    }
+
+
+def print_table(result, file = sys.stdout):
+    print("{:<12} {:>10}".format("phase", "seconds"), file = file)
+    for phase in IMPORT_PHASES + ("total", ):
+        print("{:<12} {:10.3f}".format(phase, result["phases"][phase]), file = file)
+    for query in QUERIES:
+        print("{:<12} {:10.3f}".format(query, result["queries"][query]), file = file)
+    sizes = result["sizes"]
+    print("{a2l_bytes} bytes A2L, {tokens} tokens, {db_bytes} bytes database".format(**sizes), file = file)
+
+
+def main(argv = None, prog = None):
+    parser = argparse.ArgumentParser(prog = prog, description = __doc__.splitlines()[0])
+    generator.add_arguments(parser)
+    parser.add_argument("--repeat", type = int, default = 3, help = "report best of REPEAT runs")
+    parser.add_argument("--lookups", type = int, default = 1000, help = "number of by-name lookups")
+    parser.add_argument("--output", help = "append result as one JSON line to OUTPUT")
+    parser.add_argument("--json", action = "store_true", help = "print JSON instead of a table")
+    args = parser.parse_args(argv)
+    result = run(generator.config_from_arguments(args), args.repeat, args.lookups)
+    if args.output:
+        with open(args.output, "a") as out:
+            out.write(json.dumps(result, sort_keys = True))
+            out.write("\n")
+    if args.json:
+        json.dump(result, sys.stdout, indent = 2, sort_keys = True)
+        print()
+    else:
+        print_table(result)
+
+
+if __name__ == '__main__':
+    main()
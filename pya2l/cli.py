@@ -0,0 +1,750 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Command-line interface, installed as ``pya2l``.
+
+Commands
+--------
+import
+    Import A2L files into `.a2ldb` databases. Accepts shell-style wildcards
+    (``**`` descends into sub-directories) and spreads the files across a pool
+    of worker processes. Files whose content (including `/include`\\d files) didn't
+    change since the last import (same SHA-256) are skipped. Every file gets a log (``<name>.log``) with
+    warnings and syntax errors.
+
+export
+    Write all elements of one kind (e.g. ``MEASUREMENT``) of a database, as CSV, as NDJSON or -- flattened,
+    see :mod:`pya2l.model.columnar` -- as Parquet or Arrow file (requires PyArrow).
+
+info
+    Summary of a database (meta-data and number of elements).
+
+query
+    Full-text search, or lookup by exact name.
+
+validate
+    Check integrity and consistency of a database, see :mod:`pya2l.model.validation`.
+    Warnings don't fail the check.
+
+diff
+    Elements added, removed and modified from one database to another, see :mod:`pya2l.model.diff`.
+    Exit code 1 if they differ.
+
+merge
+    Merge databases into one `MODULE`, dropping identical definitions, see :mod:`pya2l.model.merge`.
+    Exit code 1 on conflicting definitions.
+
+dump
+    Write a database as NDJSON, one top-level element with all its children per line,
+    see :mod:`pya2l.model.ndjson`.
+
+load
+    Create a database from NDJSON written by ``dump``. Exit code 1 on malformed lines.
+
+serve
+    Query server keeping databases open, see :mod:`pya2l.server`.
+
+bench
+    Import and query benchmark, see :mod:`pya2l.bench.suite`.
+
+Exit codes: 0 -- success, 1 -- at least one import or check failed, 2 -- usage error
+(missing files, unknown kinds, ...).
+
+Example
+-------
+.. code-block:: shell
+
+    pya2l import -j 8 "release_42/**/*.a2l"
+    pya2l query release_42/ecu1.a2ldb "boost pressure"
+"""
+
+__copyright__ = """
+   pySART - Simplified AUTOSAR-Toolkit for Python.
+
+   (C) 2010-2020 by Christoph Schueler <cpu12.gems.googlemail.com>
+
+   All Rights Reserved
+
+   This program is free software; you can redistribute it and/or modify
+   it under the terms of the GNU General Public License as published by
+   the Free Software Foundation; either version 2 of the License, or
+   (at your option) any later version.
+
+   This program is distributed in the hope that it will be useful,
+   but WITHOUT ANY WARRANTY; without even the implied warranty of
+   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+   GNU General Public License for more details.
+
+   You should have received a copy of the GNU General Public License along
+   with this program; if not, write to the Free Software Foundation, Inc.,
+   51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+
+   s. FLOSS-EXCEPTION.txt
+"""
+
+import argparse
+from collections import namedtuple
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from contextlib import redirect_stderr
+import csv
+from functools import partial
+import glob
+import importlib.util
+import json
+import multiprocessing
+import os
+import pathlib
+import sqlite3
+import sys
+import time
+import traceback
+
+
+EXIT_OK     = 0
+EXIT_FAILED = 1
+EXIT_USAGE  = 2
+
+IMPORTED    = "imported"
+SKIPPED     = "skipped"
+FAILED      = "failed"
+CANCELLED   = "cancelled"
+
+INFO_KINDS = ("MODULE", "MEASUREMENT", "CHARACTERISTIC", "AXIS_PTS", "COMPU_METHOD", "RECORD_LAYOUT", "FUNCTION", "GROUP")
+
+ImportResult = namedtuple("ImportResult", "file_name status elapsed message")
+
+
+class UsageError(Exception):
+    """Reported as ``pya2l: error: ...``, exit code :data:`EXIT_USAGE`.
+    """
+
+
+def database_name(a2l_name):
+    from pya2l.model import DB_EXTENSION
+
+    return "{}.{}".format(os.path.splitext(a2l_name)[0], DB_EXTENSION)
+
+
+def log_name(a2l_name, log_dir = None):
+    directory, base = os.path.split(a2l_name)
+    return os.path.join(log_dir or directory, "{}.log".format(os.path.splitext(base)[0]))
+
+
+def expand(patterns):
+    """Files matching shell-style `patterns`, in order, without duplicates.
+    """
+    result = []
+    for pattern in patterns:
+        matches = sorted(glob.glob(pattern, recursive = True)) or ([pattern] if os.path.isfile(pattern) else [])
+        result.extend(m for m in matches if os.path.isfile(m))
+    return list(dict.fromkeys(os.path.abspath(f) for f in result))
+
+
+def up_to_date(a2l_name, include_paths = None):
+    """Is there a database imported from the current content of `a2l_name`?
+
+    The database is only peeked at through a read-only SQLite connection: it is neither locked nor upgraded.
+    """
+    from pya2l.preprocessor import Preprocessor
+
+    dbname = database_name(a2l_name)
+    if not os.path.exists(dbname):
+        return False
+    uri = "{}?mode=ro".format(pathlib.Path(os.path.abspath(dbname)).as_uri())
+    try:
+        conn = sqlite3.connect(uri, uri = True)
+        try:
+            row = conn.execute("SELECT source_hash FROM metadata ORDER BY rid DESC LIMIT 1").fetchone()
+        finally:
+            conn.close()
+    except sqlite3.Error:
+        return False
+    if row is None or row[0] is None:
+        return False
+    try:
+        return row[0] == Preprocessor(include_paths).read(a2l_name).source_hash
+    except Exception:
+        return False
+
+
+def import_file(a2l_name, force = False, denormalized = False, log_dir = None, include_paths = None, progress = None,
+        cancel = None):
+    """Import one file; runs in a worker process.
+
+    :meth:`pya2l.DB.import_a2l` places the database in the current directory,
+    so the worker changes to the directory of `a2l_name` for the duration of the import.
+
+    `progress` and `cancel` are passed to :meth:`pya2l.DB.import_a2l`.
+
+    Returns
+    -------
+    :class:`ImportResult`
+    """
+    from pya2l import DB
+    from pya2l.exceptions import ImportCancelled
+
+    start = time.perf_counter()
+    if cancel is not None and cancel.cancelled:
+        return ImportResult(a2l_name, CANCELLED, 0.0, "")
+    if not force and up_to_date(a2l_name, include_paths):
+        return ImportResult(a2l_name, SKIPPED, time.perf_counter() - start, "unchanged")
+    directory, base = os.path.split(a2l_name)
+    cwd = os.getcwd()
+    with open(log_name(a2l_name, log_dir), "w") as log, redirect_stderr(log):
+        os.chdir(directory)
+        try:
+            db = DB()
+            db.import_a2l(base, remove_existing = True, denormalized = denormalized, include_paths = include_paths,
+                progress = progress, cancel = cancel)
+            errors = db.syntax_errors
+            if errors:
+                db.db.source_hash = None    # Don't skip the file next time.
+            db.db.close()
+        except ImportCancelled:
+            print("cancelled", file = log)
+            return ImportResult(a2l_name, CANCELLED, time.perf_counter() - start, "")
+        except Exception as e:
+            traceback.print_exc(file = log)
+            return ImportResult(a2l_name, FAILED, time.perf_counter() - start, "{}: {}".format(e.__class__.__name__, e))
+        finally:
+            os.chdir(cwd)
+        elapsed = time.perf_counter() - start
+        if errors:
+            message = "{} syntax error(s)".format(errors)
+            print(message, file = log)
+            return ImportResult(a2l_name, FAILED, elapsed, message)
+        print("imported in {:.2f}s".format(elapsed), file = log)
+    return ImportResult(a2l_name, IMPORTED, elapsed, "")
+
+
+def _queue_progress(queue, file_name, progress):
+    queue.put((file_name, progress))
+
+
+def run_import(file_names, jobs = None, force = False, denormalized = False, log_dir = None, report = None,
+        include_paths = None, progress = None, cancel = None):
+    """Import `file_names` using `jobs` worker processes (default: number of CPUs).
+
+    Parameters
+    ----------
+    report: callable or None
+        Called with every :class:`ImportResult`, in order of completion.
+
+    include_paths: list of str
+        Absolute paths searched for `/include`\\d files.
+
+    progress: callable or None
+        Called as ``progress(file_name, progress)`` with the :class:`pya2l.progress.Progress` reports
+        of running imports, in this process.
+
+    cancel: :class:`pya2l.progress.CancellationToken` or None
+        Cancelling aborts running imports as soon as possible; these and the files not started yet
+        are :data:`CANCELLED`.
+
+    Returns
+    -------
+    list of :class:`ImportResult`
+        In order of `file_names`.
+    """
+    from pya2l.progress import DEFAULT_INTERVAL, CancellationToken
+
+    jobs = min(jobs or os.cpu_count() or 1, len(file_names))
+    results = {}
+    if jobs <= 1:
+        for file_name in file_names:
+            results[file_name] = import_file(file_name, force, denormalized, log_dir, include_paths,
+                partial(progress, file_name) if progress else None, cancel
+            )
+            if report:
+                report(results[file_name])
+        return [results[f] for f in file_names]
+    # Workers get a token and a queue shared through a manager process.
+    manager = multiprocessing.Manager() if progress or cancel else None
+    try:
+        token = CancellationToken(manager.Event()) if cancel else None
+        if cancel is not None and cancel.cancelled:
+            token.cancel()
+        queue = manager.Queue() if progress else None
+        with ProcessPoolExecutor(max_workers = jobs) as executor:
+            futures = {executor.submit(import_file, f, force, denormalized, log_dir, include_paths,
+                partial(_queue_progress, queue, f) if queue else None, token): f for f in file_names
+            }
+            pending = set(futures)
+            while pending:
+                if cancel is not None and cancel.cancelled:
+                    token.cancel()
+                    for future in pending:
+                        future.cancel()
+                done, pending = wait(pending, timeout = DEFAULT_INTERVAL if manager else None, return_when = FIRST_COMPLETED)
+                while queue is not None and not queue.empty():
+                    progress(*queue.get())
+                for future in done:
+                    file_name = futures[future]
+                    if future.cancelled():
+                        result = ImportResult(file_name, CANCELLED, 0.0, "")
+                    else:
+                        try:
+                            result = future.result()
+                        except Exception as e:
+                            result = ImportResult(file_name, FAILED, 0.0, "{}: {}".format(e.__class__.__name__, e))
+                    results[file_name] = result
+                    if report:
+                        report(result)
+    finally:
+        if manager is not None:
+            manager.shutdown()
+    return [results[f] for f in file_names]
+
+
+def open_database(file_name):
+    from pya2l.model import A2LDatabase, DB_EXTENSION
+
+    if not file_name.lower().endswith(".{}".format(DB_EXTENSION)):
+        file_name = "{}.{}".format(file_name, DB_EXTENSION)
+    if not os.path.exists(file_name):
+        raise UsageError("database '{}' does not exist.".format(file_name))
+    return A2LDatabase(file_name)
+
+
+def info(db, session = None):
+    """Meta-data and element counts of `db`, queried using `session` (default: :attr:`db.session`).
+
+    Returns
+    -------
+    dict
+    """
+    from pya2l import model
+
+    session = session or db.session
+    meta = session.query(model.MetaData).order_by(model.MetaData.rid.desc()).first()
+    return {
+        "file_name": db.dbname,
+        "file_size": os.path.getsize(db.dbname),
+        "schema_version": meta.schema_version if meta else None,
+        "created": meta.created.isoformat(sep = " ", timespec = "seconds") if meta and meta.created else None,
+        "denormalized": bool(meta and meta.denormalized),
+        "source_hash": meta.source_hash if meta else None,
+        "elements": {kind: session.query(model.KEYWORD_MAP[kind]).count() for kind in INFO_KINDS},
+    }
+
+
+def validate(db):
+    """Integrity checks.
+
+    Returns
+    -------
+    list of str
+        Problems found, empty if `db` is fine.
+    """
+    from pya2l import model
+    from sqlalchemy import text
+
+    problems = []
+    if db.session.query(model.MetaData).first() is None:
+        problems.append("no meta-data found.")
+    problems.extend("integrity: {}".format(row[0]) for row in db.session.execute(text("PRAGMA integrity_check"))
+        if row[0] != "ok"
+    )
+    problems.extend("foreign key: table '{}' row {} references missing row in '{}'.".format(*row[ : 3])
+        for row in db.session.execute(text("PRAGMA foreign_key_check"))
+    )
+    return problems
+
+
+def kind_class(kind):
+    from pya2l import model
+
+    klass = model.KEYWORD_MAP.get(kind.upper())
+    if klass is None:
+        raise UsageError("unknown kind '{}'.".format(kind))
+    return klass
+
+
+def export_csv(db, klass, out):
+    table = klass.__table__
+    writer = csv.writer(out)
+    writer.writerow(table.columns.keys())
+    writer.writerows(db.session.execute(table.select().order_by(table.c.rid)))
+
+
+def export_parquet(db, klass, out):
+    from pya2l.model import columnar
+
+    columnar.write(db, klass, out, "parquet")
+
+
+def export_arrow(db, klass, out):
+    from pya2l.model import columnar
+
+    columnar.write(db, klass, out, "arrow")
+
+
+def export_ndjson(db, klass, out):
+    from pya2l.model import ndjson
+    from pya2l.model.content import KEYWORDS
+
+    ndjson.dump(db, out, [KEYWORDS[klass]])
+
+
+EXPORTERS = {
+    "csv": export_csv,
+    "parquet": export_parquet,
+    "arrow": export_arrow,
+    "ndjson": export_ndjson,
+}
+
+# Written by PyArrow.
+BINARY_FORMATS = ("parquet", "arrow")
+
+
+def cmd_import(args):
+    file_names = expand(args.files)
+    if not file_names:
+        raise UsageError("no files matching {}.".format(", ".join(repr(p) for p in args.files)))
+    if args.log_dir:
+        os.makedirs(args.log_dir, exist_ok = True)
+
+    def report(result):
+        if not args.quiet or result.status == FAILED:
+            print("{:<8} {:8.2f}s  {}{}".format(result.status, result.elapsed, result.file_name,
+                "  ({})".format(result.message) if result.message else ""), flush = True
+            )
+
+    include_paths = [os.path.abspath(path) for path in args.include_path or ()]
+    results = run_import(file_names, args.jobs, args.force, args.denormalized, args.log_dir, report, include_paths)
+    counts = {status: sum(1 for r in results if r.status == status) for status in (IMPORTED, SKIPPED, FAILED)}
+    print("{imported} imported, {skipped} skipped, {failed} failed.".format(**counts))
+    return EXIT_FAILED if counts[FAILED] else EXIT_OK
+
+
+def cmd_export(args):
+    db = open_database(args.database)
+    try:
+        klass = kind_class(args.kind)
+        binary = args.format in BINARY_FORMATS
+        if binary:
+            if importlib.util.find_spec("pyarrow") is None:
+                raise UsageError("format '{}' requires pyarrow.".format(args.format))
+            from pya2l.model import columnar
+
+            if klass not in columnar.KINDS.values():
+                raise UsageError("format '{}' supports top-level kinds only ({}).".format(args.format,
+                    ", ".join(columnar.KINDS))
+                )
+        elif args.format == "ndjson":
+            from pya2l.model import ndjson
+
+            if klass not in ndjson.KINDS.values():
+                raise UsageError("format 'ndjson' supports top-level kinds only ({}).".format(", ".join(ndjson.KINDS)))
+        if args.output:
+            with open(args.output, "wb") if binary else open(args.output, "w", newline = "") as out:
+                EXPORTERS[args.format](db, klass, out)
+        else:
+            EXPORTERS[args.format](db, klass, sys.stdout.buffer if binary else sys.stdout)
+    finally:
+        db.close()
+    return EXIT_OK
+
+
+def cmd_info(args):
+    db = open_database(args.database)
+    try:
+        result = info(db)
+    finally:
+        db.close()
+    if args.json:
+        print(json.dumps(result, indent = 2))
+    else:
+        for key, value in result.items():
+            if key != "elements":
+                print("{:<16} {}".format(key, value))
+        for kind, count in result["elements"].items():
+            print("{:<16} {}".format(kind, count))
+    return EXIT_OK
+
+
+def cmd_query(args):
+    from pya2l.model import search
+
+    kinds = None
+    if args.kind:
+        kinds = [kind.upper() for kind in args.kind]
+        unknown = set(kinds) - set(search.KINDS)
+        if unknown:
+            raise UsageError("cannot query kind(s) {}.".format(", ".join(sorted(unknown))))
+    db = open_database(args.database)
+    try:
+        if args.name:
+            result = []
+            for source in search.SOURCES:
+                if kinds is None or source.kind in kinds:
+                    column = getattr(source.klass, source.name)
+                    result.extend(search.SearchResult(source.kind, getattr(obj, source.name), obj.rid, "", 0.0)
+                        for obj in db.session.query(source.klass).filter(column == args.text).limit(args.limit)
+                    )
+        else:
+            result = search.search(db.session, args.text, kinds = kinds, limit = args.limit)
+    finally:
+        db.close()
+    if args.json:
+        print(json.dumps([r._asdict() for r in result], indent = 2))
+    else:
+        for hit in result:
+            print("{:<16} {:<40} {}".format(hit.kind, hit.name, hit.snippet))
+    return EXIT_OK if result else EXIT_FAILED
+
+
+def cmd_validate(args):
+    from pya2l.model import validation
+
+    unknown = set(args.rule or ()) - set(validation.RULES)
+    if unknown:
+        raise UsageError("unknown rule(s) {}.".format(", ".join(sorted(unknown))))
+    db = open_database(args.database)
+    try:
+        problems = validate(db)
+        report = validation.validate(db, args.rule, args.jobs)
+    finally:
+        db.close()
+    if args.json:
+        result = report.as_dict()
+        result["integrity"] = problems
+        print(json.dumps(result, indent = 2))
+    else:
+        for problem in problems:
+            print(problem)
+        for finding in report.findings:
+            print("{}: {} '{}' (rid {}): {} [{}]".format(finding.severity, finding.kind, finding.name, finding.rid,
+                finding.message, finding.rule)
+            )
+        print("{} error(s), {} warning(s).".format(len(report.errors) + len(problems), len(report.warnings)))
+    return EXIT_FAILED if problems or not report.ok else EXIT_OK
+
+
+def cmd_diff(args):
+    from pya2l.model import diff
+
+    old = open_database(args.old)
+    try:
+        new = open_database(args.new)
+        try:
+            changes = diff.diff(old, new)
+        finally:
+            new.close()
+    finally:
+        old.close()
+    if args.json:
+        print(json.dumps(changes.as_dict(), indent = 2))
+    else:
+        for change in changes.changes:
+            print("{} {} '{}'".format(change.status, change.kind, change.name))
+            for delta in change.deltas:
+                print("    {}: {!r} -> {!r}".format(delta.path, delta.old, delta.new))
+        print(changes)
+    return EXIT_FAILED if changes else EXIT_OK
+
+
+def cmd_merge(args):
+    from pya2l.model import A2LDatabase, DB_EXTENSION, merge
+
+    output = args.output
+    if not output.lower().endswith(".{}".format(DB_EXTENSION)):
+        output = "{}.{}".format(output, DB_EXTENSION)
+    if os.path.exists(output):
+        if not args.force:
+            raise UsageError("'{}' already exists, use --force to overwrite.".format(output))
+        os.unlink(output)
+    sources = []
+    try:
+        for name in args.databases:
+            sources.append(open_database(name))
+        target = A2LDatabase(output)
+        try:
+            result = merge.merge(sources, target, args.module)
+        finally:
+            target.close()
+    finally:
+        for db in sources:
+            db.close()
+    if args.json:
+        print(json.dumps(result.as_dict(), indent = 2))
+    else:
+        for conflict in result.conflicts:
+            print("conflict: {} '{}' differs in '{}', kept definition of '{}'.".format(conflict.kind, conflict.name,
+                conflict.dropped, conflict.kept)
+            )
+        print(result)
+    return EXIT_OK if result.ok else EXIT_FAILED
+
+
+def cmd_dump(args):
+    from pya2l.model import ndjson
+
+    kinds = [kind.upper() for kind in args.kind or ()]
+    for kind in kinds:
+        if kind not in ndjson.KINDS:
+            raise UsageError("unknown kind '{}' ({}).".format(kind, ", ".join(ndjson.KINDS)))
+    db = open_database(args.database)
+    try:
+        if args.output:
+            with open(args.output, "w", encoding = "utf-8") as out:
+                count = ndjson.dump(db, out, kinds)
+        else:
+            count = ndjson.dump(db, sys.stdout, kinds)
+    finally:
+        db.close()
+    if args.output:
+        print("{} element(s) written to '{}'.".format(count, args.output))
+    return EXIT_OK
+
+
+def cmd_load(args):
+    from pya2l.model import A2LDatabase, DB_EXTENSION, ndjson
+
+    if not os.path.isfile(args.file):
+        raise UsageError("no such file '{}'.".format(args.file))
+    output = args.output
+    if not output.lower().endswith(".{}".format(DB_EXTENSION)):
+        output = "{}.{}".format(output, DB_EXTENSION)
+    if os.path.exists(output):
+        if not args.force:
+            raise UsageError("'{}' already exists, use --force to overwrite.".format(output))
+        os.unlink(output)
+    db = A2LDatabase(output)
+    try:
+        with open(args.file, encoding = "utf-8") as lines:
+            count = ndjson.load(db, lines)
+    except ValueError as e:
+        db.close()
+        os.unlink(output)
+        print("{}: {}".format(args.file, e), file = sys.stderr)
+        return EXIT_FAILED
+    db.close()
+    print("{} element(s) loaded into '{}'.".format(count, output))
+    return EXIT_OK
+
+
+def cmd_serve(args):
+    from pya2l import server
+
+    if args.socket:
+        srv = server.UnixServer(args.socket, args.capacity)
+        print("serving on {}".format(args.socket), flush = True)
+    else:
+        srv = server.Server(args.host, args.port, args.capacity)
+        print("serving on {}:{}".format(*srv.server_address[ : 2]), flush = True)
+    try:
+        srv.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        srv.server_close()
+    return EXIT_OK
+
+
+def cmd_bench(args):
+    from pya2l.bench import suite
+
+    suite.main(args.arguments, prog = "pya2l bench")
+    return EXIT_OK
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog = "pya2l", description = "A2L tools.")
+    subparsers = parser.add_subparsers(dest = "command", metavar = "command")
+    subparsers.required = True
+
+    sub = subparsers.add_parser("import", help = "import A2L files")
+    sub.add_argument("files", nargs = "+", help = "A2L files, wildcards allowed (quote them)")
+    sub.add_argument("-j", "--jobs", type = int, help = "number of worker processes (default: number of CPUs)")
+    sub.add_argument("-f", "--force", action = "store_true", help = "import unchanged files too")
+    sub.add_argument("--denormalized", action = "store_true", help = "store single-valued optional elements inline")
+    sub.add_argument("-I", "--include-path", action = "append", help = "search INCLUDE_PATH for /include'd files")
+    sub.add_argument("--log-dir", help = "directory for per-file logs (default: next to the A2L file)")
+    sub.add_argument("-q", "--quiet", action = "store_true", help = "only report failures")
+    sub.set_defaults(func = cmd_import)
+
+    sub = subparsers.add_parser("export", help = "export elements of one kind")
+    sub.add_argument("database")
+    sub.add_argument("kind", help = "A2L keyword, like MEASUREMENT")
+    sub.add_argument("--format", choices = sorted(EXPORTERS), default = "csv")
+    sub.add_argument("-o", "--output", help = "output file (default: stdout)")
+    sub.set_defaults(func = cmd_export)
+
+    sub = subparsers.add_parser("info", help = "summary of a database")
+    sub.add_argument("database")
+    sub.add_argument("--json", action = "store_true")
+    sub.set_defaults(func = cmd_info)
+
+    sub = subparsers.add_parser("query", help = "full-text search or lookup by name")
+    sub.add_argument("database")
+    sub.add_argument("text")
+    sub.add_argument("-k", "--kind", action = "append", help = "restrict to KIND (repeatable)")
+    sub.add_argument("-n", "--name", action = "store_true", help = "lookup by exact name")
+    sub.add_argument("--limit", type = int, default = 50)
+    sub.add_argument("--json", action = "store_true")
+    sub.set_defaults(func = cmd_query)
+
+    sub = subparsers.add_parser("validate", help = "check integrity and consistency of a database")
+    sub.add_argument("database")
+    sub.add_argument("-r", "--rule", action = "append", help = "only run RULE (repeatable)")
+    sub.add_argument("-j", "--jobs", type = int, help = "rules checked in parallel (default: number of CPUs)")
+    sub.add_argument("--json", action = "store_true")
+    sub.set_defaults(func = cmd_validate)
+
+    sub = subparsers.add_parser("diff", help = "changes between two databases")
+    sub.add_argument("old")
+    sub.add_argument("new")
+    sub.add_argument("--json", action = "store_true")
+    sub.set_defaults(func = cmd_diff)
+
+    sub = subparsers.add_parser("merge", help = "merge databases into one")
+    sub.add_argument("databases", nargs = "+")
+    sub.add_argument("-o", "--output", required = True, help = "merged database")
+    sub.add_argument("-m", "--module", help = "name of the merged MODULE (default: name of the first one)")
+    sub.add_argument("-f", "--force", action = "store_true", help = "overwrite OUTPUT")
+    sub.add_argument("--json", action = "store_true")
+    sub.set_defaults(func = cmd_merge)
+
+    sub = subparsers.add_parser("dump", help = "write a database as NDJSON, one element per line")
+    sub.add_argument("database")
+    sub.add_argument("-k", "--kind", action = "append", help = "only elements of KIND (repeatable)")
+    sub.add_argument("-o", "--output", help = "output file (default: stdout)")
+    sub.set_defaults(func = cmd_dump)
+
+    sub = subparsers.add_parser("load", help = "create a database from NDJSON")
+    sub.add_argument("file")
+    sub.add_argument("-o", "--output", required = True, help = "database created")
+    sub.add_argument("-f", "--force", action = "store_true", help = "overwrite OUTPUT")
+    sub.set_defaults(func = cmd_load)
+
+    sub = subparsers.add_parser("serve", help = "query server keeping databases open")
+    sub.add_argument("--host", default = "127.0.0.1")
+    sub.add_argument("--port", type = int, default = 8642)
+    sub.add_argument("--socket", help = "listen on Unix domain socket SOCKET instead of TCP")
+    sub.add_argument("--capacity", type = int, default = 8, help = "number of databases kept open")
+    sub.set_defaults(func = cmd_serve)
+
+    sub = subparsers.add_parser("bench", help = "import and query benchmark (options: pya2l bench --help)",
+        add_help = False
+    )
+    sub.set_defaults(func = cmd_bench)
+    return parser
+
+
+def main(argv = None):
+    parser = build_parser()
+    args, arguments = parser.parse_known_args(argv)
+    if args.command == "bench":
+        args.arguments = arguments
+    elif arguments:
+        parser.error("unrecognized arguments: {}".format(" ".join(arguments)))
+    try:
+        return args.func(args)
+    except UsageError as e:
+        print("pya2l: error: {}".format(e), file = sys.stderr)
+        return EXIT_USAGE
+
+
+if __name__ == '__main__':
+    sys.exit(main())
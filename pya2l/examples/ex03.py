@@ -1,9 +1,10 @@
 
 from pya2l import DB
 import pya2l.model as model
+from pya2l.model import profiles
 
 db = DB()
 session = db.open_existing("ASAP2_Demo_V161")
-measurements = session.query(model.Measurement).order_by(model.Measurement.name).all()
+measurements = profiles.apply(session.query(model.Measurement), "daq").order_by(model.Measurement.name).all()
 for m in measurements:
     print("{:48} {:12} 0x{:08x}".format(m.name, m.datatype, m.ecu_address.address))
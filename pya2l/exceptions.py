@@ -35,3 +35,16 @@ class StructuralError(Exception):
     """
 
 
+class ImportCancelled(Exception):
+    """Import was cancelled via :class:`pya2l.progress.CancellationToken`.
+    """
+
+
+class IncludeError(Exception):
+    """`/include` file not found or included recursively.
+    """
+
+
+class SchemaVersionError(Exception):
+    """Database has an outdated schema, that can't be upgraded (e.g. opened read-only).
+    """
@@ -33,11 +33,8 @@ try:
 except ImportError:
     pass
 
-try:
-    from scipy.interpolate import RegularGridInterpolator
-    from scipy import interpolate
-except ImportError:
-    pass
+# SciPy takes considerable time to import and is only needed for interpolation,
+# so it's imported on first use.
 
 from pya2l import exceptions
 from pya2l import model
@@ -60,6 +57,8 @@ class Interpolate1D:
               corresponding to the highest X value.
     """
     def __init__(self, xs, ys, saturate = True):
+        from scipy import interpolate
+
         if any(x1 -x0 <= 0 for x0, x1 in zip(xs, xs[1 : ])):
             raise ValueError("'xs' must be in strictly increasing order.")
         self.min_x = min(xs)
@@ -164,6 +163,8 @@ class NormalizationAxes:
     """
 
     def __init__(self, x_norm, y_norm, z_map):
+        from scipy.interpolate import RegularGridInterpolator
+
         self.xn = np.array(x_norm)
         self.yn = np.array(y_norm)
         self.zm = np.array(z_map)
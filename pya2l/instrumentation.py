@@ -0,0 +1,249 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Per-phase timing and memory instrumentation of imports.
+
+:meth:`pya2l.DB.import_a2l` and :meth:`pya2l.a2l_listener.ParserWrapper.parse` accept an
+`instrumentation` object and run every phase (``read``, ``cut_a2ml``, ``lex``, ``parse``,
+``listener``, ``commit``, ...) inside :meth:`Instrumentation.phase`.
+
+Example
+-------
+.. code-block:: python
+
+    from pya2l import DB
+    from pya2l.instrumentation import Reporter
+
+    with Reporter(trace_memory = True) as reporter:     # Stops memory tracing when done.
+        DB().import_a2l("ASAP2_Demo_V161.a2l", instrumentation = reporter)
+    reporter.print_table()
+"""
+
+__copyright__ = """
+   pySART - Simplified AUTOSAR-Toolkit for Python.
+
+   (C) 2010-2020 by Christoph Schueler <cpu12.gems.googlemail.com>
+
+   All Rights Reserved
+
+   This program is free software; you can redistribute it and/or modify
+   it under the terms of the GNU General Public License as published by
+   the Free Software Foundation; either version 2 of the License, or
+   (at your option) any later version.
+
+   This program is distributed in the hope that it will be useful,
+   but WITHOUT ANY WARRANTY; without even the implied warranty of
+   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+   GNU General Public License for more details.
+
+   You should have received a copy of the GNU General Public License along
+   with this program; if not, write to the Free Software Foundation, Inc.,
+   51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+
+   s. FLOSS-EXCEPTION.txt
+"""
+__author__  = 'Christoph Schueler'
+__version__ = '0.1.0'
+
+
+from contextlib import contextmanager
+import json
+import sys
+import time
+import tracemalloc
+
+
+class Phase(object):
+    """Measurements of one phase.
+
+    Attributes
+    ----------
+    name: str
+
+    elapsed: float
+        Wall-clock time in seconds.
+
+    memory_peak: int or None
+        Peak of traced memory in bytes, if memory is traced.
+
+    tokens: int or None
+        Number of tokens (lexer and parser phases).
+
+    nodes: int or None
+        Number of parse-tree rule nodes (listener phase).
+
+    objects: int or None
+        Number of model objects (commit phase).
+    """
+
+    __slots__ = ("name", "elapsed", "memory_peak", "tokens", "nodes", "objects")
+
+    def __init__(self, name):
+        self.name = name
+        self.elapsed = None
+        self.memory_peak = None
+        self.tokens = None
+        self.nodes = None
+        self.objects = None
+
+    def asdict(self):
+        return {k: getattr(self, k) for k in self.__slots__}
+
+    def __repr__(self):
+        return "{}({})".format(self.__class__.__name__, ", ".join("{} = {!r}".format(k, getattr(self, k)) for k in self.__slots__))
+
+    __str__ = __repr__
+
+
+class Instrumentation(object):
+    """Base class, does nothing but timing.
+
+    Override :meth:`phase_started` and :meth:`phase_stopped` to get notified.
+
+    Parameters
+    ----------
+    trace_memory: bool
+        Record peak memory per phase using :mod:`tracemalloc` (noticeably slows down the import).
+        Tracing is started by the first phase and runs until :meth:`close` (or the end of the
+        ``with`` block).
+    """
+
+    def __init__(self, trace_memory = False):
+        self.trace_memory = trace_memory
+        self._started_tracing = False
+
+    def phase_started(self, phase):
+        pass
+
+    def phase_stopped(self, phase):
+        pass
+
+    @property
+    def counting(self):
+        """Are token and node counts requested?
+
+        Counting nodes requires an additional callback per parse-tree node.
+        """
+        return True
+
+    @contextmanager
+    def phase(self, name):
+        """Run the body of the ``with`` statement as phase `name`.
+
+        Yields
+        ------
+        :class:`Phase`
+            Code under measurement may fill in the counters.
+        """
+        phase = Phase(name)
+        if self.trace_memory:
+            self._reset_peak()
+        self.phase_started(phase)
+        start = time.perf_counter()
+        try:
+            yield phase
+        finally:
+            phase.elapsed = time.perf_counter() - start
+            if self.trace_memory:
+                phase.memory_peak = tracemalloc.get_traced_memory()[1]
+            self.phase_stopped(phase)
+
+    def _reset_peak(self):
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracing = True
+        elif hasattr(tracemalloc, "reset_peak"):
+            tracemalloc.reset_peak()
+        else:
+            tracemalloc.clear_traces()
+
+    def close(self):
+        """Stop memory tracing, if started by us.
+        """
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+class Callback(Instrumentation):
+    """Forward phase events to a callable.
+
+    Parameters
+    ----------
+    callback: callable
+        Called as ``callback(event, phase)``, `event` is either ``"start"`` or ``"stop"``.
+    """
+
+    def __init__(self, callback, trace_memory = False):
+        super(Callback, self).__init__(trace_memory)
+        self.callback = callback
+
+    def phase_started(self, phase):
+        self.callback("start", phase)
+
+    def phase_stopped(self, phase):
+        self.callback("stop", phase)
+
+
+class Reporter(Instrumentation):
+    """Collect phases and report them as table or JSON.
+    """
+
+    def __init__(self, trace_memory = False):
+        super(Reporter, self).__init__(trace_memory)
+        self.phases = []
+
+    def phase_stopped(self, phase):
+        self.phases.append(phase)
+
+    @property
+    def total(self):
+        return sum(phase.elapsed for phase in self.phases)
+
+    def asdict(self):
+        return {"phases": [phase.asdict() for phase in self.phases], "total": self.total}
+
+    def json(self, **kws):
+        return json.dumps(self.asdict(), **kws)
+
+    def print_table(self, file = None):
+        if file is None:
+            file = sys.stdout   # The current one, it may have been redirected since import.
+        fmt = "{:<14} {:>10} {:>12} {:>10} {:>10} {:>10}"
+        print(fmt.format("phase", "seconds", "peak MiB", "tokens", "nodes", "objects"), file = file)
+        for phase in self.phases:
+            print(fmt.format(
+                phase.name,
+                "{:.3f}".format(phase.elapsed),
+                "{:.1f}".format(phase.memory_peak / (1024 * 1024)) if phase.memory_peak is not None else "-",
+                *("-" if value is None else value for value in (phase.tokens, phase.nodes, phase.objects))
+            ), file = file)
+        print(fmt.format("total", "{:.3f}".format(self.total), "", "", "", ""), file = file)
+
+
+class NullInstrumentation(Instrumentation):
+    """Used if no instrumentation is requested; skips counting.
+    """
+
+    @property
+    def counting(self):
+        return False
+
+    @contextmanager
+    def phase(self, name):
+        yield Phase(name)
+
+
+NULL_INSTRUMENTATION = NullInstrumentation()
+
+
+def get(instrumentation):
+    """`instrumentation` or a shared no-op instance.
+    """
+    return NULL_INSTRUMENTATION if instrumentation is None else instrumentation
@@ -29,51 +29,83 @@ __version__ = '0.1.0'
 
 import logging
 import os
+import sys
 
 #logging.basicConfig()
 
+class StderrHandler(logging.StreamHandler):
+    """Writes to the *current* :data:`sys.stderr`.
+
+    Redirecting `sys.stderr` (like the per-file logs of ``pya2l import``) also redirects log output.
+    """
+
+    def __init__(self, level = logging.NOTSET):
+        logging.Handler.__init__(self, level)
+
+    @property
+    def stream(self):
+        return sys.stderr
+
+
 class Logger(object):
+    """Thin wrapper around a :class:`logging.Logger` named ``pya2l.<name>``.
+
+    Creating many instances with the same `name` is cheap: the handler is only
+    installed once, and messages are formatted lazily, i.e. only if `level` is enabled.
+    """
 
     LOGGER_BASE_NAME = 'pya2l'
     FORMAT = "[%(levelname)s (%(name)s)]: %(message)s"
 
-    def __init__(self, name, level=logging.WARN):
+    def __init__(self, name, level = None):
         self.logger = logging.getLogger(
             "{0}.{1}".format(self.LOGGER_BASE_NAME, name))
-        self.logger.setLevel(level)
-        handler = logging.StreamHandler()
-        handler.setLevel(level)
-        formatter = logging.Formatter(self.FORMAT)
-        handler.setFormatter(formatter)
-        self.logger.addHandler(handler)
+        if not any(isinstance(h, StderrHandler) for h in self.logger.handlers):
+            handler = StderrHandler()
+            formatter = logging.Formatter(self.FORMAT)
+            handler.setFormatter(formatter)
+            self.logger.addHandler(handler)
+            self.logger.setLevel(logging.WARN if level is None else level)
+        elif level is not None:
+            self.logger.setLevel(level)
         self.lastMessage = None
         self.lastSeverity = None
+        self._lastArgs = ()
 
     def getLastError(self):
-        result = (self.lastSeverity, self.lastMessage)
+        message = self.lastMessage
+        if message is not None and self._lastArgs:
+            message = message % self._lastArgs
+        result = (self.lastSeverity, message)
         self.lastSeverity = self.lastMessage = None
+        self._lastArgs = ()
         return result
 
-    def log(self, message, level):
+    def isEnabledFor(self, level):
+        return self.logger.isEnabledFor(level)
+
+    def log(self, message, level, *args):
+        """Log `message` % `args`; formatting is deferred until a handler emits the record.
+        """
         self.lastSeverity = level
         self.lastMessage = message
-        self.logger.log(level, "{0}".format(message))
-        # print("{0}{1}".format(level, message))
+        self._lastArgs = args
+        self.logger.log(level, message, *args)
 
-    def info(self, message):
-        self.log(message, logging.INFO)
+    def info(self, message, *args):
+        self.log(message, logging.INFO, *args)
 
-    def warn(self, message):
-        self.log(message, logging.WARN)
+    def warn(self, message, *args):
+        self.log(message, logging.WARN, *args)
 
-    def debug(self, message):
-        self.log(message, logging.DEBUG)
+    def debug(self, message, *args):
+        self.log(message, logging.DEBUG, *args)
 
-    def error(self, message):
-        self.log(message, logging.ERROR)
+    def error(self, message, *args):
+        self.log(message, logging.ERROR, *args)
 
-    def critical(self, message):
-        self.log(message, logging.CRITICAL)
+    def critical(self, message, *args):
+        self.log(message, logging.CRITICAL, *args)
 
     def verbose(self):
         self.logger.setLevel(logging.DEBUG)
@@ -25,33 +25,41 @@ __copyright__="""
 
   """
 
+from collections import namedtuple, OrderedDict
+from contextlib import contextmanager
 import datetime
 from functools import partial
 import mmap
+import os
+import pathlib
 import re
 import sqlite3
 
-from sqlalchemy import (MetaData, schema, types, orm, event,
+from sqlalchemy import (MetaData, schema, types, orm, event, pool, exc,
     create_engine, Column, ForeignKey, ForeignKeyConstraint, func,
     PassiveDefault, UniqueConstraint, CheckConstraint
 )
+from sqlalchemy.dialects import sqlite
 from sqlalchemy.ext.declarative import declared_attr, as_declarative
 from sqlalchemy.ext.associationproxy import association_proxy
 from sqlalchemy.ext.orderinglist import ordering_list
 from sqlalchemy.orm import relationship, backref
 from sqlalchemy.engine import Engine
-from sqlalchemy.sql import exists
+from sqlalchemy.sql import exists, select, and_, literal, text, union_all
 
+from pya2l import exceptions
 from pya2l.utils import SingletonBase
 from pya2l.model import mixins
 
 DB_EXTENSION    = "a2ldb"
 
-CURRENT_SCHEMA_VERSION = 10
+CURRENT_SCHEMA_VERSION = 15
 
 CACHE_SIZE      = 4 # MB
 PAGE_SIZE       = mmap.PAGESIZE
 
+READ_POOL_SIZE  = 8
+
 
 class MULTIPLE(SingletonBase): pass
 class Uint(SingletonBase): pass
@@ -139,6 +147,14 @@ def regexer(expr, value):
     return re.match(expr, value, re.UNICODE) is not None
 
 
+class ReadOnlyConnection(sqlite3.Connection):
+    """Connections handed out by :meth:`A2LDatabase.read_session`.
+
+    Only used as a marker, so the connect-hook knows not to grab
+    an exclusive lock on the database file.
+    """
+
+
 @event.listens_for(Engine, "connect")
 def set_sqlite3_pragmas(dbapi_connection, connection_record):
     dbapi_connection.create_function("REGEXP", 2, regexer)
@@ -147,8 +163,12 @@ def set_sqlite3_pragmas(dbapi_connection, connection_record):
     cursor.execute("PRAGMA FOREIGN_KEYS=ON")
     cursor.execute("PRAGMA PAGE_SIZE={}".format(PAGE_SIZE))
     cursor.execute("PRAGMA CACHE_SIZE={}".format(calculateCacheSize(CACHE_SIZE * 1024 * 1024)))
-    cursor.execute("PRAGMA SYNCHRONOUS=OFF") # FULL
-    cursor.execute("PRAGMA LOCKING_MODE=EXCLUSIVE") # NORMAL
+    if isinstance(dbapi_connection, ReadOnlyConnection):
+        cursor.execute("PRAGMA QUERY_ONLY=ON")
+        cursor.execute("PRAGMA LOCKING_MODE=NORMAL") # Readers must not block each other.
+    else:
+        cursor.execute("PRAGMA SYNCHRONOUS=OFF") # FULL
+        cursor.execute("PRAGMA LOCKING_MODE=EXCLUSIVE") # NORMAL
     cursor.execute("PRAGMA TEMP_STORE=MEMORY")  # FILE
     cursor.close()
 
@@ -176,26 +196,22 @@ def StdFloat(default = 0.0):
 
 def StdShort(default = 0, primary_key = False, unique = False):
     return Column(types.Integer, default = default, nullable = False,
-        primary_key = primary_key, unique = unique,
-        #CheckClause('BETWEEN (-32768, 32767)')
+        primary_key = primary_key, unique = unique, info = {"range": (-32768, 32767)}
     )
 
 def StdUShort(default = 0, primary_key = False, unique = False):
     return Column(types.Integer, default = default, nullable = False,
-        primary_key = primary_key, unique = unique,
-        #CheckClause('BETWEEN (0, 65535)')
+        primary_key = primary_key, unique = unique, info = {"range": (0, 65535)}
     )
 
 def StdLong(default = 0, primary_key = False, unique = False):
     return Column(types.Integer, default = default, nullable = False,
-        primary_key = primary_key, unique = unique,
-        #CheckClause('BETWEEN (-2147483648, 2147483647)')
+        primary_key = primary_key, unique = unique, info = {"range": (-2147483648, 2147483647)}
     )
 
 def StdULong(default = 0, primary_key = False, unique = False):
     return Column(types.Integer, default = default, nullable = False,
-        primary_key = primary_key, unique = unique,
-        #CheckClause('BETWEEN (0, 4294967295)')
+        primary_key = primary_key, unique = unique, info = {"range": (0, 4294967295)}
     )
 
 def StdString(default = 0, primary_key = False, unique = False):
@@ -203,11 +219,26 @@ def StdString(default = 0, primary_key = False, unique = False):
         primary_key = primary_key, unique = unique,
     )
 
-def StdIdent(default = 0, primary_key = False, unique = False):
+def StdIdent(default = 0, primary_key = False, unique = False, index = False):
     return Column(types.VARCHAR(1025), default = default, nullable = False,
-        primary_key = primary_key, unique = unique,
+        primary_key = primary_key, unique = unique, index = index,
     )
 
+def FlatColumn(type_):
+    """Single-valued optional element stored in its parent (see :meth:`A2LDatabase.denormalize`).
+    """
+    return Column(type_, default = None, nullable = True)
+
+def RefColumn(tablename):
+    """`rid` of the `tablename` element referenced by name (see :meth:`A2LDatabase.resolve_references`).
+
+    Derived from the name, so there is no foreign key constraint (which would also make
+    the parent/child relationships of the model ambiguous).
+    """
+    column = Column(types.Integer, default = None, nullable = True, index = True)
+    column.info["references"] = tablename
+    return column
+
 
 class DefCharacteristicIdentifiers(Base):
 
@@ -499,6 +530,22 @@ class MetaData(Base):
 
     schema_version = StdShort()
     created = Column(types.DateTime, default = datetime.datetime.now)
+    denormalized = Column(types.Boolean, default = False)
+    source_hash = Column(types.Unicode(64))   # SHA-256 of the imported A2L file.
+    references_resolved = Column(types.Boolean, default = False)
+    members_indexed = Column(types.Boolean, default = False)
+
+class Membership(Base):
+    """Reverse index of identifier lists: `name` is listed in the `role` list (e.g. `REF_MEASUREMENT`)
+    of the `FUNCTION` or `GROUP` `container_rid`; `element_rid` is the list itself.
+
+    Maintained by :meth:`A2LDatabase.index_members`.
+    """
+    name = StdIdent(index = True)
+    role = StdString()
+    container_kind = StdString()
+    container_rid = Column(types.Integer, nullable = False, index = True)
+    element_rid = Column(types.Integer, nullable = False, index = True)
 
 class AlignmentByte(Base):
     """
@@ -1225,6 +1272,7 @@ class RefUnit(Base):
     __tablename__ = "ref_unit"
 
     unit = StdIdent()
+    unit_rid = RefColumn("unit")
 
     __required_parameters__ = (
         Parameter("unit", Ident, False),
@@ -1482,7 +1530,7 @@ class AxisPts(Base, HasAnnotations, HasByteOrders, HasCalibrationAccess, HasDepo
     """
     __tablename__ = "axis_pts"
 
-    name = StdIdent()
+    name = StdIdent(index = True)
 
     longIdentifier = StdString()
 
@@ -1534,6 +1582,20 @@ class AxisPts(Base, HasAnnotations, HasByteOrders, HasCalibrationAccess, HasDepo
         Element("StepSize", "STEP_SIZE", False),
         Element("SymbolLink", "SYMBOL_LINK", False),
     )
+    flat_byte_order = FlatColumn(types.VARCHAR(256))
+    flat_display_identifier = FlatColumn(types.VARCHAR(1025))
+    flat_ecu_address_extension = FlatColumn(types.Integer)
+    flat_format = FlatColumn(types.VARCHAR(256))
+    flat_phys_unit = FlatColumn(types.VARCHAR(256))
+
+    conversion_rid = RefColumn("compu_method")
+    deposit_rid = RefColumn("record_layout")
+    input_quantity_rid = RefColumn("measurement")
+
+    compu_method = relationship("CompuMethod", primaryjoin = "foreign(AxisPts.conversion) == CompuMethod.name",
+        viewonly = True, uselist = False)
+    record_layout = relationship("RecordLayout", primaryjoin = "foreign(AxisPts.deposit) == RecordLayout.name",
+        viewonly = True, uselist = False)
     _module_rid = Column(types.Integer, ForeignKey("module.rid"))
     module = relationship("Module", back_populates = "axis_pts", uselist = True)
 
@@ -1543,7 +1605,7 @@ class Characteristic(Base, HasAnnotations, HasBitMasks, HasByteOrders, HasCalibr
     """
     __tablename__ = "characteristic"
 
-    name = StdIdent()
+    name = StdIdent(index = True)
 
     longIdentifier = StdString()
 
@@ -1606,6 +1668,20 @@ class Characteristic(Base, HasAnnotations, HasBitMasks, HasByteOrders, HasCalibr
     map_list = relationship("MapList", back_populates = "characteristic", uselist = False)
     number = relationship("Number", back_populates = "characteristic", uselist = False)
     virtual_characteristic = relationship("VirtualCharacteristic", back_populates = "characteristic", uselist = False)
+    flat_bit_mask = FlatColumn(types.Integer)
+    flat_byte_order = FlatColumn(types.VARCHAR(256))
+    flat_display_identifier = FlatColumn(types.VARCHAR(1025))
+    flat_ecu_address_extension = FlatColumn(types.Integer)
+    flat_format = FlatColumn(types.VARCHAR(256))
+    flat_phys_unit = FlatColumn(types.VARCHAR(256))
+
+    conversion_rid = RefColumn("compu_method")
+    deposit_rid = RefColumn("record_layout")
+
+    compu_method = relationship("CompuMethod", primaryjoin = "foreign(Characteristic.conversion) == CompuMethod.name",
+        viewonly = True, uselist = False)
+    record_layout = relationship("RecordLayout", primaryjoin = "foreign(Characteristic.deposit) == RecordLayout.name",
+        viewonly = True, uselist = False)
     _module_rid = Column(types.Integer, ForeignKey("module.rid"))
     module = relationship("Module", back_populates = "characteristic", uselist = True)
 
@@ -1659,6 +1735,11 @@ class AxisDescr(Base, mixins.AxisDescrMixIn, HasAnnotations, HasByteOrders, HasD
     fix_axis_par_dist = relationship("FixAxisParDist", back_populates = "axis_descr", uselist = False)
     fix_axis_par_list = relationship("FixAxisParList", back_populates = "axis_descr", uselist = False)
     max_grad = relationship("MaxGrad", back_populates = "axis_descr", uselist = False)
+    conversion_rid = RefColumn("compu_method")
+    input_quantity_rid = RefColumn("measurement")
+
+    compu_method = relationship("CompuMethod", primaryjoin = "foreign(AxisDescr.conversion) == CompuMethod.name",
+        viewonly = True, uselist = False)
     _characteristic_rid = Column(types.Integer, ForeignKey("characteristic.rid"))
     characteristic = relationship("Characteristic", back_populates = "axis_descr", uselist = True)
 
@@ -1669,6 +1750,7 @@ class AxisPtsRef(Base):
     __tablename__ = "axis_pts_ref"
 
     axisPoints = StdIdent()
+    axis_points_rid = RefColumn("axis_pts")
 
     __required_parameters__ = (
         Parameter("axisPoints", Ident, False),
@@ -1863,7 +1945,7 @@ class CompuMethod(Base, HasRefUnits):
     """
     __tablename__ = "compu_method"
 
-    name = StdIdent()
+    name = StdIdent(index = True)
 
     longIdentifier = StdString()
 
@@ -1954,6 +2036,9 @@ class CompuTabRef(Base):
     __tablename__ = "compu_tab_ref"
 
     conversionTable = StdIdent()
+    compu_tab_rid = RefColumn("compu_tab")
+    compu_vtab_rid = RefColumn("compu_vtab")
+    compu_vtab_range_rid = RefColumn("compu_vtab_range")
 
     __required_parameters__ = (
         Parameter("conversionTable", Ident, False),
@@ -2005,6 +2090,9 @@ class StatusStringRef(Base):
     __tablename__ = "status_string_ref"
 
     conversionTable = StdIdent()
+    compu_tab_rid = RefColumn("compu_tab")
+    compu_vtab_rid = RefColumn("compu_vtab")
+    compu_vtab_range_rid = RefColumn("compu_vtab_range")
 
     __required_parameters__ = (
         Parameter("conversionTable", Ident, False),
@@ -2020,7 +2108,7 @@ class CompuTab(Base, HasDefaultValues):
     """
     __tablename__ = "compu_tab"
 
-    name = StdIdent()
+    name = StdIdent(index = True)
 
     longIdentifier = StdString()
 
@@ -2066,7 +2154,7 @@ class CompuVtab(Base, HasDefaultValues):
     """
     __tablename__ = "compu_vtab"
 
-    name = StdIdent()
+    name = StdIdent(index = True)
 
     longIdentifier = StdString()
 
@@ -2094,7 +2182,7 @@ class CompuVtabRange(Base, HasDefaultValues):
     """
     __tablename__ = "compu_vtab_range"
 
-    name = StdIdent()
+    name = StdIdent(index = True)
 
     longIdentifier = StdString()
 
@@ -2165,7 +2253,7 @@ class Function(Base, HasAnnotations, HasIfDatas, HasRefCharacteristics):
     """
     __tablename__ = "function"
 
-    name = StdIdent()
+    name = StdIdent(index = True)
 
     longIdentifier = StdString()
 
@@ -2301,7 +2389,7 @@ class Group(Base, HasAnnotations, HasFunctionLists, HasIfDatas, HasRefCharacteri
     """
     __tablename__ = "group"
 
-    groupName = StdIdent()
+    groupName = StdIdent(index = True)
 
     groupLongIdentifier = StdString()
 
@@ -2377,7 +2465,7 @@ class Measurement(Base, HasAnnotations, HasBitMasks, HasByteOrders, HasDiscretes
     """
     __tablename__ = "measurement"
 
-    name = StdIdent()
+    name = StdIdent(index = True)
 
     longIdentifier = StdString()
 
@@ -2434,6 +2522,18 @@ class Measurement(Base, HasAnnotations, HasBitMasks, HasByteOrders, HasDiscretes
     layout = relationship("Layout", back_populates = "measurement", uselist = False)
     read_write = relationship("ReadWrite", back_populates = "measurement", uselist = False)
     virtual = relationship("Virtual", back_populates = "measurement", uselist = False)
+    flat_bit_mask = FlatColumn(types.Integer)
+    flat_byte_order = FlatColumn(types.VARCHAR(256))
+    flat_display_identifier = FlatColumn(types.VARCHAR(1025))
+    flat_ecu_address = FlatColumn(types.Integer)
+    flat_ecu_address_extension = FlatColumn(types.Integer)
+    flat_format = FlatColumn(types.VARCHAR(256))
+    flat_phys_unit = FlatColumn(types.VARCHAR(256))
+
+    conversion_rid = RefColumn("compu_method")
+
+    compu_method = relationship("CompuMethod", primaryjoin = "foreign(Measurement.conversion) == CompuMethod.name",
+        viewonly = True, uselist = False)
     _module_rid = Column(types.Integer, ForeignKey("module.rid"))
     module = relationship("Module", back_populates = "measurement", uselist = True)
 
@@ -2529,7 +2629,7 @@ class EcuAddress(Base):
     )
 
     __optional_elements__ = ( )
-    _measurement_rid = Column(types.Integer, ForeignKey("measurement.rid"))
+    _measurement_rid = Column(types.Integer, ForeignKey("measurement.rid"), index = True)
     measurement = relationship("Measurement", back_populates = "ecu_address", uselist = False)
 
 
@@ -3045,7 +3145,7 @@ class RecordLayout(Base, HasAlignmentBytes, HasAlignmentFloat32Ieees, HasAlignme
     """
     __tablename__ = "record_layout"
 
-    name = StdIdent()
+    name = StdIdent(index = True)
 
     __required_parameters__ = (
         Parameter("name", Ident, False),
@@ -4282,7 +4382,7 @@ class Unit(Base, HasRefUnits):
     """
     __tablename__ = "unit"
 
-    name = StdIdent()
+    name = StdIdent(index = True)
 
     longIdentifier = StdString()
 
@@ -4565,9 +4665,315 @@ class VarSeparator(Base):
     _variant_coding_rid = Column(types.Integer, ForeignKey("variant_coding.rid"))
     variant_coding = relationship("VariantCoding", back_populates = "var_separator", uselist = False)
 
+_SCHEMA_SCRIPT = None
+
+def schema_script():
+    """DDL script creating all tables and indices, generated once per process.
+    """
+    global _SCHEMA_SCRIPT
+
+    if _SCHEMA_SCRIPT is None:
+        dialect = sqlite.dialect()
+        statements = []
+        for table in Base.metadata.sorted_tables:
+            statements.append(str(schema.CreateTable(table).compile(dialect = dialect)).strip())
+            statements.extend(str(schema.CreateIndex(index).compile(dialect = dialect)) for index in table.indexes)
+        _SCHEMA_SCRIPT = "".join("{};\n".format(statement) for statement in statements)
+    return _SCHEMA_SCRIPT
+
+
+class Flattened(object):
+    """Single-valued optional element, that :meth:`A2LDatabase.denormalize` moves into its parent.
+
+    Parameters
+    ----------
+    key: str
+        Name of the relationship, flattened value is stored in column ``flat_<key>``.
+
+    klass: class
+        Model class of the optional element.
+
+    attribute: str
+        The one and only parameter of `klass`.
+    """
+
+    def __init__(self, key, klass, attribute):
+        self.key = key
+        self.klass = klass
+        self.attribute = attribute
+
+    @property
+    def column(self):
+        return "flat_{}".format(self.key)
+
+    def __repr__(self):
+        return "{}('{}' {}.{})".format(self.__class__.__name__, self.key, self.klass.__name__, self.attribute)
+
+    __str__ = __repr__
+
+
+FLATTENED_ELEMENTS = {
+    Measurement: (
+        Flattened("bit_mask", BitMask, "mask"),
+        Flattened("byte_order", ByteOrder, "byteOrder"),
+        Flattened("display_identifier", DisplayIdentifier, "display_name"),
+        Flattened("ecu_address", EcuAddress, "address"),
+        Flattened("ecu_address_extension", EcuAddressExtension, "extension"),
+        Flattened("format", Format, "formatString"),
+        Flattened("phys_unit", PhysUnit, "unit"),
+    ),
+    Characteristic: (
+        Flattened("bit_mask", BitMask, "mask"),
+        Flattened("byte_order", ByteOrder, "byteOrder"),
+        Flattened("display_identifier", DisplayIdentifier, "display_name"),
+        Flattened("ecu_address_extension", EcuAddressExtension, "extension"),
+        Flattened("format", Format, "formatString"),
+        Flattened("phys_unit", PhysUnit, "unit"),
+    ),
+    AxisPts: (
+        Flattened("byte_order", ByteOrder, "byteOrder"),
+        Flattened("display_identifier", DisplayIdentifier, "display_name"),
+        Flattened("ecu_address_extension", EcuAddressExtension, "extension"),
+        Flattened("format", Format, "formatString"),
+        Flattened("phys_unit", PhysUnit, "unit"),
+    ),
+}
+
+
+def restore_flattened(target, *args):
+    """Re-create optional elements from ``flat_*`` columns while loading.
+
+    Keeps the object model of denormalized databases compatible (``meas.ecu_address.address``),
+    without a single join or lazy load. The re-created elements are read-only and never saved
+    (see :func:`_keep_restored_out`); assign the ``flat_*`` column or a new element instead.
+    """
+    state_dict = target.__dict__
+    keys = state_dict.setdefault("_restored_keys", set())
+    for element in FLATTENED_ELEMENTS[type(target)]:
+        if element.column not in state_dict:
+            continue    # Not loaded by this refresh.
+        value = state_dict[element.column]
+        current = state_dict.get(element.key)
+        if value is not None and (current is None or element.key in keys):
+            restored = element.klass(**{element.attribute: value})
+            restored._restored_from = element.column
+            orm.attributes.set_committed_value(target, element.key, restored)
+            keys.add(element.key)
+        elif value is None and element.key in keys:
+            orm.attributes.set_committed_value(target, element.key, None)
+            keys.discard(element.key)
+
+
+def _expire_restored(state, attrs):
+    """Restored elements expire together with their ``flat_*`` columns; otherwise the lazy loader
+    would replace them by None (the foreign keys are NULL).
+    """
+    keys = state.dict.get("_restored_keys")
+    if keys:
+        state.expired_attributes.update(key for key in keys
+            if attrs is None or key in attrs or "flat_{}".format(key) in attrs
+        )
+
+
+def _read_only(target, value, oldvalue, initiator):
+    column = getattr(target, "_restored_from", None)
+    if column is not None:
+        raise AttributeError("'{}' is stored in '{}' of a denormalized database, assign that column instead.".format(
+            initiator.key, column)
+        )
+
+
+def _keep_restored_out(session, instance):
+    """Elements re-created by :func:`restore_flattened` have no row; the save-update cascade
+    (``session.add(meas)``) must not insert one.
+    """
+    if getattr(instance, "_restored_from", None) is not None:
+        session.expunge(instance)
+
+
+def _replace_flattened(target, value, oldvalue, initiator):
+    """Assigning a new element to a denormalized parent stores it as a row again.
+    """
+    column = "flat_{}".format(initiator.key)
+    if getattr(value, "_restored_from", None) is None:
+        target.__dict__.get("_restored_keys", set()).discard(initiator.key)
+        if target.__dict__.get(column) is not None:
+            setattr(target, column, None)
+
+for klass, elements in FLATTENED_ELEMENTS.items():
+    event.listen(klass, "load", restore_flattened)
+    event.listen(klass, "refresh", restore_flattened)
+    event.listen(klass, "expire", _expire_restored, raw = True)
+    for element in elements:
+        event.listen(getattr(klass, element.key), "set", _replace_flattened)
+for element in OrderedDict((element.klass, element) for elements in FLATTENED_ELEMENTS.values() for element in elements).values():
+    event.listen(getattr(element.klass, element.attribute), "set", _read_only)
+event.listen(orm.Session, "transient_to_pending", _keep_restored_out)
+
+
+NO_REFERENCE = ("NO_COMPU_METHOD", "NO_INPUT_QUANTITY")
+
+DanglingReference = namedtuple("DanglingReference", "kind rid name attribute reference")
+
+
+class Reference(object):
+    """Element referenced by name, resolved by :meth:`A2LDatabase.resolve_references`.
+
+    Parameters
+    ----------
+    klass: class
+        Referencing model class.
+
+    attribute: str
+        Attribute of `klass` holding the name.
+
+    column: str
+        Integer column of `klass` receiving the `rid` of the referenced element.
+
+    target: class
+        Model class of the referenced element, looked up by `name`.
+    """
+
+    def __init__(self, klass, attribute, column, target):
+        self.klass = klass
+        self.attribute = attribute
+        self.column = column
+        self.target = target
+
+    def update(self):
+        """Set-based ``UPDATE`` filling :attr:`column` of all rows.
+
+        Names are looked up in the same `MODULE` first, if both elements belong to modules.
+        """
+        parent = self.klass.__table__
+        target = self.target.__table__
+        by_name = select([target.c.rid]).where(target.c.name == parent.c[self.attribute])
+        value = by_name.order_by(target.c.rid).limit(1).as_scalar()
+        if "_module_rid" in parent.c and "_module_rid" in target.c:
+            same_module = by_name.where(target.c._module_rid == parent.c._module_rid).limit(1).as_scalar()
+            value = func.coalesce(same_module, value)
+        return parent.update().values({self.column: value})
+
+    def __repr__(self):
+        return "{}({}.{} -> {})".format(self.__class__.__name__, self.klass.__name__, self.attribute, self.target.__name__)
+
+    __str__ = __repr__
+
+
+CONVERSION_TABLE_COLUMNS = (
+    ("compu_tab_rid", CompuTab),
+    ("compu_vtab_rid", CompuVtab),
+    ("compu_vtab_range_rid", CompuVtabRange),
+)
+
+REFERENCES = (
+    Reference(Measurement, "conversion", "conversion_rid", CompuMethod),
+    Reference(Characteristic, "conversion", "conversion_rid", CompuMethod),
+    Reference(Characteristic, "deposit", "deposit_rid", RecordLayout),
+    Reference(AxisPts, "conversion", "conversion_rid", CompuMethod),
+    Reference(AxisPts, "deposit", "deposit_rid", RecordLayout),
+    Reference(AxisPts, "inputQuantity", "input_quantity_rid", Measurement),
+    Reference(AxisDescr, "conversion", "conversion_rid", CompuMethod),
+    Reference(AxisDescr, "inputQuantity", "input_quantity_rid", Measurement),
+    Reference(AxisPtsRef, "axisPoints", "axis_points_rid", AxisPts),
+    Reference(RefUnit, "unit", "unit_rid", Unit),
+) + tuple(Reference(CompuTabRef, "conversionTable", column, target) for column, target in CONVERSION_TABLE_COLUMNS
+) + tuple(Reference(StatusStringRef, "conversionTable", column, target) for column, target in CONVERSION_TABLE_COLUMNS)
+
+
+Member = namedtuple("Member", "kind name rid role")
+
+
+class MemberList(object):
+    """Identifier list (`role`) of `FUNCTION`\\s or `GROUP`\\s, indexed by :class:`Membership`.
+
+    Parameters
+    ----------
+    role: str
+        Keyword of the list, like ``IN_MEASUREMENT``.
+
+    container: class
+        :class:`Function` or :class:`Group`.
+
+    element: class
+        Model class of the list, like :class:`InMeasurement`.
+
+    identifiers: class
+        Model class of the list items, like :class:`InMeasurementIdentifiers`.
+    """
+
+    def __init__(self, role, container, element, identifiers):
+        self.role = role
+        self.container = container
+        self.element = element
+        self.identifiers = identifiers
+        self.kind = container.__tablename__.upper()
+        table = element.__table__
+        self.identifier_column = next(column for column in identifiers.__table__.c
+            if any(fk.column.table is table for fk in column.foreign_keys)
+        )
+        # Either the list points to its container (SUB_FUNCTION) or vice versa (REF_CHARACTERISTIC).
+        self.container_column = container.__table__.c.get("{}_id".format(table.name))
+
+    def join(self):
+        """Identifiers joined with list and container.
+        """
+        parent = self.container.__table__
+        child = self.element.__table__
+        if self.container_column is not None:
+            condition = self.container_column == child.c.rid
+        else:
+            condition = child.c["_{}_rid".format(parent.name)] == parent.c.rid
+        return self.identifiers.__table__.join(child, self.identifier_column == child.c.rid).join(parent, condition)
+
+    def select(self):
+        """`name`, `role`, `container_kind`, `container_rid`, `element_rid` of every identifier, in list order.
+        """
+        ids = self.identifiers.__table__
+        return select([ids.c.identifier.label("name"), literal(self.role).label("role"),
+            literal(self.kind).label("container_kind"), self.container.__table__.c.rid.label("container_rid"),
+            self.element.__table__.c.rid.label("element_rid")]).select_from(self.join()
+        ).order_by(self.container.__table__.c.rid, ids.c.position)
+
+    def __repr__(self):
+        return "{}({} of {})".format(self.__class__.__name__, self.role, self.kind)
+
+    __str__ = __repr__
+
+
+MEMBER_LISTS = (
+    MemberList("SUB_FUNCTION", Function, SubFunction, SubFunctionIdentifiers),
+    MemberList("DEF_CHARACTERISTIC", Function, DefCharacteristic, DefCharacteristicIdentifiers),
+    MemberList("REF_CHARACTERISTIC", Function, RefCharacteristic, RefCharacteristicIdentifiers),
+    MemberList("IN_MEASUREMENT", Function, InMeasurement, InMeasurementIdentifiers),
+    MemberList("OUT_MEASUREMENT", Function, OutMeasurement, OutMeasurementIdentifiers),
+    MemberList("LOC_MEASUREMENT", Function, LocMeasurement, LocMeasurementIdentifiers),
+    MemberList("SUB_GROUP", Group, SubGroup, SubGroupIdentifiers),
+    MemberList("REF_CHARACTERISTIC", Group, RefCharacteristic, RefCharacteristicIdentifiers),
+    MemberList("REF_MEASUREMENT", Group, RefMeasurement, RefMeasurementIdentifiers),
+)
+
+MEMBERSHIP_COLUMNS = ("name", "role", "container_kind", "container_rid", "element_rid")
+
+
 class A2LDatabase(object):
+    """
+    Parameters
+    ----------
+    filename: str
+        Database file (extension `.a2ldb` not needed) or ':memory:'.
+
+    read_only: bool
+        Open an existing file without locking it and without upgrading its schema;
+        :attr:`session` can't write.
 
-    def __init__(self, filename, debug = False, logLevel = 'INFO'):
+    Raises
+    ------
+    :class:`pya2l.exceptions.SchemaVersionError`
+        `read_only` database created by another schema version.
+    """
+
+    def __init__(self, filename, debug = False, logLevel = 'INFO', read_only = False):
         if filename == ':memory:':
             self.dbname = ""
         else:
@@ -4575,17 +4981,99 @@ class A2LDatabase(object):
                self.dbname = "{}.{}".format(filename, DB_EXTENSION)
             else:
                self.dbname = filename
-        self._engine = create_engine("sqlite:///{}".format(self.dbname), echo = debug,
-            connect_args={'detect_types': sqlite3.PARSE_DECLTYPES|sqlite3.PARSE_COLNAMES},
-        native_datetime = True)
+        self.debug = debug
+        self.read_only = read_only
+        if read_only:
+            if not self.dbname:
+                raise ValueError("Read-only databases must be file based.")
+            if not os.path.exists(self.dbname):
+                raise OSError("file '{}' does not exist.".format(self.dbname))
+            self._engine = create_engine("sqlite://", creator = self._connect_read_only, echo = debug,
+                poolclass = pool.NullPool, native_datetime = True
+            )
+        else:
+            self._engine = create_engine("sqlite:///{}".format(self.dbname), echo = debug,
+                connect_args={'detect_types': sqlite3.PARSE_DECLTYPES|sqlite3.PARSE_COLNAMES},
+            native_datetime = True)
 
         self._session = orm.Session(self._engine, autoflush = False, autocommit = False)
         self._metadata = Base.metadata
+        self._read_engine = None
+        self._read_sessions = None
+        self._members_tracked = None
+        event.listen(self._session, "after_flush", self._update_members)
         #loadInitialData(Node)
+        if read_only:
+            version = self.schema_version
+            if version != CURRENT_SCHEMA_VERSION:
+                self._engine.dispose()
+                raise exceptions.SchemaVersionError("'{}' has schema version {}, expected {}; open it writable to upgrade.".format(
+                    self.dbname, version, CURRENT_SCHEMA_VERSION)
+                )
+        elif self.dbname and os.path.exists(self.dbname) and os.path.getsize(self.dbname):
+            version = self.schema_version
+            if version is None:
+                Base.metadata.create_all(self.engine)
+                self._add_meta_data()
+            elif version != CURRENT_SCHEMA_VERSION:
+                self._upgrade_schema()
+        else:
+            self._create_schema()
+            self._add_meta_data()
+
+    def _create_schema(self):
+        """Create all tables and indices with one script, much faster than :meth:`create_all`.
+        """
+        connection = self.engine.raw_connection()
+        try:
+            connection.executescript("BEGIN;\n{}COMMIT;\n".format(schema_script()))
+        finally:
+            connection.close()
+
+    def _add_meta_data(self):
+        self.session.add(MetaData(schema_version = CURRENT_SCHEMA_VERSION))
+        self.session.commit()
+
+    def _upgrade_schema(self):
+        """Add tables, columns and indices missing in databases created by older versions.
+        """
         Base.metadata.create_all(self.engine)
-        meta = MetaData(schema_version = CURRENT_SCHEMA_VERSION)
-        self.session.add(meta)
-        self.session.flush()
+        dialect = sqlite.dialect()
+        with self.engine.begin() as conn:
+            indices = {row[0] for row in conn.execute(text("SELECT name FROM sqlite_master WHERE type = 'index'"))}
+            for table in Base.metadata.sorted_tables:
+                existing = {row[1] for row in conn.execute(text("PRAGMA table_info('{}')".format(table.name)))}
+                for column in table.columns:
+                    if column.name not in existing:
+                        conn.execute(text("ALTER TABLE {} ADD COLUMN {}".format(table.name,
+                            schema.CreateColumn(column).compile(dialect = dialect)))
+                        )
+                for index in table.indexes:
+                    if index.name not in indices:
+                        conn.execute(text(str(schema.CreateIndex(index).compile(dialect = dialect))))
+            meta = MetaData.__table__
+            if not conn.execute(meta.update().values(schema_version = CURRENT_SCHEMA_VERSION)).rowcount:
+                conn.execute(meta.insert().values(schema_version = CURRENT_SCHEMA_VERSION))
+
+    @property
+    def schema_version(self):
+        """Schema version the database was created with, or None if unknown.
+        """
+        with self.engine.connect() as conn:
+            try:
+                return conn.execute(text("SELECT schema_version FROM metadata ORDER BY rid DESC LIMIT 1")).scalar()
+            except exc.OperationalError:
+                return None
+
+    @property
+    def source_hash(self):
+        """SHA-256 (hex digest) of the A2L file the database was imported from, or None.
+        """
+        return self.session.query(MetaData.source_hash).order_by(MetaData.rid.desc()).limit(1).scalar()
+
+    @source_hash.setter
+    def source_hash(self, value):
+        self.session.query(MetaData).update({MetaData.source_hash: value}, synchronize_session = False)
         self.session.commit()
 
     @property
@@ -4600,6 +5088,283 @@ class A2LDatabase(object):
     def session(self):
         return self._session
 
+    @property
+    def denormalized(self):
+        """Were optional elements flattened by :meth:`denormalize`?
+        """
+        return self.session.query(exists().where(MetaData.denormalized == True)).scalar()
+
+    def _connect_read_only(self):
+        uri = "{}?mode=ro".format(pathlib.Path(os.path.abspath(self.dbname)).as_uri())
+        return sqlite3.connect(uri, uri = True, check_same_thread = False, factory = ReadOnlyConnection,
+            detect_types = sqlite3.PARSE_DECLTYPES | sqlite3.PARSE_COLNAMES
+        )
+
+    def create_read_sessions(self, pool_size = READ_POOL_SIZE):
+        """Setup a thread-local session factory for concurrent, read-only access.
+
+        Every thread gets its own session, backed by a pool of read-only SQLite connections,
+        so :attr:`session` stays reserved for the thread that imports or modifies the database.
+
+        Parameters
+        ----------
+        pool_size: int
+            Number of connections kept open; should roughly match the number of worker threads.
+
+        Returns
+        -------
+        :class:`sqlalchemy.orm.scoped_session`
+
+        Raises
+        ------
+        ValueError
+            In-memory databases cannot be shared between connections.
+        """
+        if not self.dbname:
+            raise ValueError("Read sessions require a file based database.")
+        if self._read_sessions is None:
+            self._read_engine = create_engine("sqlite://", creator = self._connect_read_only, echo = self.debug,
+                poolclass = pool.QueuePool, pool_size = pool_size, max_overflow = pool_size, native_datetime = True
+            )
+            self._read_sessions = orm.scoped_session(orm.sessionmaker(bind = self._read_engine,
+                autoflush = False, autocommit = False)
+            )
+        return self._read_sessions
+
+    @property
+    def read_sessions(self):
+        """Thread-local, read-only session registry (see :meth:`create_read_sessions`).
+        """
+        return self.create_read_sessions()
+
+    @contextmanager
+    def read_session(self):
+        """Context manager yielding the read-only session of the calling thread.
+
+        Example
+        -------
+        .. code-block:: python
+
+            with db.read_session() as session:
+                meas = session.query(model.Measurement).filter(model.Measurement.name == name).first()
+        """
+        registry = self.read_sessions
+        session = registry()
+        try:
+            yield session
+        finally:
+            registry.remove()
+
+    def denormalize(self, vacuum = True):
+        """Move single-valued optional elements into their parents (see :data:`FLATTENED_ELEMENTS`).
+
+        Every affected element (`BIT_MASK`, `BYTE_ORDER`, `ECU_ADDRESS`, ...) is copied into a nullable
+        ``flat_<element>`` column of its `MEASUREMENT`, `CHARACTERISTIC` or `AXIS_PTS`, and the now
+        redundant rows are deleted -- all with a few set-based statements.
+
+        Afterwards reading these elements doesn't need any join, and the database file shrinks
+        considerably. The object model stays the same: loading re-creates the elements from
+        their columns, so ``meas.ecu_address.address`` still works.
+
+        Parameters
+        ----------
+        vacuum: bool
+            Reclaim space of deleted rows.
+
+        Note
+        ----
+        Denormalized databases are meant for reading; flattened elements are read-only,
+        to change one assign the ``flat_*`` column (or a new element, stored as a row again).
+        """
+        self.session.commit()
+        with self.engine.connect() as conn:
+            # Integrity is checked set-based below, row-wise checking of unindexed references is prohibitive.
+            conn.execute(text("PRAGMA FOREIGN_KEYS=OFF"))
+            try:
+                with conn.begin():
+                    self._flatten(conn)
+            finally:
+                conn.execute(text("PRAGMA FOREIGN_KEYS=ON"))
+            if vacuum:
+                conn.execute(text("VACUUM"))
+
+    def _flatten(self, conn):
+        children = set()
+        for klass, elements in FLATTENED_ELEMENTS.items():
+            parent = klass.__table__
+            for element in elements:
+                child = element.klass.__table__
+                value = child.c[element.attribute]
+                flat = parent.c[element.column]
+                fk = parent.c.get("{}_id".format(element.key))
+                if fk is not None:
+                    sub = select([value]).where(child.c.rid == fk).as_scalar()
+                    conn.execute(parent.update().where(fk != None).values({flat: sub, fk: None}))
+                    children.add(child)
+                else:
+                    # Element references its parent, like ECU_ADDRESS.
+                    back = child.c["_{}_rid".format(parent.name)]
+                    sub = select([value]).where(back == parent.c.rid).limit(1).as_scalar()
+                    # Parents flattened before keep their values.
+                    conn.execute(parent.update().where(exists().where(back == parent.c.rid)).values({flat: sub}))
+                    conn.execute(child.delete().where(back != None))
+        for child in children:
+            referrers = [column for table in self.metadata.sorted_tables for column in table.c
+                if any(fk.column.table is child for fk in column.foreign_keys)
+            ]
+            conn.execute(child.delete().where(and_(*[~child.c.rid.in_(select([column]).where(column != None))
+                for column in referrers]))
+            )
+        conn.execute(MetaData.__table__.update().values(denormalized = True))
+
+    @property
+    def references_resolved(self):
+        """Were names resolved into ``*_rid`` columns by :meth:`resolve_references`?
+        """
+        return self.session.query(exists().where(MetaData.references_resolved == True)).scalar()
+
+    def resolve_references(self):
+        """Resolve references by name (see :data:`REFERENCES`) into the integer ``*_rid`` columns.
+
+        One ``UPDATE`` per kind of reference; afterwards e.g. measurements and their compu methods
+        are joined on ``measurement.conversion_rid = compu_method.rid`` instead of names.
+        Run again after modifying the database.
+
+        Returns
+        -------
+        list of :class:`DanglingReference`
+            References to elements that don't exist (``NO_COMPU_METHOD`` and ``NO_INPUT_QUANTITY`` excluded).
+        """
+        session = self.session
+        session.flush()
+        for reference in REFERENCES:
+            session.execute(reference.update())
+        keywords = {klass: keyword for keyword, klass in KEYWORD_MAP.items()}
+        dangling = []
+        groups = OrderedDict()
+        for reference in REFERENCES:
+            groups.setdefault((reference.klass, reference.attribute), []).append(reference.column)
+        for (klass, attribute), columns in groups.items():
+            table = klass.__table__
+            value = table.c[attribute]
+            name = table.c.name if "name" in table.c else literal(None)
+            stmt = select([table.c.rid, name, value]).where(and_(value != None, ~value.in_(NO_REFERENCE),
+                *[table.c[column] == None for column in columns])
+            ).order_by(table.c.rid)
+            dangling.extend(DanglingReference(keywords.get(klass, klass.__name__), rid, element_name, attribute, ref)
+                for rid, element_name, ref in session.execute(stmt)
+            )
+        session.execute(MetaData.__table__.update().values(references_resolved = True))
+        session.commit()
+        return dangling
+
+    @property
+    def members_indexed(self):
+        """Is :class:`Membership` built (see :meth:`index_members`)?
+        """
+        return self.session.query(exists().where(MetaData.members_indexed == True)).scalar()
+
+    def index_members(self):
+        """Build the reverse index of `FUNCTION` and `GROUP` identifier lists (:class:`Membership`).
+
+        One ``INSERT ... SELECT`` per list; afterwards changes made through :attr:`session` are
+        applied incrementally on every flush.
+        """
+        session = self.session
+        session.flush()
+        membership = Membership.__table__
+        session.execute(membership.delete())
+        for member_list in MEMBER_LISTS:
+            session.execute(membership.insert().from_select(MEMBERSHIP_COLUMNS, member_list.select()))
+        session.execute(MetaData.__table__.update().values(members_indexed = True))
+        session.commit()
+        self._members_tracked = True
+
+    def memberships(self, name, roles = None):
+        """`FUNCTION`\\s and `GROUP`\\s listing element `name`, answered by :class:`Membership`.
+
+        Without index (see :meth:`index_members`) the identifier lists are scanned instead.
+
+        Parameters
+        ----------
+        name: str
+
+        roles: iterable of str
+            Restrict to lists like ``REF_MEASUREMENT``.
+
+        Returns
+        -------
+        list of :class:`Member`
+            ``kind`` and ``name`` of the containers, ordered by role.
+        """
+        if self.members_indexed:
+            membership = Membership.__table__
+        else:
+            membership = union_all(*(member_list.select().where(member_list.identifiers.__table__.c.identifier == name).
+                order_by(None) for member_list in MEMBER_LISTS)
+            ).alias("membership")
+        function = Function.__table__
+        group = Group.__table__
+        stmt = select([membership.c.container_kind, func.coalesce(function.c.name, group.c.groupName),
+            membership.c.container_rid, membership.c.role]
+        ).select_from(membership.outerjoin(function, and_(membership.c.container_kind == "FUNCTION",
+            function.c.rid == membership.c.container_rid)).outerjoin(group, and_(membership.c.container_kind == "GROUP",
+            group.c.rid == membership.c.container_rid))
+        ).where(membership.c.name == name)
+        if roles is not None:
+            stmt = stmt.where(membership.c.role.in_(list(roles)))
+        stmt = stmt.order_by(membership.c.role, membership.c.container_kind, membership.c.container_rid)
+        return [Member(*row) for row in self.session.execute(stmt)]
+
+    def _update_members(self, session, flush_context):
+        """``after_flush`` hook: re-index lists whose identifiers, list or container changed.
+        """
+        if self._members_tracked is None:
+            self._members_tracked = bool(session.execute(select([MetaData.__table__.c.members_indexed]).
+                order_by(MetaData.__table__.c.rid.desc()).limit(1)).scalar()
+            )
+        if not self._members_tracked:
+            return
+        elements = OrderedDict()
+        containers = OrderedDict()
+        for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+            klass = type(obj)
+            for member_list in MEMBER_LISTS:
+                if klass is member_list.identifiers:
+                    # Removed identifiers are orphaned, their list is only known from history.
+                    rids = orm.attributes.get_history(obj, member_list.identifier_column.key).sum()
+                    elements.setdefault(member_list, set()).update(rid for rid in rids if rid is not None)
+                elif klass is member_list.element:
+                    elements.setdefault(member_list, set()).add(obj.rid)
+                elif klass is member_list.container:
+                    containers.setdefault(member_list, set()).add(obj.rid)
+        membership = Membership.__table__
+        for affected, column, key in ((elements, membership.c.element_rid, "element"),
+                (containers, membership.c.container_rid, "container")):
+            for member_list, rids in affected.items():
+                session.execute(membership.delete().where(and_(membership.c.role == member_list.role,
+                    membership.c.container_kind == member_list.kind, column.in_(rids)))
+                )
+                table = getattr(member_list, key).__table__
+                session.execute(membership.insert().from_select(MEMBERSHIP_COLUMNS,
+                    member_list.select().where(table.c.rid.in_(rids)))
+                )
+
+    def close_read_sessions(self):
+        """Close read-only sessions (see :meth:`create_read_sessions`) and their connections.
+        """
+        if self._read_sessions is not None:
+            self._read_sessions.remove()
+            self._read_engine.dispose()
+            self._read_sessions = self._read_engine = None
+
+    def close(self):
+        """Close sessions and release all pooled connections.
+        """
+        self._session.close()
+        self.close_read_sessions()
+        self._engine.dispose()
+
     def begin_transaction(self):
         """
         """
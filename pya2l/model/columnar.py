@@ -0,0 +1,242 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Flat, column-oriented export of top-level elements as Arrow or Parquet.
+
+Every kind (:data:`KINDS`) becomes one table with one row per element (see :class:`View`): the
+parameters, the single-valued optional elements (``ecu_address``, ``byte_order``, ``matrix_dim_xDim``, ...),
+the name of the `MODULE` and -- for elements with a `conversion` -- the physical ``unit``.
+Normalized and denormalized databases give the same tables.
+
+Each kind is read with one Core select, fetched in chunks straight from the DBAPI cursor;
+every chunk becomes one record batch, so memory is bounded by the chunk size, not the database.
+PyArrow is only needed for writing and imported on first use.
+
+Example
+-------
+.. code-block:: python
+
+    from pya2l.model import columnar
+
+    columnar.export(db, "release_42/parquet")      # measurement.parquet, characteristic.parquet, ...
+
+    import pyarrow.parquet as pq
+    table = pq.read_table("release_42/parquet/measurement.parquet", columns = ["name", "ecu_address", "unit"])
+"""
+
+__copyright__="""
+    pySART - Simplified AUTOSAR-Toolkit for Python.
+
+   (C) 2009-2020 by Christoph Schueler <github.com/Christoph2,
+                                        cpu12.gems@googlemail.com>
+
+   All Rights Reserved
+
+  This program is free software; you can redistribute it and/or modify
+  it under the terms of the GNU General Public License as published by
+  the Free Software Foundation; either version 2 of the License, or
+  (at your option) any later version.
+
+  This program is distributed in the hope that it will be useful,
+  but WITHOUT ANY WARRANTY; without even the implied warranty of
+  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+  GNU General Public License for more details.
+
+  You should have received a copy of the GNU General Public License along
+  with this program; if not, write to the Free Software Foundation, Inc.,
+  51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+"""
+
+from collections import namedtuple, OrderedDict
+import os
+
+from sqlalchemy import func, select, types
+
+import pya2l.model as model
+from pya2l.model.content import is_key, KEYWORDS, TOP_LEVEL
+
+
+CHUNK_SIZE = 65536
+
+FORMATS = OrderedDict((
+    ("parquet", "parquet"),
+    ("arrow", "arrow"),
+))
+
+# Kinds exported, by keyword.
+KINDS = OrderedDict((KEYWORDS[klass], klass) for klass in TOP_LEVEL if klass not in (model.Project, model.Module))
+
+Field = namedtuple("Field", "name type")
+
+
+def arrow_type(type_):
+    """PyArrow type of SQLAlchemy type `type_`.
+    """
+    import pyarrow as pa
+
+    if isinstance(type_, types.Boolean):
+        return pa.bool_()
+    if isinstance(type_, types.Integer):
+        return pa.int64()
+    if isinstance(type_, types.Float):
+        return pa.float64()
+    return pa.string()
+
+
+class View(object):
+    """One flat row per element of `klass`.
+
+    Single-valued optional elements are outer-joined: elements with one parameter become a column
+    named like the element (``ecu_address``), otherwise one column per parameter (``matrix_dim_xDim``);
+    elements without any parameters or elements (``READ_WRITE``) become boolean columns. Multi-valued
+    optional elements (``ANNOTATION``, ``IF_DATA``, ...) are left out.
+
+    Parameters
+    ----------
+    klass: class
+        Top-level model class.
+
+    resolved: bool
+        Were references resolved (:meth:`A2LDatabase.resolve_references`)? Otherwise
+        ``unit`` is looked up by name.
+    """
+
+    def __init__(self, klass, resolved = True):
+        self.klass = klass
+        self.kind = KEYWORDS[klass]
+        table = klass.__table__
+        module = model.Module.__table__.alias("module")
+        from_ = table.outerjoin(module, module.c.rid == table.c._module_rid)
+        columns = [(table.c.rid, table.c.rid.type), (module.c.name.label("module"), module.c.name.type)]
+        columns.extend((column, column.type) for column in table.c if not is_key(column))
+        flattened = {element.key: element for element in model.FLATTENED_ELEMENTS.get(klass, ())}
+        names = {column.name for column, _ in columns}
+        for element in klass.__optional_elements__:
+            child_class = getattr(model, element.name, None)
+            key = element.keyword_name.lower()
+            if element.multiple or key in names or not hasattr(child_class, "__table__"):
+                continue
+            child = child_class.__table__.alias(key)
+            if "{}_id".format(key) in table.c:
+                on = child.c.rid == table.c["{}_id".format(key)]
+            elif "_{}_rid".format(table.name) in child.c:
+                on = child.c["_{}_rid".format(table.name)] == table.c.rid
+            else:
+                continue
+            from_ = from_.outerjoin(child, on)
+            parameters = [parameter.name for parameter in getattr(child_class, "__required_parameters__", ())
+                if not parameter.multiple
+            ]
+            if not parameters:
+                if getattr(child_class, "__optional_elements__", ()):
+                    continue
+                columns.append(((child.c.rid != None).label(key), types.Boolean()))
+            elif len(parameters) == 1:
+                value = child.c[parameters[0]]
+                if key in flattened:
+                    value = func.coalesce(table.c[flattened[key].column], value)
+                columns.append((value.label(key), child.c[parameters[0]].type))
+            else:
+                columns.extend((child.c[name].label("{}_{}".format(key, name)), child.c[name].type) for name in parameters)
+        if "conversion" in table.c:
+            compu_method = model.CompuMethod.__table__.alias("conversion")
+            if resolved:
+                from_ = from_.outerjoin(compu_method, compu_method.c.rid == table.c.conversion_rid)
+                unit = compu_method.c.unit
+            else:
+                unit = select([compu_method.c.unit]).where(compu_method.c.name == table.c.conversion).limit(1).as_scalar()
+            physical = [column for column, _ in columns if column.name == "phys_unit"]
+            columns.append((func.coalesce(*(physical + [unit])).label("unit"), compu_method.c.unit.type))
+        self.fields = [Field(column.name, type_) for column, type_ in columns]
+        self.select = select([column for column, _ in columns]).select_from(from_).order_by(table.c.rid)
+
+    def chunks(self, session, chunk_size = CHUNK_SIZE):
+        """Rows in chunks of at most `chunk_size`, each chunk as a list of columns.
+        """
+        booleans = [idx for idx, field in enumerate(self.fields) if isinstance(field.type, types.Boolean)]
+        cursor = session.execute(self.select).cursor
+        try:
+            while True:
+                rows = cursor.fetchmany(chunk_size)
+                if not rows:
+                    break
+                columns = [list(column) for column in zip(*rows)]
+                for idx in booleans:
+                    columns[idx] = [None if value is None else bool(value) for value in columns[idx]]
+                yield columns
+        finally:
+            cursor.close()
+
+    def schema(self):
+        import pyarrow as pa
+
+        return pa.schema([pa.field(field.name, arrow_type(field.type)) for field in self.fields])
+
+    def record_batches(self, session, chunk_size = CHUNK_SIZE):
+        """:class:`pyarrow.RecordBatch`\\es of :meth:`chunks`.
+        """
+        import pyarrow as pa
+
+        schema = self.schema()
+        for columns in self.chunks(session, chunk_size):
+            yield pa.RecordBatch.from_arrays([pa.array(column, type = field.type) for column, field in zip(columns, schema)],
+                schema = schema
+            )
+
+
+def view(db, klass):
+    return View(klass, db.references_resolved)
+
+
+def write(db, klass, sink, format = "parquet", chunk_size = CHUNK_SIZE):
+    """Write all elements of `klass` as Arrow IPC file or Parquet file to `sink` (path or binary file object).
+
+    Returns
+    -------
+    int
+        Number of rows written.
+    """
+    import pyarrow as pa
+
+    if format not in FORMATS:
+        raise ValueError("unknown format '{}'.".format(format))
+    current = view(db, klass)
+    schema = current.schema()
+    if format == "parquet":
+        import pyarrow.parquet as pq
+
+        writer = pq.ParquetWriter(sink, schema)
+        write_batch = lambda batch: writer.write_table(pa.Table.from_batches([batch], schema = schema))
+    else:
+        writer = pa.ipc.new_file(sink, schema)
+        write_batch = writer.write_batch
+    rows = 0
+    try:
+        for batch in current.record_batches(db.session, chunk_size):
+            write_batch(batch)
+            rows += batch.num_rows
+    finally:
+        writer.close()
+    return rows
+
+
+def export(db, directory, kinds = None, format = "parquet", chunk_size = CHUNK_SIZE):
+    """Write one file per kind to `directory` (created if needed), named like ``measurement.parquet``.
+
+    Parameters
+    ----------
+    kinds: iterable of str
+        Keys of :data:`KINDS`, default all.
+
+    Returns
+    -------
+    OrderedDict
+        kind -> (file name, number of rows).
+    """
+    if not os.path.isdir(directory):
+        os.makedirs(directory)
+    result = OrderedDict()
+    for kind in kinds or KINDS:
+        file_name = os.path.join(directory, "{}.{}".format(kind.lower(), FORMATS[format]))
+        result[kind] = (file_name, write(db, KINDS[kind], file_name, format, chunk_size))
+    return result
@@ -0,0 +1,325 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Canonical content of top-level elements.
+
+A :class:`Snapshot` reads every table of a database once and serializes top-level elements
+(`MEASUREMENT`, `COMPU_METHOD`, `FUNCTION`, ..., see :data:`TOP_LEVEL`) including all their
+child elements into plain, JSON-compatible structures: parameters by name, child elements by
+relationship as lists (in `position` order for identifier lists). Keys (`rid`\\s, foreign keys,
+resolved ``*_rid`` columns) and list bookkeeping are left out, association tables (``ANNOTATION``\\s,
+``IF_DATA``) are skipped over and flattened elements (see :meth:`A2LDatabase.denormalize`) are restored,
+so equal definitions have equal content -- and equal :meth:`Snapshot.digest`\\s -- in any database.
+
+Used by :mod:`pya2l.model.diff` and :mod:`pya2l.model.merge`.
+"""
+
+__copyright__="""
+    pySART - Simplified AUTOSAR-Toolkit for Python.
+
+   (C) 2009-2020 by Christoph Schueler <github.com/Christoph2,
+                                        cpu12.gems@googlemail.com>
+
+   All Rights Reserved
+
+  This program is free software; you can redistribute it and/or modify
+  it under the terms of the GNU General Public License as published by
+  the Free Software Foundation; either version 2 of the License, or
+  (at your option) any later version.
+
+  This program is distributed in the hope that it will be useful,
+  but WITHOUT ANY WARRANTY; without even the implied warranty of
+  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+  GNU General Public License for more details.
+
+  You should have received a copy of the GNU General Public License along
+  with this program; if not, write to the Free Software Foundation, Inc.,
+  51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+"""
+
+from collections import namedtuple, OrderedDict
+import hashlib
+import json
+
+from sqlalchemy import bindparam
+
+import pya2l.model as model
+
+
+# Elements compared and matched by name; children of a `MODULE` (and `PROJECT` and `MODULE` themselves).
+TOP_LEVEL = (model.Project, model.Module) + tuple(klass for klass in model.KEYWORD_MAP.values()
+    if hasattr(klass, "__table__") and "_module_rid" in klass.__table__.c
+)
+
+KEYWORDS = {klass: keyword for keyword, klass in model.KEYWORD_MAP.items()}
+
+NAME_COLUMNS = {
+    model.Group: "groupName",
+    model.UserRights: "userLevelId",
+}
+
+Element = namedtuple("Element", "kind name klass rid")
+
+Edge = namedtuple("Edge", "key table column downward")
+
+Field = namedtuple("Field", "name index")
+
+
+def name_column(klass):
+    """Column identifying elements of `klass` (None for elements existing once per `MODULE`).
+    """
+    name = NAME_COLUMNS.get(klass, "name")
+    return name if name in klass.__table__.c else None
+
+
+def is_key(column):
+    return column.primary_key or column.foreign_keys or "references" in column.info or column.name.startswith("flat_")
+
+
+def is_downward(column):
+    """Does foreign key `column` point from a parent to its child?
+    """
+    # Elements reached through an association (ANNOTATION) point to it by `_association_id`.
+    return column.name.endswith("_id") and column.name != "_association_id"
+
+
+_ENCODER = json.JSONEncoder(sort_keys = True, separators = (",", ":"), default = str, check_circular = False)
+
+def digest(content):
+    """SHA-1 of the canonical JSON representation of `content`.
+    """
+    return hashlib.sha1(_ENCODER.encode(content).encode("utf-8")).hexdigest()
+
+
+class Schema(object):
+    """Parameter columns and child edges per table, derived from the foreign keys of the model.
+
+    Foreign keys named ``*_id`` point from the parent to an optional element (``BIT_MASK``, ...),
+    all others from the child to its parent. Use :func:`schema`.
+    """
+
+    def __init__(self, metadata):
+        top_level = {klass.__table__ for klass in TOP_LEVEL}
+        classes = {klass.__table__.name: klass for klass in model.Base._decl_class_registry.values()
+            if hasattr(klass, "__table__")
+        }
+        self.tables = OrderedDict((table.name, table) for table in metadata.sorted_tables)
+        self.transparent = {name for name in self.tables if name.endswith("_association")}
+        self.fields = {}
+        self.edges = {name: [] for name in self.tables}
+        self.flattened = {}
+        self.ordered = set()        # Tables with `position` as list order.
+        for table in self.tables.values():
+            indices = {column.name: idx for idx, column in enumerate(table.c)}
+            parameters = {parameter.name for parameter in getattr(classes.get(table.name), "__required_parameters__", ())}
+            # `position` of lists (unless a parameter, like in FNC_VALUES) is kept as order.
+            self.fields[table.name] = [Field(column.name, indices[column.name]) for column in table.c if not is_key(column)
+                and (column.name not in ("position", "discriminator") or column.name in parameters)
+            ]
+            if "position" in table.c and "position" not in parameters:
+                self.ordered.add(table.name)
+            for column in table.c:
+                for fk in column.foreign_keys:
+                    target = fk.column.table
+                    if target.name not in self.tables:
+                        continue
+                    if is_downward(column):
+                        if target not in top_level:
+                            self.edges[table.name].append(Edge(column.name[ : -3], target, indices[column.name], True))
+                    elif table not in top_level:
+                        self.edges[target.name].append(Edge(table.name, table, indices[column.name], False))
+        for klass, elements in model.FLATTENED_ELEMENTS.items():
+            indices = {column.name: idx for idx, column in enumerate(klass.__table__.c)}
+            self.flattened[klass.__table__.name] = [(element.key, element.attribute, indices[element.column])
+                for element in elements
+            ]
+
+
+_schema = None
+
+def schema():
+    """:class:`Schema` of the model, built on first use.
+    """
+    global _schema
+    if _schema is None:
+        _schema = Schema(model.Base.metadata)
+    return _schema
+
+
+class Snapshot(object):
+    """All tables of the database `session` is bound to, read with one query per table (rows as tuples).
+
+    Parameters
+    ----------
+    session: SQLAlchemy session
+
+    table_name: str
+        Read only rows `rids` of `table_name` and their children, with a few queries per table
+        -- e.g. a chunk of top-level elements.
+
+    rids: iterable of int
+    """
+
+    # Keys per ``IN`` clause.
+    CHUNK_SIZE = 900
+
+    def __init__(self, session, table_name = None, rids = None):
+        self.schema = schema()
+        self.rows = {name: OrderedDict() for name in self.schema.tables}
+        self.children = {}
+        if table_name is not None:
+            for parent, edges in self.schema.edges.items():
+                for edge in edges:
+                    if not edge.downward:
+                        self.children[(parent, edge.key, edge.column)] = {}
+            self.edges = self.schema.edges
+            self._load(session, table_name, rids)
+            return
+        for name, table in self.schema.tables.items():
+            rows = self.rows[name]
+            rid = list(table.c.keys()).index("rid")
+            for row in session.execute(table.select().order_by(self._order(table))):
+                row = tuple(row)
+                rows[row[rid]] = row
+        for parent, edges in self.schema.edges.items():
+            for edge in edges:
+                if edge.downward:
+                    continue
+                index = {}
+                for rid, row in self.rows[edge.table.name].items():
+                    owner = row[edge.column]
+                    if owner is not None:
+                        index.setdefault(owner, []).append(rid)
+                if index:
+                    self.children[(parent, edge.key, edge.column)] = index
+        # Edges that actually lead somewhere in this database.
+        self.edges = {parent: [edge for edge in edges if (edge.downward and self.rows[edge.table.name])
+            or (parent, edge.key, edge.column) in self.children] for parent, edges in self.schema.edges.items()
+        }
+
+    @staticmethod
+    def _order(table):
+        return table.c.position if "position" in table.c else table.c.rid
+
+    _statements = {}
+
+    @classmethod
+    def _statement(cls, table, column_name):
+        """Rows of `table` with `column_name` in bound parameter `keys`.
+        """
+        stmt = cls._statements.get((table.name, column_name))
+        if stmt is None:
+            stmt = cls._statements[(table.name, column_name)] = table.select().where(
+                table.c[column_name].in_(bindparam("keys", expanding = True))
+            ).order_by(cls._order(table))
+        return stmt
+
+    def _load(self, session, table_name, rids):
+        """Read rows `rids` of `table_name` and their children, breadth-first.
+        """
+        # (table name, column selected by, keys, children index filled or None)
+        pending = [(table_name, "rid", list(rids), None)]
+        while pending:
+            name, column_name, keys, index = pending.pop()
+            table = self.schema.tables[name]
+            rows = self.rows[name]
+            rid = list(table.c.keys()).index("rid")
+            by = list(table.c.keys()).index(column_name)
+            loaded = []
+            stmt = self._statement(table, column_name)
+            for start in range(0, len(keys), self.CHUNK_SIZE):
+                for row in session.execute(stmt, {"keys": keys[start : start + self.CHUNK_SIZE]}):
+                    row = tuple(row)
+                    if index is not None:
+                        index.setdefault(row[by], []).append(row[rid])
+                    if row[rid] not in rows:
+                        rows[row[rid]] = row
+                        loaded.append(row[rid])
+            if not loaded:
+                continue
+            for edge in self.schema.edges[name]:
+                if edge.downward:
+                    children = {rows[parent][edge.column] for parent in loaded} - {None}
+                    if children:
+                        pending.append((edge.table.name, "rid", sorted(children), None))
+                else:
+                    pending.append((edge.table.name, list(edge.table.c.keys())[edge.column], loaded,
+                        self.children[(name, edge.key, edge.column)])
+                    )
+
+    def elements(self):
+        """All top-level elements as :class:`Element`\\s, in table and `rid` order.
+        """
+        for klass in TOP_LEVEL:
+            column = name_column(klass)
+            kind = KEYWORDS.get(klass, klass.__tablename__.upper())
+            idx = list(klass.__table__.c.keys()).index(column) if column else None
+            for rid, row in self.rows[klass.__table__.name].items():
+                yield Element(kind, row[idx] if column else "", klass, rid)
+
+    def content(self, table_name, rid):
+        """Canonical content of row `rid` of `table_name`, including its children.
+        """
+        row = self.rows[table_name][rid]
+        result = OrderedDict([(field.name, row[field.index]) for field in self.schema.fields[table_name]])
+        for edge in self.edges[table_name]:
+            if edge.downward:
+                child = row[edge.column]
+                rids = [child] if child is not None and child in self.rows[edge.table.name] else ()
+            else:
+                rids = self.children[(table_name, edge.key, edge.column)].get(rid, ())
+            for child in rids:
+                if edge.table.name in self.schema.transparent:
+                    for key, value in self.content(edge.table.name, child).items():
+                        result.setdefault(key, []).extend(value)
+                else:
+                    result.setdefault(edge.key, []).append(self.content(edge.table.name, child))
+        for key, attribute, idx in self.schema.flattened.get(table_name, ()):
+            value = row[idx]
+            if value is not None and key not in result:
+                result[key] = [OrderedDict(((attribute, value), ))]
+        return result
+
+    def subtree(self, table_name, rid):
+        """Row `rid` of `table_name` and all its child rows (association tables included) as ``(table name, rid)``, parents first.
+        """
+        stack = [(table_name, rid)]
+        while stack:
+            table_name, rid = stack.pop()
+            yield table_name, rid
+            row = self.rows[table_name][rid]
+            children = []
+            for edge in self.edges[table_name]:
+                if edge.downward:
+                    child = row[edge.column]
+                    if child is not None and child in self.rows[edge.table.name]:
+                        children.append((edge.table.name, child))
+                else:
+                    children.extend((edge.table.name, child)
+                        for child in self.children[(table_name, edge.key, edge.column)].get(rid, ())
+                    )
+            stack.extend(reversed(children))
+
+    def digest(self, element):
+        return digest(self.content(element.klass.__table__.name, element.rid))
+
+    def keyed_elements(self):
+        """Top-level elements by ``(kind, name, occurrence)``; `occurrence` counts elements of
+        the same kind and name (several `MODULE`\\s).
+        """
+        result = OrderedDict()
+        seen = {}
+        for element in self.elements():
+            occurrence = seen[(element.kind, element.name)] = seen.get((element.kind, element.name), -1) + 1
+            result[(element.kind, element.name, occurrence)] = element
+        return result
+
+    def digests(self):
+        """Top-level elements and the digests of their content.
+
+        Returns
+        -------
+        OrderedDict
+            Keys of :meth:`keyed_elements` -> (:class:`Element`, digest).
+        """
+        return OrderedDict((key, (element, self.digest(element))) for key, element in self.keyed_elements().items())
@@ -0,0 +1,164 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Structural diff of two databases.
+
+Top-level elements are matched by kind and name and compared by the digests of their
+content (see :mod:`pya2l.model.content`); only elements with different digests are
+compared field by field.
+
+Example
+-------
+.. code-block:: python
+
+    from pya2l.model import diff
+
+    changes = diff.diff(old_db, new_db)
+    for change in changes.modified:
+        for delta in change.deltas:
+            print(change.kind, change.name, delta.path, delta.old, "->", delta.new)
+"""
+
+__copyright__="""
+    pySART - Simplified AUTOSAR-Toolkit for Python.
+
+   (C) 2009-2020 by Christoph Schueler <github.com/Christoph2,
+                                        cpu12.gems@googlemail.com>
+
+   All Rights Reserved
+
+  This program is free software; you can redistribute it and/or modify
+  it under the terms of the GNU General Public License as published by
+  the Free Software Foundation; either version 2 of the License, or
+  (at your option) any later version.
+
+  This program is distributed in the hope that it will be useful,
+  but WITHOUT ANY WARRANTY; without even the implied warranty of
+  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+  GNU General Public License for more details.
+
+  You should have received a copy of the GNU General Public License along
+  with this program; if not, write to the Free Software Foundation, Inc.,
+  51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+"""
+
+from collections import namedtuple, OrderedDict
+
+from pya2l.model.content import Snapshot
+
+
+ADDED = "added"
+REMOVED = "removed"
+MODIFIED = "modified"
+
+Change = namedtuple("Change", "kind name status deltas")
+
+Delta = namedtuple("Delta", "path old new")
+
+
+def flatten(content, prefix = ""):
+    """Parameters of `content` and its children by path, like ``axis_descr[1].inputQuantity``.
+    """
+    result = OrderedDict()
+    for key, value in content.items():
+        path = "{}{}".format(prefix, key)
+        if isinstance(value, list):
+            for idx, child in enumerate(value):
+                result.update(flatten(child, "{}[{}].".format(path, idx)))
+        else:
+            result[path] = value
+    return result
+
+
+def deltas(old, new):
+    """Field-level differences between two contents.
+    """
+    old, new = flatten(old), flatten(new)
+    paths = list(old) + [path for path in new if path not in old]
+    return [Delta(path, old.get(path), new.get(path)) for path in paths if old.get(path) != new.get(path)]
+
+
+class Changeset(object):
+    """Result of :func:`diff`.
+
+    Parameters
+    ----------
+    changes: list of :class:`Change`
+    """
+
+    def __init__(self, changes):
+        self.changes = changes
+
+    def _status(self, status):
+        return [change for change in self.changes if change.status == status]
+
+    @property
+    def added(self):
+        return self._status(ADDED)
+
+    @property
+    def removed(self):
+        return self._status(REMOVED)
+
+    @property
+    def modified(self):
+        return self._status(MODIFIED)
+
+    def summary(self):
+        """Number of changes per kind and status.
+        """
+        result = OrderedDict()
+        for change in self.changes:
+            counts = result.setdefault(change.kind, OrderedDict(((ADDED, 0), (REMOVED, 0), (MODIFIED, 0))))
+            counts[change.status] += 1
+        return result
+
+    def as_dict(self):
+        return OrderedDict((
+            ("summary", self.summary()),
+            ("changes", [OrderedDict((("kind", change.kind), ("name", change.name), ("status", change.status),
+                ("deltas", [delta._asdict() for delta in change.deltas]))) for change in self.changes]
+            ),
+        ))
+
+    def __len__(self):
+        return len(self.changes)
+
+    def __repr__(self):
+        return "{}(added = {}, removed = {}, modified = {})".format(self.__class__.__name__, len(self.added),
+            len(self.removed), len(self.modified)
+        )
+
+    __str__ = __repr__
+
+
+def diff(old, new):
+    """Changes from database `old` to database `new`.
+
+    Parameters
+    ----------
+    old: :class:`pya2l.model.A2LDatabase`
+
+    new: :class:`pya2l.model.A2LDatabase`
+
+    Returns
+    -------
+    :class:`Changeset`
+        Removed and modified elements in `old`\\s order, then added elements in `new`\\s order.
+    """
+    before, after = Snapshot(old.session), Snapshot(new.session)
+    old_digests, new_digests = before.digests(), after.digests()
+    changes = []
+    for key, (element, digest) in old_digests.items():
+        other = new_digests.get(key)
+        if other is None:
+            changes.append(Change(element.kind, element.name, REMOVED, []))
+        elif other[1] != digest:
+            changes.append(Change(element.kind, element.name, MODIFIED, deltas(
+                before.content(element.klass.__table__.name, element.rid),
+                after.content(element.klass.__table__.name, other[0].rid)
+            )))
+    for key, (element, digest) in new_digests.items():
+        if key not in old_digests:
+            changes.append(Change(element.kind, element.name, ADDED, []))
+    return Changeset(changes)
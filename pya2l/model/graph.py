@@ -0,0 +1,349 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Function / group hierarchy and dataflow graph.
+
+`FUNCTION`\\s, `GROUP`\\s, `MEASUREMENT`\\s, `CHARACTERISTIC`\\s and `AXIS_PTS` are numbered
+consecutively (node ids), the identifier lists (`SUB_FUNCTION`, `IN_MEASUREMENT`, `REF_CHARACTERISTIC`, ...)
+become one adjacency per list in compressed sparse row form: `targets[offsets[n] : offsets[n + 1]]`
+are the nodes listed by node `n`. Both are :class:`array.array`\\s of unsigned ints, built with one
+query per list; transitive queries are breadth-first searches over them, no SQL involved.
+With NumPy installed every hop of a search expands the whole frontier at once.
+
+Example
+-------
+.. code-block:: python
+
+    from pya2l.model import graph
+
+    g = graph.for_database(db)
+    g.sub_functions("ENGINE")
+    g.downstream("N_ENGINE")    # Measurements computed (transitively) from N_ENGINE.
+    g.groups_containing("KF_IGNITION")
+"""
+
+__copyright__="""
+    pySART - Simplified AUTOSAR-Toolkit for Python.
+
+   (C) 2009-2020 by Christoph Schueler <github.com/Christoph2,
+                                        cpu12.gems@googlemail.com>
+
+   All Rights Reserved
+
+  This program is free software; you can redistribute it and/or modify
+  it under the terms of the GNU General Public License as published by
+  the Free Software Foundation; either version 2 of the License, or
+  (at your option) any later version.
+
+  This program is distributed in the hope that it will be useful,
+  but WITHOUT ANY WARRANTY; without even the implied warranty of
+  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+  GNU General Public License for more details.
+
+  You should have received a copy of the GNU General Public License along
+  with this program; if not, write to the Free Software Foundation, Inc.,
+  51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+"""
+
+from array import array
+from collections import namedtuple, OrderedDict
+import weakref
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from sqlalchemy import select
+
+import pya2l.model as model
+
+
+# Node kinds in node id order.
+NODES = OrderedDict((
+    ("FUNCTION", (model.Function, "name")),
+    ("GROUP", (model.Group, "groupName")),
+    ("MEASUREMENT", (model.Measurement, "name")),
+    ("CHARACTERISTIC", (model.Characteristic, "name")),
+    ("AXIS_PTS", (model.AxisPts, "name")),
+))
+
+KINDS = tuple(NODES)
+
+NAMESPACES = {
+    "FUNCTION": ("FUNCTION", ),
+    "GROUP": ("GROUP", ),
+    "DATA": ("MEASUREMENT", "CHARACTERISTIC", "AXIS_PTS"),
+}
+
+Relation = namedtuple("Relation", "name lists namespace")
+
+# Adjacencies (lower case keywords of model.MEMBER_LISTS) and the namespace their identifiers are looked up in.
+RELATIONS = tuple(Relation(role.lower(), tuple(member_list for member_list in model.MEMBER_LISTS if member_list.role == role),
+    {"SUB_FUNCTION": "FUNCTION", "SUB_GROUP": "GROUP"}.get(role, "DATA"))
+    for role in OrderedDict.fromkeys(member_list.role for member_list in model.MEMBER_LISTS)
+)
+
+
+class Adjacency(object):
+    """Edges of one relation in compressed sparse row form.
+
+    Parameters
+    ----------
+    offsets: :class:`array.array`
+        ``number of nodes + 1`` entries.
+
+    targets: :class:`array.array`
+    """
+
+    def __init__(self, offsets, targets):
+        self.offsets = offsets
+        self.targets = targets
+
+    @classmethod
+    def from_edges(cls, size, sources, targets):
+        """Build from parallel sequences of edges; the order of edges per node is kept.
+        """
+        offsets = array("I", [0]) * (size + 1)
+        for node in sources:
+            offsets[node + 1] += 1
+        for node in range(size):
+            offsets[node + 1] += offsets[node]
+        position = offsets[ : -1]
+        result = array("I", [0]) * len(targets)
+        for node, target in zip(sources, targets):
+            result[position[node]] = target
+            position[node] += 1
+        return cls(offsets, result)
+
+    def neighbours(self, node):
+        return self.targets[self.offsets[node] : self.offsets[node + 1]]
+
+    def gather(self, nodes):
+        """Concatenated neighbours of `nodes` (NumPy array), i.e. one vectorized hop.
+        """
+        offsets = np.frombuffer(self.offsets, dtype = np.uint32)
+        starts = offsets[nodes].astype(np.int64)
+        lengths = offsets[nodes + 1] - starts
+        ends = np.cumsum(lengths)
+        positions = np.arange(ends[-1] if len(ends) else 0) + np.repeat(starts - (ends - lengths), lengths)
+        return np.frombuffer(self.targets, dtype = np.uint32)[positions].astype(np.int64)
+
+    def transposed(self):
+        sources = array("I")
+        offsets = self.offsets
+        for node in range(len(offsets) - 1):
+            sources.extend([node] * (offsets[node + 1] - offsets[node]))
+        return Adjacency.from_edges(len(offsets) - 1, self.targets, sources)
+
+    def __len__(self):
+        return len(self.targets)
+
+
+def new_nodes(nodes, seen):
+    """`nodes` not yet in `seen` (boolean NumPy array), without duplicates; marks them as seen.
+    """
+    mask = np.zeros(len(seen), dtype = bool)
+    mask[nodes] = True
+    mask &= ~seen
+    seen |= mask
+    return np.flatnonzero(mask)
+
+
+class Graph(object):
+    """Function / group graph of a database, see :func:`build`.
+
+    Queries take and return element names; unknown names yield empty results.
+    """
+
+    def __init__(self, kinds, names, relations, roots, unresolved):
+        self.kinds = kinds          # Index into KINDS per node.
+        self.names = names
+        self.relations = relations
+        self.roots = roots
+        self.unresolved = unresolved
+        self._reversed = {}
+        self._index = {}
+        for node, (kind, name) in enumerate(zip(kinds, names)):
+            self._index.setdefault((KINDS[kind], name), node)
+
+    def node(self, namespace, name):
+        """Node id of `name` in `namespace` (``FUNCTION``, ``GROUP`` or ``DATA``), or None.
+        """
+        for kind in NAMESPACES[namespace]:
+            node = self._index.get((kind, name))
+            if node is not None:
+                return node
+        return None
+
+    def kind(self, node):
+        return KINDS[self.kinds[node]]
+
+    def adjacency(self, relation, reverse = False):
+        """:class:`Adjacency` of `relation`, `reverse` lists the containers of each node.
+        """
+        if not reverse:
+            return self.relations[relation]
+        result = self._reversed.get(relation)
+        if result is None:
+            result = self._reversed[relation] = self.relations[relation].transposed()
+        return result
+
+    def step(self, nodes, relations, reverse = False):
+        """Nodes reached from `nodes` by one edge of any of `relations`.
+        """
+        adjacencies = [self.adjacency(relation, reverse) for relation in relations]
+        result = set()
+        for node in nodes:
+            for adjacency in adjacencies:
+                result.update(adjacency.neighbours(node))
+        return result
+
+    def closure(self, nodes, path):
+        """Nodes transitively reachable from `nodes`.
+
+        `path` is a sequence of ``(relations, reverse)`` steps taken in turn for every hop,
+        e.g. readers of a signal, then their outputs, for the downstream dataflow.
+        Every node is expanded at most once per step, so a query is linear in the number of edges.
+        """
+        if np is not None:
+            return self._closure_vectorized(nodes, path)
+        steps = [([self.adjacency(relation, reverse) for relation in relations], bytearray(len(self.names)))
+            for relations, reverse in path
+        ]
+        result = set()
+        frontier = list(nodes)
+        while frontier:
+            for adjacencies, expanded in steps:
+                reached = []
+                for node in frontier:
+                    if expanded[node]:
+                        continue
+                    expanded[node] = 1
+                    for adjacency in adjacencies:
+                        reached.extend(adjacency.targets[adjacency.offsets[node] : adjacency.offsets[node + 1]])
+                frontier = reached
+            frontier = [node for node in frontier if node not in result]
+            result.update(frontier)
+        return result
+
+    def _closure_vectorized(self, nodes, path):
+        size = len(self.names)
+        steps = [([self.adjacency(relation, reverse) for relation in relations], np.zeros(size, dtype = bool))
+            for relations, reverse in path
+        ]
+        result = np.zeros(size, dtype = bool)
+        frontier = np.array(list(nodes), dtype = np.int64)
+        while len(frontier):
+            for adjacencies, expanded in steps:
+                frontier = new_nodes(frontier, expanded)
+                frontier = np.concatenate([adjacency.gather(frontier) for adjacency in adjacencies])
+            frontier = new_nodes(frontier, result)
+        return set(np.flatnonzero(result).tolist())
+
+    def _names(self, nodes):
+        return [self.names[node] for node in sorted(nodes)]
+
+    def sub_functions(self, name, transitive = True):
+        node = self.node("FUNCTION", name)
+        if node is None:
+            return []
+        path = ((("sub_function", ), False), )
+        nodes = self.closure([node], path) if transitive else self.step([node], ("sub_function", ))
+        return self._names(nodes)
+
+    def downstream(self, name):
+        """Signals computed from signal `name`: `OUT_MEASUREMENT`\\s of functions with `name` as `IN_MEASUREMENT`, transitively.
+        """
+        node = self.node("DATA", name)
+        if node is None:
+            return []
+        return self._names(self.closure([node], ((("in_measurement", ), True), (("out_measurement", ), False))))
+
+    def upstream(self, name):
+        """Signals signal `name` is computed from, the reverse of :meth:`downstream`.
+        """
+        node = self.node("DATA", name)
+        if node is None:
+            return []
+        return self._names(self.closure([node], ((("out_measurement", ), True), (("in_measurement", ), False))))
+
+    def groups_containing(self, name, transitive = True):
+        """Groups listing `name` as `REF_MEASUREMENT` or `REF_CHARACTERISTIC`, and (if `transitive`) their super-groups.
+        """
+        node = self.node("DATA", name)
+        if node is None:
+            return []
+        groups = {group for group in self.step([node], ("ref_measurement", "ref_characteristic"), reverse = True)
+            if self.kind(group) == "GROUP"
+        }
+        if transitive:
+            groups |= self.closure(groups, ((("sub_group", ), True), ))
+        return self._names(groups)
+
+    def root_groups(self):
+        """Groups marked as `ROOT`.
+        """
+        return self._names(self.roots)
+
+    def __repr__(self):
+        return "{}(nodes = {}, edges = {})".format(self.__class__.__name__, len(self.names),
+            sum(len(adjacency) for adjacency in self.relations.values())
+        )
+
+    __str__ = __repr__
+
+
+def build(session):
+    """Build the :class:`Graph` of the database `session` is bound to.
+
+    Identifiers naming no element are counted in :attr:`Graph.unresolved` (per relation).
+    """
+    kinds = array("B")
+    names = []
+    rid_nodes = {}
+    for kind, (klass, attribute) in enumerate(NODES.values()):
+        table = klass.__table__
+        nodes = rid_nodes[klass] = {}
+        for rid, name in session.execute(select([table.c.rid, table.c[attribute]]).order_by(table.c.rid)):
+            nodes[rid] = len(names)
+            names.append(name)
+            kinds.append(kind)
+    graph = Graph(kinds, names, {}, set(), {})
+    for relation in RELATIONS:
+        sources = array("I")
+        targets = array("I")
+        missing = 0
+        for member_list in relation.lists:
+            containers = rid_nodes[member_list.container]
+            stmt = member_list.select().with_only_columns([member_list.container.__table__.c.rid,
+                member_list.identifiers.__table__.c.identifier]
+            )
+            for rid, identifier in session.execute(stmt):
+                target = graph.node(relation.namespace, identifier)
+                if target is None:
+                    missing += 1
+                    continue
+                sources.append(containers[rid])
+                targets.append(target)
+        graph.relations[relation.name] = Adjacency.from_edges(len(names), sources, targets)
+        graph.unresolved[relation.name] = missing
+    root = model.Root.__table__
+    groups = rid_nodes[model.Group]
+    graph.roots.update(groups[rid] for rid, in session.execute(select([root.c._group_rid]).where(root.c._group_rid != None))
+        if rid in groups
+    )
+    return graph
+
+
+_graphs = weakref.WeakKeyDictionary()
+
+def for_database(db):
+    """The :class:`Graph` of `db`, built on first use.
+
+    Cached per :class:`pya2l.model.A2LDatabase` object; call :func:`build` after modifying the database.
+    """
+    graph = _graphs.get(db)
+    if graph is None:
+        graph = _graphs[db] = build(db.session)
+    return graph
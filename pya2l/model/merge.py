@@ -0,0 +1,288 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Merge imported databases into one.
+
+All `MODULE`\\s of all sources become one `MODULE` of one `PROJECT`. Top-level elements
+are matched by kind and name (see :mod:`pya2l.model.content`): the first definition is kept,
+identical ones -- typically shared `COMPU_METHOD`\\s, `COMPU_VTAB`\\s, `RECORD_LAYOUT`\\s and
+`UNIT`\\s -- are dropped as duplicates, and differing ones are reported as :class:`Conflict`\\s
+(and dropped as well).
+
+Every source is read with one query per table, the result is written with one bulk ``INSERT``
+per table; afterwards references are resolved and the membership and full-text indices built.
+
+Example
+-------
+.. code-block:: shell
+
+    pya2l merge -o powertrain.a2ldb engine.a2ldb transmission.a2ldb hybrid.a2ldb
+"""
+
+__copyright__="""
+    pySART - Simplified AUTOSAR-Toolkit for Python.
+
+   (C) 2009-2020 by Christoph Schueler <github.com/Christoph2,
+                                        cpu12.gems@googlemail.com>
+
+   All Rights Reserved
+
+  This program is free software; you can redistribute it and/or modify
+  it under the terms of the GNU General Public License as published by
+  the Free Software Foundation; either version 2 of the License, or
+  (at your option) any later version.
+
+  This program is distributed in the hope that it will be useful,
+  but WITHOUT ANY WARRANTY; without even the implied warranty of
+  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+  GNU General Public License for more details.
+
+  You should have received a copy of the GNU General Public License along
+  with this program; if not, write to the Free Software Foundation, Inc.,
+  51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+"""
+
+from collections import Counter, namedtuple, OrderedDict
+
+from sqlalchemy import func, select, text
+
+import pya2l.model as model
+from pya2l.model import search
+from pya2l.model.content import is_key, Snapshot
+
+
+Conflict = namedtuple("Conflict", "kind name kept dropped")
+
+
+class MergeResult(object):
+    """Result of :func:`merge`.
+
+    Attributes
+    ----------
+    copied: OrderedDict
+        Number of top-level elements written, per kind.
+
+    duplicates: OrderedDict
+        Number of identical definitions dropped, per kind.
+
+    conflicts: list of :class:`Conflict`
+        Same kind and name, different definitions; `kept` and `dropped` are database names.
+
+    dangling_references: list of :class:`pya2l.model.DanglingReference`
+    """
+
+    def __init__(self):
+        self.copied = OrderedDict()
+        self.duplicates = OrderedDict()
+        self.conflicts = []
+        self.dangling_references = []
+
+    @property
+    def ok(self):
+        return not self.conflicts
+
+    def as_dict(self):
+        return OrderedDict((
+            ("copied", self.copied),
+            ("duplicates", self.duplicates),
+            ("conflicts", [conflict._asdict() for conflict in self.conflicts]),
+            ("dangling_references", [dangling._asdict() for dangling in self.dangling_references]),
+        ))
+
+    def __repr__(self):
+        return "{}(copied = {}, duplicates = {}, conflicts = {})".format(self.__class__.__name__,
+            sum(self.copied.values()), sum(self.duplicates.values()), len(self.conflicts)
+        )
+
+    __str__ = __repr__
+
+
+class Writer(object):
+    """Rows of several :class:`Snapshot`\\s, renumbered and bulk-inserted into `conn`.
+
+    Parameters
+    ----------
+    conn: SQLAlchemy connection
+        Of the target database.
+
+    tables: OrderedDict
+        Tables written, by name.
+    """
+
+    def __init__(self, conn, tables):
+        self.tables = tables
+        self.rows = {name: [] for name in tables}
+        self.patches = {}
+        self.rids = {}
+        self.next_rid = {}
+        for name, table in tables.items():
+            self.next_rid[name] = (conn.execute(select([func.max(table.c.rid)])).scalar() or 0) + 1
+        self.columns = {name: [self._column(column) for column in table.c] for name, table in tables.items()}
+
+    @staticmethod
+    def _column(column):
+        if column.primary_key:
+            return column.name, None
+        if column.foreign_keys:
+            return column.name, next(iter(column.foreign_keys)).column.table.name
+        if is_key(column) and not column.name.startswith("flat_"):
+            return column.name, False     # Resolved reference, re-resolved after writing.
+        return column.name, True
+
+    def alias(self, source, table_name, rid, new_rid):
+        """Let references to row `rid` of `source` refer to `new_rid`.
+        """
+        self.rids[(source, table_name, rid)] = new_rid
+
+    def add(self, source, snapshot, table_name, rid):
+        """Add row `rid` of `table_name` of `snapshot`; returns its new `rid`.
+        """
+        new_rid = self.rids[(source, table_name, rid)] = self.next_rid[table_name]
+        self.next_rid[table_name] += 1
+        self.rows[table_name].append((source, snapshot.rows[table_name][rid]))
+        return new_rid
+
+    def patch(self, table_name, idx, **values):
+        """Overwrite columns of the `idx`\\th row added to `table_name` (foreign keys as new `rid`\\s).
+        """
+        self.patches.setdefault((table_name, idx), {}).update(values)
+
+    def add_subtree(self, source, snapshot, table_name, rid):
+        for name, child in snapshot.subtree(table_name, rid):
+            self.add(source, snapshot, name, child)
+
+    def write(self, conn):
+        """Insert all rows, one ``executemany`` per table on the DBAPI connection of `conn`.
+        """
+        rids = self.rids
+        quote = conn.dialect.identifier_preparer.quote
+        cursor = conn.connection.cursor()
+        for name, table in self.tables.items():
+            rows = self.rows[name]
+            if not rows:
+                continue
+            columns = self.columns[name]
+            positions = {column: idx for idx, (column, _) in enumerate(columns)}
+            records = []
+            for source, row in rows:
+                record = []
+                for (column, kind), value in zip(columns, row):
+                    if kind is None:
+                        value = rids[(source, name, value)]
+                    elif kind is False:
+                        value = None
+                    elif kind is not True and value is not None:
+                        value = rids.get((source, kind, value))
+                    record.append(value)
+                for column, value in self.patches.get((name, len(records)), {}).items():
+                    record[positions[column]] = value
+                records.append(record)
+            cursor.executemany("INSERT INTO {} ({}) VALUES ({})".format(quote(name),
+                ", ".join(quote(column) for column, _ in columns), ", ".join("?" * len(columns))), records
+            )
+        cursor.close()
+
+
+def merge(sources, target, module_name = None):
+    """Merge databases `sources` into `target`.
+
+    Parameters
+    ----------
+    sources: list of :class:`pya2l.model.A2LDatabase`
+
+    target: :class:`pya2l.model.A2LDatabase`
+        Empty database.
+
+    module_name: str
+        Name of the merged `MODULE`, defaults to the name of the first one.
+
+    Returns
+    -------
+    :class:`MergeResult`
+    """
+    result = MergeResult()
+    snapshots = [Snapshot(source.session) for source in sources]
+    names = [source.dbname or ":memory:" for source in sources]
+    tables = OrderedDict((name, table) for name, table in snapshots[0].schema.tables.items()
+        if name not in (model.MetaData.__tablename__, model.Membership.__tablename__)
+    )
+    target.session.commit()
+    with target.engine.connect() as conn:
+        writer = Writer(conn, tables)
+        _select(snapshots, names, writer, result, module_name)
+        # Rows are written table by table, not in dependency order.
+        conn.execute(text("PRAGMA FOREIGN_KEYS=OFF"))
+        try:
+            with conn.begin():
+                writer.write(conn)
+        finally:
+            conn.execute(text("PRAGMA FOREIGN_KEYS=ON"))
+    target.session.expire_all()
+    result.dangling_references = target.resolve_references()
+    target.index_members()
+    if any(source.denormalized for source in sources):
+        target.denormalize()
+    search.build_index(target.session)
+    return result
+
+
+def _select(snapshots, names, writer, result, module_name):
+    """Add the rows to write to `writer`.
+    """
+    project = model.Project.__tablename__
+    module = model.Module.__tablename__
+    associations = model.IfData.__table__.c._association_id.foreign_keys
+    associations = next(iter(associations)).column.table.name
+    association = list(model.Module.__table__.c.keys()).index("_if_data_association_id")
+    if_data = (associations, model.IfData.__tablename__, list(model.IfData.__table__.c.keys()).index("_association_id"))
+    merged_project = merged_module = merged_association = None
+    elements = [snapshot.keyed_elements() for snapshot in snapshots]
+    shared = Counter(key for keyed in elements for key in keyed)
+    shared = {key for key, count in shared.items() if count > 1}
+    seen = {}
+    for source, snapshot in enumerate(snapshots):
+        for table in (model.Asap2Version, model.A2mlVersion):
+            rows = snapshot.rows[table.__tablename__]
+            if rows and not writer.rows[table.__tablename__]:
+                writer.add(source, snapshot, table.__tablename__, next(iter(rows)))
+        for rid in snapshot.rows[project]:
+            if merged_project is None:
+                writer.add_subtree(source, snapshot, project, rid)
+                merged_project = writer.rids[(source, project, rid)]
+            else:
+                writer.alias(source, project, rid, merged_project)
+        for rid, row in snapshot.rows[module].items():
+            own = row[association]
+            if merged_module is None:
+                writer.add_subtree(source, snapshot, module, rid)
+                merged_module = writer.rids[(source, module, rid)]
+                if own is not None:
+                    merged_association = writer.rids[(source, associations, own)]
+                continue
+            writer.alias(source, module, rid, merged_module)
+            # IF_DATA of further modules are appended to the merged one.
+            if own is None:
+                continue
+            if merged_association is None:
+                writer.add_subtree(source, snapshot, associations, own)
+                merged_association = writer.rids[(source, associations, own)]
+                writer.patch(module, 0, _if_data_association_id = merged_association)
+            else:
+                writer.alias(source, associations, own, merged_association)
+                for child in snapshot.children.get(if_data, {}).get(own, ()):
+                    writer.add_subtree(source, snapshot, model.IfData.__tablename__, child)
+        for key, element in elements[source].items():
+            if element.klass in (model.Project, model.Module):
+                continue
+            first = seen.get(key)
+            if first is None:
+                # Digests are needed only for names defined in several sources.
+                seen[key] = (source, snapshot.digest(element) if key in shared else None)
+                writer.add_subtree(source, snapshot, element.klass.__tablename__, element.rid)
+                result.copied[element.kind] = result.copied.get(element.kind, 0) + 1
+            elif first[1] == snapshot.digest(element):
+                result.duplicates[element.kind] = result.duplicates.get(element.kind, 0) + 1
+            else:
+                result.conflicts.append(Conflict(element.kind, element.name, names[first[0]], names[source]))
+    if module_name is not None and merged_module is not None:
+        writer.patch(module, 0, name = module_name)
@@ -0,0 +1,318 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Newline-delimited JSON: one top-level element per line.
+
+Every line is an object with the keyword (``"kind": "MEASUREMENT"``), the parameters by name and the
+optional elements (see ``__optional_elements__``) by keyword -- an object, or a list of objects for
+elements allowed several times. Lists of identifiers or values become lists of scalars;
+elements of a `MODULE` name it as ``"module"``::
+
+    {"kind": "MEASUREMENT", "module": "ECU", "name": "N", ..., "ECU_ADDRESS": {"address": 4096},
+     "ANNOTATION": [{"ANNOTATION_LABEL": {"label": "doc"}, "ANNOTATION_TEXT": {"text": ["a", "b"]}}]}
+
+:func:`dump` reads chunks of elements of one kind at a time (:class:`pya2l.model.content.Snapshot`),
+:func:`load` inserts batches of lines with one ``executemany`` per table; both run in constant memory.
+"""
+
+__copyright__="""
+    pySART - Simplified AUTOSAR-Toolkit for Python.
+
+   (C) 2009-2020 by Christoph Schueler <github.com/Christoph2,
+                                        cpu12.gems@googlemail.com>
+
+   All Rights Reserved
+
+  This program is free software; you can redistribute it and/or modify
+  it under the terms of the GNU General Public License as published by
+  the Free Software Foundation; either version 2 of the License, or
+  (at your option) any later version.
+
+  This program is distributed in the hope that it will be useful,
+  but WITHOUT ANY WARRANTY; without even the implied warranty of
+  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+  GNU General Public License for more details.
+
+  You should have received a copy of the GNU General Public License along
+  with this program; if not, write to the Free Software Foundation, Inc.,
+  51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+"""
+
+from collections import namedtuple, OrderedDict
+import json
+
+from sqlalchemy import inspect, select
+from sqlalchemy.ext.associationproxy import ASSOCIATION_PROXY
+
+import pya2l.model as model
+from pya2l.model import search
+from pya2l.model.content import KEYWORDS, schema, Snapshot, TOP_LEVEL
+
+
+CHUNK_SIZE = 1000
+
+# Kinds in dump order.
+KINDS = OrderedDict((KEYWORDS[klass], klass) for klass in (model.Asap2Version, model.A2mlVersion) + TOP_LEVEL)
+
+ONE = "one"
+MANY = "many"
+VALUES = "values"
+
+Entry = namedtuple("Entry", "key name mode table column downward association field")
+Entry.__doc__ = """Child elements of a table: content `key` and JSON `name`, the child `table` and the foreign key
+`column` (in the parent if `downward`, else in the child). Elements reached through an association
+table (``ANNOTATION``) have `association` ``(table, column of the parent)``; `field` is the value of `VALUES` lists.
+"""
+
+
+class Format(object):
+    """Mapping between :meth:`Snapshot.content` and JSON objects, per table.
+    """
+
+    def __init__(self, schema):
+        self.schema = schema
+        self.classes = {klass.__table__.name: klass for klass in model.Base._decl_class_registry.values()
+            if hasattr(klass, "__table__")
+        }
+        self.entries = {}
+        for name, edges in schema.edges.items():
+            keywords = {}
+            for element in getattr(self.classes.get(name), "__optional_elements__", ()):
+                klass = getattr(model, element.name, None)
+                if hasattr(klass, "__table__"):
+                    keywords[klass.__table__.name] = (element.keyword_name, element.multiple)
+            # Lists of values are exposed by association proxies, like `FunctionList.name`.
+            proxies = {}
+            klass = self.classes.get(name)
+            if klass is not None:
+                for key, descriptor in inspect(klass).all_orm_descriptors.items():
+                    if descriptor.extension_type is ASSOCIATION_PROXY:
+                        target = getattr(klass, descriptor.target_collection).property.mapper.local_table.name
+                        proxies[target] = (key, descriptor.value_attr)
+            columns = list(schema.tables[name].c.keys())
+            entries = self.entries[name] = []
+            for edge in edges:
+                if edge.downward and edge.table.name in schema.transparent:
+                    association = (edge.table.name, columns[edge.column])
+                    targets = schema.edges[edge.table.name]
+                else:
+                    association = None
+                    targets = [edge]
+                for target in targets:
+                    table = target.table.name
+                    column = (columns if target.downward else list(target.table.c.keys()))[target.column]
+                    if table in keywords:
+                        keyword, multiple = keywords[table]
+                        mode, json_name, field = MANY if multiple else ONE, keyword, None
+                    elif table in proxies:
+                        mode, (json_name, field) = VALUES, proxies[table]
+                    else:
+                        mode, json_name, field = MANY, target.key, None
+                    entries.append(Entry(target.key, json_name, mode, table, column, target.downward, association, field))
+
+    def encode(self, table_name, content):
+        """JSON object of :meth:`Snapshot.content` `content`.
+        """
+        result = OrderedDict()
+        for field in self.schema.fields[table_name]:
+            result[field.name] = content[field.name]
+        for entry in self.entries[table_name]:
+            items = content.get(entry.key)
+            if not items:
+                continue
+            if entry.mode == ONE:
+                result[entry.name] = self.encode(entry.table, items[0])
+            elif entry.mode == MANY:
+                result[entry.name] = [self.encode(entry.table, item) for item in items]
+            else:
+                result[entry.name] = [item[entry.field] for item in items]
+        return result
+
+
+_format = None
+
+def json_format():
+    """:class:`Format` of the model, built on first use.
+    """
+    global _format
+    if _format is None:
+        _format = Format(schema())
+    return _format
+
+
+def dump(db, out, kinds = None, chunk_size = CHUNK_SIZE):
+    """Write all elements of `kinds` (keys of :data:`KINDS`, default all) as lines to text stream `out`.
+
+    Returns
+    -------
+    int
+        Number of lines written.
+    """
+    fmt = json_format()
+    session = db.session
+    modules = dict(session.execute(select([model.Module.__table__.c.rid, model.Module.__table__.c.name])).fetchall())
+    count = 0
+    for kind in kinds or KINDS:
+        klass = KINDS[kind]
+        table = klass.__table__
+        module_column = list(table.c.keys()).index("_module_rid") if "_module_rid" in table.c else None
+        cursor = session.execute(select([table.c.rid]).order_by(table.c.rid)).cursor
+        try:
+            while True:
+                rids = [rid for rid, in cursor.fetchmany(chunk_size)]
+                if not rids:
+                    break
+                snapshot = Snapshot(session, table.name, rids)
+                rows = snapshot.rows[table.name]
+                for rid in rids:
+                    obj = OrderedDict(kind = kind)
+                    if module_column is not None:
+                        obj["module"] = modules.get(rows[rid][module_column])
+                    obj.update(fmt.encode(table.name, snapshot.content(table.name, rid)))
+                    out.write(json.dumps(obj, default = str))
+                    out.write("\n")
+                    count += 1
+        finally:
+            cursor.close()
+    return count
+
+
+class Loader(object):
+    """Rows of JSON objects, buffered per table and written with ``executemany``.
+
+    Parameters
+    ----------
+    db: :class:`pya2l.model.A2LDatabase`
+    """
+
+    def __init__(self, db):
+        self.db = db
+        self.format = json_format()
+        self.tables = self.format.schema.tables
+        self.rows = {name: [] for name in self.tables}
+        conn = db.session.connection()
+        self.next_rid = {name: (conn.execute(select([table.c.rid]).order_by(table.c.rid.desc()).limit(1)).scalar() or 0) + 1
+            for name, table in self.tables.items()
+        }
+        self.defaults = {name: {column.name: column.default.arg for column in table.c
+            if column.default is not None and column.default.is_scalar} for name, table in self.tables.items()
+        }
+        self.project = None
+        self.modules = {}
+        self.module = None
+
+    def add(self, obj):
+        """Add top-level element `obj` (parsed line).
+        """
+        if not isinstance(obj, dict):
+            raise ValueError("expected a JSON object, not {}.".format(type(obj).__name__))
+        kind = obj.get("kind")
+        klass = KINDS.get(kind)
+        if klass is None:
+            raise ValueError("unknown kind {!r}.".format(kind))
+        links = {}
+        if klass is model.Module:
+            links["_project_rid"] = self.project
+        elif "_module_rid" in klass.__table__.c:
+            name = obj.get("module")
+            links["_module_rid"] = self.modules.get(name, self.module) if name is not None else self.module
+        rid = self._insert(klass.__table__.name, obj, links)
+        if klass is model.Project:
+            self.project = rid
+        elif klass is model.Module:
+            self.module = self.modules[obj.get("name")] = rid
+
+    def _rid(self, table_name):
+        rid = self.next_rid[table_name]
+        self.next_rid[table_name] += 1
+        return rid
+
+    def _insert(self, table_name, obj, links):
+        fmt = self.format
+        rid = self._rid(table_name)
+        row = dict(self.defaults[table_name])
+        row.update((field.name, obj[field.name]) for field in fmt.schema.fields[table_name] if field.name in obj)
+        row.update(links)
+        row["rid"] = rid
+        for entry in fmt.entries[table_name]:
+            value = obj.get(entry.name)
+            if value is None:
+                continue
+            if entry.mode == ONE:
+                items = [value]
+            elif entry.mode == MANY:
+                items = value
+            else:
+                items = [{entry.field: item} for item in value]
+            if not items:
+                continue
+            if entry.association:
+                association, column = entry.association
+                owner = row[column] = self._rid(association)
+                self.rows[association].append(dict(self.defaults[association], rid = owner,
+                    discriminator = fmt.classes[table_name].__name__.lower())
+                )
+            elif entry.downward:
+                row[entry.column] = self._insert(entry.table, items[0], {})
+                continue
+            else:
+                owner = rid
+            ordered = entry.table in fmt.schema.ordered
+            for idx, item in enumerate(items):
+                links = {entry.column: owner}
+                if ordered:
+                    links["position"] = idx
+                self._insert(entry.table, item, links)
+        self.rows[table_name].append(row)
+        return rid
+
+    def flush(self):
+        """Write buffered rows, one ``executemany`` per table on the DBAPI connection.
+        """
+        conn = self.db.session.connection()
+        quote = conn.dialect.identifier_preparer.quote
+        cursor = conn.connection.cursor()
+        for name, rows in self.rows.items():
+            if not rows:
+                continue
+            columns = list(self.tables[name].c.keys())
+            cursor.executemany("INSERT INTO {} ({}) VALUES ({})".format(quote(name), ", ".join(quote(column) for column in columns),
+                ", ".join("?" * len(columns))), [[row.get(column) for column in columns] for row in rows]
+            )
+            del rows[:]
+        cursor.close()
+
+
+def load(db, lines, batch_size = CHUNK_SIZE):
+    """Insert the elements of `lines` (e.g. a text file written by :func:`dump`) into `db`.
+
+    References are resolved and the membership and full-text indices built afterwards.
+
+    Returns
+    -------
+    int
+        Number of elements.
+
+    Raises
+    ------
+    ValueError
+        Malformed line or unknown kind (with line number).
+    """
+    loader = Loader(db)
+    count = 0
+    for number, line in enumerate(lines, 1):
+        if not line.strip():
+            continue
+        try:
+            loader.add(json.loads(line, object_pairs_hook = OrderedDict))
+        except ValueError as e:
+            raise ValueError("line {}: {}".format(number, e))
+        count += 1
+        if count % batch_size == 0:
+            loader.flush()
+    loader.flush()
+    db.session.commit()
+    db.resolve_references()
+    db.index_members()
+    search.build_index(db.session)
+    return count
@@ -0,0 +1,169 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Eager-loading profiles.
+
+Optional elements are lazy loaded relationships, so looping over a few thousand
+objects and touching, say, `ecu_address` and `byte_order` issues one query per
+object and attribute. A profile names the relationships a typical use-case needs
+and loads them up-front, i.e. with a handful of queries for the whole result set.
+
+Example
+-------
+.. code-block:: python
+
+    from pya2l.model import profiles
+
+    query = profiles.apply(session.query(model.Measurement), "daq")
+    for meas in query:
+        print(meas.name, meas.ecu_address.address, meas.compu_method.conversionType)
+"""
+
+__copyright__="""
+    pySART - Simplified AUTOSAR-Toolkit for Python.
+
+   (C) 2009-2020 by Christoph Schueler <github.com/Christoph2,
+                                        cpu12.gems@googlemail.com>
+
+   All Rights Reserved
+
+  This program is free software; you can redistribute it and/or modify
+  it under the terms of the GNU General Public License as published by
+  the Free Software Foundation; either version 2 of the License, or
+  (at your option) any later version.
+
+  This program is distributed in the hope that it will be useful,
+  but WITHOUT ANY WARRANTY; without even the implied warranty of
+  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+  GNU General Public License for more details.
+
+  You should have received a copy of the GNU General Public License along
+  with this program; if not, write to the Free Software Foundation, Inc.,
+  51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+"""
+
+from sqlalchemy import orm
+
+import pya2l.model as model
+
+
+COMPU_METHOD = (
+    "compu_method.coeffs",
+    "compu_method.coeffs_linear",
+    "compu_method.compu_tab_ref",
+    "compu_method.formula",
+)
+
+RECORD_LAYOUT = (
+    "record_layout.fnc_values",
+    "record_layout.axis_pts_x",
+    "record_layout.axis_pts_y",
+    "record_layout.no_axis_pts_x",
+    "record_layout.no_axis_pts_y",
+)
+
+PROFILES = {
+    "daq": {
+        model.Measurement: (
+            "ecu_address",
+            "ecu_address_extension",
+            "byte_order",
+            "bit_mask",
+            "array_size",
+            "matrix_dim",
+            "phys_unit",
+        ) + COMPU_METHOD,
+        model.Characteristic: (
+            "ecu_address_extension",
+            "byte_order",
+            "bit_mask",
+        ) + COMPU_METHOD,
+    },
+    "calibration": {
+        model.Characteristic: (
+            "ecu_address_extension",
+            "byte_order",
+            "bit_mask",
+            "extended_limits",
+            "matrix_dim",
+            "number",
+            "phys_unit",
+            "axis_descr.axis_pts_ref",
+            "axis_descr.curve_axis_ref",
+            "axis_descr.extended_limits",
+            "axis_descr.fix_axis_par",
+            "axis_descr.fix_axis_par_dist",
+            "axis_descr.fix_axis_par_list",
+            "axis_descr.compu_method",
+        ) + COMPU_METHOD + RECORD_LAYOUT,
+        model.AxisPts: (
+            "ecu_address_extension",
+            "byte_order",
+            "extended_limits",
+            "phys_unit",
+        ) + COMPU_METHOD + RECORD_LAYOUT,
+    },
+}
+
+
+def _loader(prop):
+    """Collections and name-based references (shared by many parents) are fetched with
+    ``SELECT ... IN``, plain scalar relationships are joined into the parent query.
+    """
+    if prop.uselist or prop.viewonly:
+        return orm.selectinload
+    else:
+        return orm.joinedload
+
+
+def options(klass, profile):
+    """Loader options of `profile` for mapped class `klass`.
+
+    Parameters
+    ----------
+    klass: mapped class, e.g. :class:`pya2l.model.Measurement`
+
+    profile: str
+        Key of :data:`PROFILES`.
+
+    Returns
+    -------
+    list of loader options, to be passed to :meth:`sqlalchemy.orm.Query.options`.
+
+    Raises
+    ------
+    KeyError
+        Unknown profile or `klass` not covered by profile.
+    """
+    if profile not in PROFILES:
+        raise KeyError("Unknown loader profile '{}'.".format(profile))
+    paths = PROFILES[profile].get(klass)
+    if paths is None:
+        raise KeyError("Loader profile '{}' does not cover '{}'.".format(profile, klass.__name__))
+    return [path_option(klass, path) for path in paths]
+
+
+def path_option(klass, path):
+    """Loader option for the dotted relationship `path` (e.g. ``"compu_method.coeffs"``) of `klass`.
+    """
+    current = klass
+    option = None
+    for key in path.split("."):
+        attr = getattr(current, key)
+        loader = _loader(attr.property)
+        option = loader(attr) if option is None else getattr(option, loader.__name__)(attr)
+        current = attr.property.mapper.class_
+    return option
+
+
+def apply(query, profile):
+    """Add loader options of `profile` to `query`.
+
+    The class to load is taken from the first entity of `query`.
+
+    Returns
+    -------
+    :class:`sqlalchemy.orm.Query`
+    """
+    klass = query.column_descriptions[0]["entity"]
+    return query.options(*options(klass, profile))
@@ -0,0 +1,224 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Full-text search.
+
+Names, `longIdentifier`\\s, `DISPLAY_IDENTIFIER`\\s and `ANNOTATION_TEXT`\\s are
+indexed in an SQLite FTS5 table, so searching doesn't scan (and call `REGEXP` on)
+every row. Identifiers are split at underscores, i.e. ``boost pressure`` also
+finds ``BOOST_PRESSURE_ACT``.
+
+The index is built by :meth:`pya2l.DB.import_a2l` or :func:`build_index`; databases without it
+(e.g. created by older versions) are scanned, unranked and without snippets.
+
+Example
+-------
+.. code-block:: python
+
+    from pya2l.model import search
+
+    for hit in search.search(session, "boost pressure", kinds = ("MEASUREMENT", )):
+        print(hit.kind, hit.name, hit.snippet)
+"""
+
+__copyright__="""
+    pySART - Simplified AUTOSAR-Toolkit for Python.
+
+   (C) 2009-2020 by Christoph Schueler <github.com/Christoph2,
+                                        cpu12.gems@googlemail.com>
+
+   All Rights Reserved
+
+  This program is free software; you can redistribute it and/or modify
+  it under the terms of the GNU General Public License as published by
+  the Free Software Foundation; either version 2 of the License, or
+  (at your option) any later version.
+
+  This program is distributed in the hope that it will be useful,
+  but WITHOUT ANY WARRANTY; without even the implied warranty of
+  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+  GNU General Public License for more details.
+
+  You should have received a copy of the GNU General Public License along
+  with this program; if not, write to the Free Software Foundation, Inc.,
+  51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+"""
+
+from collections import namedtuple
+import re
+
+from sqlalchemy import Column, MetaData, Table, types, and_, bindparam, func, or_, select, text
+from sqlalchemy.sql import literal
+
+from pya2l import exceptions
+import pya2l.model as model
+
+
+SearchResult = namedtuple("SearchResult", "kind name rid snippet rank")
+
+Source = namedtuple("Source", "kind klass name long_identifier")
+
+SOURCES = (
+    Source("MEASUREMENT", model.Measurement, "name", "longIdentifier"),
+    Source("CHARACTERISTIC", model.Characteristic, "name", "longIdentifier"),
+    Source("AXIS_PTS", model.AxisPts, "name", "longIdentifier"),
+    Source("FUNCTION", model.Function, "name", "longIdentifier"),
+    Source("GROUP", model.Group, "groupName", "groupLongIdentifier"),
+    Source("COMPU_METHOD", model.CompuMethod, "name", "longIdentifier"),
+)
+
+KINDS = {source.kind: source.klass for source in SOURCES}
+
+INDEX_NAME = "search_index"
+
+# bm25() weights: kind, rid, name, long_identifier, display_identifier, annotation.
+WEIGHTS = (0.0, 0.0, 10.0, 5.0, 5.0, 1.0)
+
+SEARCH_INDEX = Table(INDEX_NAME, MetaData(),
+    Column("kind", types.String),
+    Column("rid", types.Integer),
+    Column("name", types.String),
+    Column("long_identifier", types.String),
+    Column("display_identifier", types.String),
+    Column("annotation", types.String),
+)
+
+
+def _annotations(parent):
+    """Concatenated `ANNOTATION_TEXT`\\s of `parent` (correlated sub-query).
+    """
+    annotation = model.Annotation.__table__
+    annotation_text = model.AnnotationText.__table__
+    values = model.AnnotationTextValues.__table__
+    return select([func.group_concat(values.c.text, " ")]).select_from(
+        annotation.join(annotation_text, annotation_text.c._annotation_rid == annotation.c.rid).
+        join(values, values.c.at_rid == annotation_text.c.rid)
+    ).where(annotation.c._association_id == parent.c._annotation_association_id).as_scalar()
+
+
+def _rows(source):
+    parent = source.klass.__table__
+    columns = parent.c
+    from_ = parent
+    if "display_identifier_id" in columns:
+        display = model.DisplayIdentifier.__table__
+        from_ = parent.outerjoin(display, display.c.rid == columns.display_identifier_id)
+        display_identifier = func.coalesce(columns.flat_display_identifier, display.c.display_name)
+    else:
+        display_identifier = literal(None)
+    if "_annotation_association_id" in columns:
+        annotation = _annotations(parent)
+    else:
+        annotation = literal(None)
+    return select([literal(source.kind).label("kind"), columns.rid, columns[source.name].label("name"),
+        columns[source.long_identifier].label("long_identifier"), display_identifier.label("display_identifier"),
+        annotation.label("annotation")]
+    ).select_from(from_)
+
+
+def has_index(session):
+    return session.execute(text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"),
+        {"name": INDEX_NAME}).first() is not None
+
+
+def build_index(session):
+    """(Re-)build the full-text index from scratch.
+
+    Call again after modifying the database, the index is not updated automatically.
+    """
+    session.execute(text("DROP TABLE IF EXISTS {}".format(INDEX_NAME)))
+    session.execute(text("CREATE VIRTUAL TABLE {} USING fts5(kind UNINDEXED, rid UNINDEXED, name, "
+        "long_identifier, display_identifier, annotation)".format(INDEX_NAME))
+    )
+    for source in SOURCES:
+        session.execute(SEARCH_INDEX.insert().from_select([c.name for c in SEARCH_INDEX.c], _rows(source)))
+    session.commit()
+
+
+def _match_expression(query):
+    """Quote words of a plain query, so characters like `.` or `-` aren't taken as FTS5 operators.
+
+    A trailing `*` is kept as prefix search.
+    """
+    terms = []
+    for word in query.split():
+        prefix = word.endswith("*")
+        word = word.rstrip("*")
+        if word:
+            terms.append('"{}"{}'.format(word.replace('"', '""'), "*" if prefix else ""))
+    return " ".join(terms)
+
+
+def _scan(session, words, kinds, limit):
+    """Search without index: every word is contained in one of the indexed columns; name matches first.
+    """
+    if not words:
+        return []
+    patterns = ["%{}%".format(re.sub(r"([\\%_])", r"\\\1", word)) for word in words]
+    result = []
+    for source in SOURCES:
+        if kinds is not None and source.kind not in kinds:
+            continue
+        rows = _rows(source).alias()
+        columns = (rows.c.name, rows.c.long_identifier, rows.c.display_identifier, rows.c.annotation)
+        stmt = select([rows.c.kind, rows.c.name, rows.c.rid]).where(and_(*(or_(*(column.like(pattern, escape = "\\")
+            for column in columns)) for pattern in patterns))
+        ).order_by(rows.c.rid).limit(limit)
+        result.extend(SearchResult(kind, name, rid, "", 0.0) for kind, name, rid in session.execute(stmt))
+    result.sort(key = lambda hit: not all(word.lower() in hit.name.lower() for word in words))
+    return result[ : limit]
+
+
+def search(session, query, kinds = None, limit = 50, raw = False, markers = ("[", "]")):
+    """Ranked full-text search.
+
+    Without index (see :func:`build_index`) the tables are scanned instead; results are not ranked
+    (apart from name matches first) and have no snippets.
+
+    Parameters
+    ----------
+    session: SQLAlchemy session
+
+    query: str
+        Words to search for (all of them must match).
+
+    kinds: iterable of str or None
+        Restrict results to keys of :data:`KINDS`, like ``("MEASUREMENT", "CHARACTERISTIC")``.
+
+    limit: int
+        Maximum number of results.
+
+    raw: bool
+        `query` uses `FTS5 query syntax <https://www.sqlite.org/fts5.html#full_text_query_syntax>`_.
+
+    markers: (str, str)
+        Highlight matches within snippets.
+
+    Returns
+    -------
+    list of :class:`SearchResult`
+        Best matches first; use :data:`KINDS` and `rid` to fetch the objects.
+
+    Raises
+    ------
+    :class:`pya2l.exceptions.StructuralError`
+        `raw` query, but no index.
+    """
+    expression = query if raw else _match_expression(query)
+    if not expression:
+        return []
+    if not has_index(session):
+        if raw:
+            raise exceptions.StructuralError("FTS5 queries need the full-text index, see build_index().")
+        return _scan(session, re.findall(r"\w+", query), kinds, limit)
+    where = "{} MATCH :expression".format(INDEX_NAME)
+    params = {"expression": expression, "limit": limit, "start": markers[0], "end": markers[1]}
+    if kinds is not None:
+        where += " AND kind IN :kinds"
+        params["kinds"] = list(kinds)
+    stmt = text("SELECT kind, name, rid, snippet({0}, -1, :start, :end, '...', 12), bm25({0}, {1}) AS rank "
+        "FROM {0} WHERE {2} ORDER BY rank LIMIT :limit".format(INDEX_NAME, ", ".join(str(w) for w in WEIGHTS), where)
+    )
+    if kinds is not None:
+        stmt = stmt.bindparams(bindparam("kinds", expanding = True))
+    return [SearchResult(*row) for row in session.execute(stmt, params)]
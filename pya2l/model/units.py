@@ -0,0 +1,305 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Unit algebra: dimensions of `UNIT`\\s and conversion of physical values between them.
+
+Every unit is resolved to a :class:`Canonical` form -- its :class:`Dimension` (the `SI_EXPONENTS`)
+and the affine map to the coherent SI unit of that dimension, ``si = scale * value + offset``:
+
+- `SI_EXPONENTS` without `REF_UNIT` define the dimension, with ``scale = 1, offset = 0``.
+- `REF_UNIT` refers to another unit; `UNIT_CONVERSION` ``gradient offset`` converts values of the
+  referenced unit into this one (``value = gradient * referenced + offset``, identity if missing).
+  Dimension and map follow from the referenced unit.
+
+`REF_UNIT` chains are followed once per unit, every unit on the way is memoized; converters between
+two units are composed into a single ``gradient * value + offset`` and cached per pair. Arrays are
+converted in one vectorized operation if NumPy is installed.
+
+Example
+-------
+.. code-block:: python
+
+    from pya2l.model import units
+
+    u = units.for_database(db)
+    u.compatible("degC", "K")                   # True
+    u.convert([0.0, 100.0], "degC", "K")        # array([273.15, 373.15])
+    u.dimension("km/h") == units.LENGTH / units.TIME
+"""
+
+__copyright__="""
+    pySART - Simplified AUTOSAR-Toolkit for Python.
+
+   (C) 2009-2020 by Christoph Schueler <github.com/Christoph2,
+                                        cpu12.gems@googlemail.com>
+
+   All Rights Reserved
+
+  This program is free software; you can redistribute it and/or modify
+  it under the terms of the GNU General Public License as published by
+  the Free Software Foundation; either version 2 of the License, or
+  (at your option) any later version.
+
+  This program is distributed in the hope that it will be useful,
+  but WITHOUT ANY WARRANTY; without even the implied warranty of
+  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+  GNU General Public License for more details.
+
+  You should have received a copy of the GNU General Public License along
+  with this program; if not, write to the Free Software Foundation, Inc.,
+  51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+"""
+
+from collections import namedtuple, OrderedDict
+import numbers
+import weakref
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from sqlalchemy import select
+
+from pya2l import exceptions
+import pya2l.model as model
+
+
+EXPONENTS = ("length", "mass", "time", "electricCurrent", "temperature", "amountOfSubstance", "luminousIntensity")
+
+
+class Dimension(namedtuple("Dimension", EXPONENTS)):
+    """SI exponents; multiplied, divided and raised to integer powers like the quantities they describe.
+    """
+
+    __slots__ = ()
+
+    def __mul__(self, other):
+        return Dimension(*(a + b for a, b in zip(self, other)))
+
+    def __truediv__(self, other):
+        return Dimension(*(a - b for a, b in zip(self, other)))
+
+    def __pow__(self, exponent):
+        return Dimension(*(a * exponent for a in self))
+
+    @property
+    def dimensionless(self):
+        return not any(self)
+
+    def __str__(self):
+        symbols = ("m", "kg", "s", "A", "K", "mol", "cd")
+        result = " ".join(symbol if exponent == 1 else "{}^{}".format(symbol, exponent)
+            for symbol, exponent in zip(symbols, self) if exponent
+        )
+        return result or "1"
+
+
+DIMENSIONLESS = Dimension(0, 0, 0, 0, 0, 0, 0)
+LENGTH = Dimension(1, 0, 0, 0, 0, 0, 0)
+MASS = Dimension(0, 1, 0, 0, 0, 0, 0)
+TIME = Dimension(0, 0, 1, 0, 0, 0, 0)
+ELECTRIC_CURRENT = Dimension(0, 0, 0, 1, 0, 0, 0)
+TEMPERATURE = Dimension(0, 0, 0, 0, 1, 0, 0)
+AMOUNT_OF_SUBSTANCE = Dimension(0, 0, 0, 0, 0, 1, 0)
+LUMINOUS_INTENSITY = Dimension(0, 0, 0, 0, 0, 0, 1)
+
+Canonical = namedtuple("Canonical", "dimension scale offset")
+
+Definition = namedtuple("Definition", "name display type exponents ref_unit gradient offset")
+Definition.__doc__ = """`UNIT` as stored: `exponents` a :class:`Dimension` or None, `ref_unit` a name or None,
+`gradient` and `offset` of `UNIT_CONVERSION` or None.
+"""
+
+
+class Units(object):
+    """Units of a database, see :func:`build`.
+
+    Parameters
+    ----------
+    definitions: iterable of :class:`Definition`
+        The first definition of a name wins.
+
+    conversions: dict
+        `COMPU_METHOD` name -> name of its `REF_UNIT`.
+    """
+
+    def __init__(self, definitions, conversions = None):
+        self.definitions = OrderedDict()
+        for definition in definitions:
+            self.definitions.setdefault(definition.name, definition)
+        self.conversions = conversions or {}
+        self._canonical = {}
+        self._problems = {}
+        self._converters = {}
+
+    def _resolve(self, name):
+        """Follow the `REF_UNIT` chain of `name` up to a resolved unit or `SI_EXPONENTS`, memoizing all units on the way.
+        """
+        path = []
+        base = problem = None
+        current = name
+        while True:
+            if current in self._canonical:
+                base = self._canonical[current]
+                break
+            if current in self._problems:
+                problem = self._problems[current]
+                break
+            definition = self.definitions.get(current)
+            if definition is None:
+                problem = "unknown unit '{}'.".format(current)
+                break
+            if definition in path:
+                problem = "circular REF_UNIT chain of '{}'.".format(current)
+                break
+            path.append(definition)
+            if definition.ref_unit is None:
+                if definition.exponents is None:
+                    problem = "unit '{}' has neither SI_EXPONENTS nor REF_UNIT.".format(current)
+                else:
+                    base = Canonical(definition.exponents, 1.0, 0.0)    # The coherent SI unit.
+                break
+            current = definition.ref_unit
+        for definition in reversed(path):
+            if problem is None and definition.gradient is not None:
+                if not definition.gradient:
+                    problem = "UNIT_CONVERSION of '{}' has gradient 0.".format(definition.name)
+                else:
+                    offset = definition.offset or 0.0
+                    base = Canonical(base.dimension, base.scale / definition.gradient,
+                        base.offset - base.scale * offset / definition.gradient
+                    )
+            if problem is None:
+                self._canonical[definition.name] = base
+            else:
+                self._problems[definition.name] = problem
+
+    def canonical(self, name):
+        """:class:`Canonical` form of unit `name`.
+
+        Raises
+        ------
+        :class:`pya2l.exceptions.StructuralError`
+            Unknown unit, or the unit can't be resolved (see :meth:`problems`).
+        """
+        result = self._canonical.get(name)
+        if result is None:
+            if name not in self._problems:
+                self._resolve(name)
+            result = self._canonical.get(name)
+            if result is None:
+                raise exceptions.StructuralError(self._problems.get(name, "unknown unit '{}'.".format(name)))
+        return result
+
+    def dimension(self, name):
+        return self.canonical(name).dimension
+
+    def compatible(self, a, b):
+        """Have units `a` and `b` the same dimension? False if either can't be resolved.
+        """
+        try:
+            return self.canonical(a).dimension == self.canonical(b).dimension
+        except exceptions.StructuralError:
+            return False
+
+    def converter(self, source, target):
+        """``(gradient, offset)`` converting values of `source` into `target`: ``target = gradient * source + offset``; cached.
+
+        Raises
+        ------
+        :class:`pya2l.exceptions.MathError`
+            Units of different dimensions.
+
+        :class:`pya2l.exceptions.StructuralError`
+            See :meth:`canonical`.
+        """
+        result = self._converters.get((source, target))
+        if result is None:
+            a, b = self.canonical(source), self.canonical(target)
+            if a.dimension != b.dimension:
+                raise exceptions.MathError("can't convert '{}' [{}] into '{}' [{}].".format(source, a.dimension, target,
+                    b.dimension)
+                )
+            result = self._converters[(source, target)] = (a.scale / b.scale, (a.offset - b.offset) / b.scale)
+        return result
+
+    def convert(self, values, source, target):
+        """Convert `values` (number, or sequence / array of numbers) from unit `source` into `target`.
+
+        Returns
+        -------
+        float, :class:`numpy.ndarray` (or list without NumPy)
+        """
+        gradient, offset = self.converter(source, target)
+        if isinstance(values, numbers.Number):
+            return gradient * values + offset
+        if np is not None:
+            return np.asarray(values, dtype = np.float64) * gradient + offset
+        return [gradient * value + offset for value in values]
+
+    def units_of(self, dimension):
+        """Names of all resolvable units of `dimension`.
+        """
+        problems = self.problems()
+        return [name for name in self.definitions if name not in problems and self._canonical[name].dimension == dimension]
+
+    def unit_of_conversion(self, name):
+        """Unit (`REF_UNIT`) of `COMPU_METHOD` `name`, or None.
+        """
+        return self.conversions.get(name)
+
+    def problems(self):
+        """Units that can't be resolved.
+
+        Returns
+        -------
+        OrderedDict
+            Unit name -> message.
+        """
+        for name in self.definitions:
+            if name not in self._canonical and name not in self._problems:
+                self._resolve(name)
+        return OrderedDict((name, self._problems[name]) for name in self.definitions if name in self._problems)
+
+    def __repr__(self):
+        return "{}(units = {})".format(self.__class__.__name__, len(self.definitions))
+
+    __str__ = __repr__
+
+
+def build(session):
+    """Build the :class:`Units` of the database `session` is bound to, with one query.
+    """
+    unit = model.Unit.__table__
+    ref_unit = model.RefUnit.__table__
+    si = model.SiExponents.__table__
+    conversion = model.UnitConversion.__table__
+    stmt = select([unit.c.name, unit.c.display, unit.c.type, ref_unit.c.unit, conversion.c.gradient, conversion.c.offset]
+        + [si.c[exponent] for exponent in EXPONENTS]
+    ).select_from(unit.outerjoin(ref_unit, ref_unit.c.rid == unit.c.ref_unit_id)
+        .outerjoin(si, si.c._unit_rid == unit.c.rid)
+        .outerjoin(conversion, conversion.c._unit_rid == unit.c.rid)
+    ).order_by(unit.c.rid)
+    definitions = []
+    for name, display, type_, ref, gradient, offset, *exponents in session.execute(stmt):
+        exponents = None if all(exponent is None for exponent in exponents) else Dimension(*(exponent or 0 for exponent in exponents))
+        definitions.append(Definition(name, display, type_, exponents, ref, gradient, offset))
+    compu_method = model.CompuMethod.__table__
+    stmt = select([compu_method.c.name, ref_unit.c.unit]).select_from(
+        compu_method.join(ref_unit, ref_unit.c.rid == compu_method.c.ref_unit_id)
+    )
+    return Units(definitions, dict(session.execute(stmt).fetchall()))
+
+
+_units = weakref.WeakKeyDictionary()
+
+def for_database(db):
+    """The :class:`Units` of `db`, built on first use.
+
+    Cached per :class:`pya2l.model.A2LDatabase` object; call :func:`build` after modifying the database.
+    """
+    units = _units.get(db)
+    if units is None:
+        units = _units[db] = build(db.session)
+    return units
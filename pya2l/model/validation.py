@@ -0,0 +1,403 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Consistency checks.
+
+Every rule is a handful of set-based queries over a whole table, never a walk over
+ORM objects, so validating projects with hundreds of thousands of elements takes seconds.
+Independent rules run in parallel, each on its own read-only connection (file based
+databases only).
+
+Example
+-------
+.. code-block:: python
+
+    from pya2l.model import validation
+
+    report = validation.validate(db)
+    for finding in report.errors:
+        print(finding.kind, finding.name, finding.message)
+"""
+
+__copyright__="""
+    pySART - Simplified AUTOSAR-Toolkit for Python.
+
+   (C) 2009-2020 by Christoph Schueler <github.com/Christoph2,
+                                        cpu12.gems@googlemail.com>
+
+   All Rights Reserved
+
+  This program is free software; you can redistribute it and/or modify
+  it under the terms of the GNU General Public License as published by
+  the Free Software Foundation; either version 2 of the License, or
+  (at your option) any later version.
+
+  This program is distributed in the hope that it will be useful,
+  but WITHOUT ANY WARRANTY; without even the implied warranty of
+  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+  GNU General Public License for more details.
+
+  You should have received a copy of the GNU General Public License along
+  with this program; if not, write to the Free Software Foundation, Inc.,
+  51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+"""
+
+from collections import namedtuple, OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+import os
+import time
+
+from sqlalchemy import and_, exists, func, not_, or_, select, union_all
+from sqlalchemy.sql import case, literal
+
+import pya2l.model as model
+
+
+ERROR = "error"
+WARNING = "warning"
+
+Finding = namedtuple("Finding", "rule severity kind rid name message")
+
+Rule = namedtuple("Rule", "name description function")
+
+RULES = OrderedDict()
+
+KEYWORDS = {klass: keyword for keyword, klass in model.KEYWORD_MAP.items()}
+
+TABLE_KEYWORDS = {klass.__table__.name: keyword for keyword, klass in model.KEYWORD_MAP.items() if hasattr(klass, "__table__")}
+
+# Elements sharing a namespace, names must be unique per namespace and MODULE.
+NAMESPACES = OrderedDict((
+    ("data", ((model.Measurement, "name"), (model.Characteristic, "name"), (model.AxisPts, "name"))),
+    ("conversion", ((model.CompuMethod, "name"), )),
+    ("conversion table", ((model.CompuTab, "name"), (model.CompuVtab, "name"), (model.CompuVtabRange, "name"))),
+    ("record layout", ((model.RecordLayout, "name"), )),
+    ("function", ((model.Function, "name"), )),
+    ("group", ((model.Group, "groupName"), )),
+    ("unit", ((model.Unit, "name"), )),
+    ("frame", ((model.Frame, "name"), )),
+))
+
+DATATYPE_RANGES = OrderedDict((
+    ("UBYTE", (0, 255)),
+    ("SBYTE", (-128, 127)),
+    ("UWORD", (0, 65535)),
+    ("SWORD", (-32768, 32767)),
+    ("ULONG", (0, 4294967295)),
+    ("SLONG", (-2147483648, 2147483647)),
+    ("A_UINT64", (0, 1.8446744073709552e+19)),      # Limits are floats anyway.
+    ("A_INT64", (-9.223372036854776e+18, 9.223372036854776e+18)),
+    ("FLOAT32_IEEE", (-3.4028234663852886e+38, 3.4028234663852886e+38)),
+))
+
+
+def rule(name):
+    """Register the decorated function as rule `name`.
+
+    Rules take a session and yield ``(severity, kind, rid, name, message)`` tuples;
+    the first line of the docstring describes the rule.
+    """
+    def decorator(function):
+        RULES[name] = Rule(name, function.__doc__.strip().splitlines()[0], function)
+        return function
+    return decorator
+
+
+def element_name(table):
+    return table.c.name if "name" in table.c else literal(None)
+
+
+class Report(object):
+    """Findings of a :func:`validate` run.
+
+    Parameters
+    ----------
+    findings: list of :class:`Finding`
+
+    timings: dict
+        Rule name -> seconds.
+    """
+
+    def __init__(self, findings, timings):
+        self.findings = findings
+        self.timings = timings
+
+    @property
+    def errors(self):
+        return [finding for finding in self.findings if finding.severity == ERROR]
+
+    @property
+    def warnings(self):
+        return [finding for finding in self.findings if finding.severity == WARNING]
+
+    @property
+    def ok(self):
+        """No errors (warnings don't count).
+        """
+        return not self.errors
+
+    def counts(self):
+        """Number of findings per rule.
+        """
+        result = OrderedDict((name, 0) for name in self.timings)
+        for finding in self.findings:
+            result[finding.rule] += 1
+        return result
+
+    def as_dict(self):
+        counts = self.counts()
+        return OrderedDict((
+            ("ok", self.ok),
+            ("errors", len(self.errors)),
+            ("warnings", len(self.warnings)),
+            ("rules", OrderedDict((name, OrderedDict((("findings", counts[name]), ("seconds", round(seconds, 3)))))
+                for name, seconds in self.timings.items())
+            ),
+            ("findings", [finding._asdict() for finding in self.findings]),
+        ))
+
+    def __len__(self):
+        return len(self.findings)
+
+    def __repr__(self):
+        return "{}(errors = {}, warnings = {})".format(self.__class__.__name__, len(self.errors), len(self.warnings))
+
+    __str__ = __repr__
+
+
+@rule("duplicate-names")
+def duplicate_names(session):
+    """Names defined more than once per namespace and MODULE.
+    """
+    for namespace, members in NAMESPACES.items():
+        elements = union_all(*[select([literal(KEYWORDS[klass]).label("kind"), klass.__table__.c.rid,
+            klass.__table__.c[attribute].label("name"), klass.__table__.c._module_rid.label("module")])
+            for klass, attribute in members]
+        ).alias("elements")
+        duplicates = select([elements.c.module, elements.c.name, func.count().label("count")]).\
+            group_by(elements.c.module, elements.c.name).having(func.count() > 1).alias("duplicates")
+        stmt = select([elements.c.kind, elements.c.rid, elements.c.name, duplicates.c.count]).select_from(
+            elements.join(duplicates, and_(elements.c.name == duplicates.c.name, elements.c.module.is_(duplicates.c.module)))
+        ).order_by(elements.c.name, elements.c.kind, elements.c.rid)
+        for kind, rid, name, count in session.execute(stmt):
+            yield ERROR, kind, rid, name, "'{}' is defined {} times in the {} namespace.".format(name, count, namespace)
+
+
+@rule("unresolved-references")
+def unresolved_references(session):
+    """Names referring to elements that don't exist (see :data:`pya2l.model.REFERENCES`).
+
+    `deposit` is left to rule ``record-layouts``.
+    """
+    groups = OrderedDict()
+    for reference in model.REFERENCES:
+        if reference.attribute != "deposit":
+            groups.setdefault((reference.klass, reference.attribute), []).append(reference.target)
+    for (klass, attribute), targets in groups.items():
+        table = klass.__table__
+        value = table.c[attribute]
+        stmt = select([table.c.rid, element_name(table), value]).where(and_(value != None,
+            ~value.in_(model.NO_REFERENCE),
+            *[~exists().where(target.__table__.c.name == value) for target in targets])
+        ).order_by(table.c.rid)
+        for rid, name, ref in session.execute(stmt):
+            yield ERROR, KEYWORDS[klass], rid, name, "{} '{}' not found.".format(attribute, ref)
+
+
+@rule("axis-descriptions")
+def axis_descriptions(session):
+    """`CURVE_AXIS`, `COM_AXIS` and `FIX_AXIS` descriptions lacking (or wrongly having) their elements.
+    """
+    axis = model.AxisDescr.__table__
+    curve_ref = model.CurveAxisRef.__table__
+    pts_ref = model.AxisPtsRef.__table__
+    chx = model.Characteristic.__table__
+    characteristic = select([chx.c.name]).where(chx.c.rid == axis.c._characteristic_rid).as_scalar()
+    has_curve_ref = exists().where(curve_ref.c._axis_descr_rid == axis.c.rid)
+    has_pts_ref = exists().where(pts_ref.c._axis_descr_rid == axis.c.rid)
+    has_fix_par = or_(*[exists().where(klass.__table__.c._axis_descr_rid == axis.c.rid)
+        for klass in (model.FixAxisPar, model.FixAxisParDist, model.FixAxisParList)]
+    )
+    checks = (
+        (ERROR, and_(axis.c.attribute == "CURVE_AXIS", ~has_curve_ref), "CURVE_AXIS without CURVE_AXIS_REF."),
+        (ERROR, and_(axis.c.attribute == "CURVE_AXIS", axis.c.conversion != "NO_COMPU_METHOD"),
+            "CURVE_AXIS have no input conversion, use 'NO_COMPU_METHOD' for argument 'conversion'."),
+        (WARNING, and_(axis.c.attribute != "CURVE_AXIS", has_curve_ref), "CURVE_AXIS_REF ignored, axis is no CURVE_AXIS."),
+        (ERROR, and_(axis.c.attribute == "COM_AXIS", ~has_pts_ref), "COM_AXIS without AXIS_PTS_REF."),
+        (WARNING, and_(axis.c.attribute != "COM_AXIS", has_pts_ref), "AXIS_PTS_REF ignored, axis is no COM_AXIS."),
+        (ERROR, and_(axis.c.attribute == "FIX_AXIS", ~has_fix_par),
+            "FIX_AXIS without FIX_AXIS_PAR, FIX_AXIS_PAR_DIST or FIX_AXIS_PAR_LIST."),
+    )
+    for severity, condition, message in checks:
+        for rid, name in session.execute(select([axis.c.rid, characteristic]).where(condition).order_by(axis.c.rid)):
+            yield severity, "AXIS_DESCR", rid, name, message
+    curves = exists().where(and_(chx.c.name == curve_ref.c.curveAxis, chx.c.type == "CURVE"))
+    stmt = select([axis.c.rid, characteristic, curve_ref.c.curveAxis]).select_from(
+        axis.join(curve_ref, curve_ref.c._axis_descr_rid == axis.c.rid)
+    ).where(~curves).order_by(axis.c.rid)
+    for rid, name, curve_axis in session.execute(stmt):
+        yield ERROR, "AXIS_DESCR", rid, name, "CURVE_AXIS_REF '{}' is no CURVE characteristic.".format(curve_axis)
+
+
+def dimensions(matrix_dim):
+    """Number of values described by `matrix_dim` (unused dimensions are 0 or 1).
+    """
+    return func.max(matrix_dim.c.xDim, 1) * func.max(matrix_dim.c.yDim, 1) * func.max(matrix_dim.c.zDim, 1)
+
+
+@rule("number-matrix-dim")
+def number_matrix_dim(session):
+    """`NUMBER` / `ARRAY_SIZE` contradicting `MATRIX_DIM`, and `VAL_BLK`\\s without either.
+    """
+    dim = model.MatrixDim.__table__
+    for klass, child in ((model.Characteristic, model.Number), (model.Measurement, model.ArraySize)):
+        table = klass.__table__
+        count = child.__table__
+        parent = count.c["_{}_rid".format(table.name)]
+        stmt = select([table.c.rid, table.c.name, count.c.number, dim.c.xDim, dim.c.yDim, dim.c.zDim]).select_from(
+            table.join(count, parent == table.c.rid).join(dim, dim.c.rid == table.c.matrix_dim_id)
+        ).where(count.c.number != dimensions(dim)).order_by(table.c.rid)
+        for rid, name, number, x, y, z in session.execute(stmt):
+            yield ERROR, KEYWORDS[klass], rid, name, "{} {} contradicts MATRIX_DIM {} {} {}.".format(
+                KEYWORDS[child], number, x, y, z
+            )
+    chx = model.Characteristic.__table__
+    number = model.Number.__table__
+    stmt = select([chx.c.rid, chx.c.name]).where(and_(chx.c.type == "VAL_BLK", chx.c.matrix_dim_id == None,
+        ~exists().where(number.c._characteristic_rid == chx.c.rid))
+    ).order_by(chx.c.rid)
+    for rid, name in session.execute(stmt):
+        yield ERROR, "CHARACTERISTIC", rid, name, "VAL_BLK without NUMBER or MATRIX_DIM."
+
+
+def raw_valued(table):
+    """Condition: physical values of `table` are raw values, i.e. no or an identical conversion.
+    """
+    cm = model.CompuMethod.__table__
+    return or_(table.c.conversion == "NO_COMPU_METHOD",
+        exists().where(and_(cm.c.name == table.c.conversion, cm.c.conversionType == "IDENTICAL"))
+    )
+
+
+@rule("limits")
+def limits(session):
+    """Limits outside the range of their datatype, swapped limits and integers exceeding their column type.
+    """
+    for klass in (model.Measurement, model.Characteristic, model.AxisPts, model.AxisDescr):
+        table = klass.__table__
+        stmt = select([table.c.rid, element_name(table), table.c.lowerLimit, table.c.upperLimit]).\
+            where(table.c.lowerLimit > table.c.upperLimit).order_by(table.c.rid)
+        for rid, name, lower, upper in session.execute(stmt):
+            yield ERROR, KEYWORDS[klass], rid, name, "lowerLimit {} exceeds upperLimit {}.".format(lower, upper)
+    meas = model.Measurement.__table__
+    chx = model.Characteristic.__table__
+    layout = model.RecordLayout.__table__
+    values = model.FncValues.__table__
+    sources = (
+        ("MEASUREMENT", meas, meas.c.datatype, meas),
+        ("CHARACTERISTIC", chx, values.c.datatype, chx.join(layout, layout.c.name == chx.c.deposit).
+            join(values, values.c._record_layout_rid == layout.c.rid)),
+    )
+    for kind, table, datatype, from_obj in sources:
+        lowest = case([(datatype == name, lo) for name, (lo, hi) in DATATYPE_RANGES.items()])
+        highest = case([(datatype == name, hi) for name, (lo, hi) in DATATYPE_RANGES.items()])
+        stmt = select([table.c.rid, table.c.name, datatype, table.c.lowerLimit, table.c.upperLimit]).\
+            select_from(from_obj).where(and_(raw_valued(table),
+            or_(table.c.lowerLimit < lowest, table.c.upperLimit > highest))
+        ).order_by(table.c.rid)
+        for rid, name, type_, lower, upper in session.execute(stmt):
+            yield ERROR, kind, rid, name, "limits [{}, {}] exceed range of {}.".format(lower, upper, type_)
+    for table in model.Base.metadata.sorted_tables:
+        ranged = [column for column in table.c if "range" in column.info]
+        if not ranged:
+            continue
+        stmt = select([table.c.rid, element_name(table)] + ranged).where(or_(*[not_(column.between(*column.info["range"]))
+            for column in ranged])
+        ).order_by(table.c.rid)
+        for row in session.execute(stmt):
+            for column, value in zip(ranged, row[2 : ]):
+                lo, hi = column.info["range"]
+                if not lo <= value <= hi:
+                    yield ERROR, TABLE_KEYWORDS.get(table.name, table.name), row[0], row[1], "{} {} not in [{}, {}].".format(
+                        column.name, value, lo, hi
+                    )
+
+
+@rule("record-layouts")
+def record_layouts(session):
+    """`deposit`\\s naming no `RECORD_LAYOUT`, and layouts without `FNC_VALUES` / `AXIS_PTS_X`.
+    """
+    layout = model.RecordLayout.__table__
+    for klass, required in ((model.Characteristic, model.FncValues), (model.AxisPts, model.AxisPtsX)):
+        table = klass.__table__
+        stmt = select([table.c.rid, table.c.name, table.c.deposit]).where(
+            ~exists().where(layout.c.name == table.c.deposit)
+        ).order_by(table.c.rid)
+        for rid, name, deposit in session.execute(stmt):
+            yield ERROR, KEYWORDS[klass], rid, name, "RECORD_LAYOUT '{}' not found.".format(deposit)
+        child = required.__table__
+        stmt = select([table.c.rid, table.c.name, layout.c.name]).select_from(
+            table.join(layout, layout.c.name == table.c.deposit)
+        ).where(~exists().where(child.c._record_layout_rid == layout.c.rid)).order_by(table.c.rid)
+        for rid, name, deposit in session.execute(stmt):
+            yield ERROR, KEYWORDS[klass], rid, name, "RECORD_LAYOUT '{}' has no {}.".format(deposit, KEYWORDS[required])
+
+
+def run_rule(rule, session):
+    start = time.perf_counter()
+    findings = [Finding(rule.name, *issue) for issue in rule.function(session)]
+    return findings, time.perf_counter() - start
+
+
+def validate(db, rules = None, jobs = None):
+    """Run consistency `rules` on `db`.
+
+    Parameters
+    ----------
+    db: :class:`pya2l.model.A2LDatabase`
+
+    rules: iterable of str
+        Names of the rules to run (see :data:`RULES`), default all.
+
+    jobs: int
+        Rules running in parallel, default: one per rule (up to the number of CPUs).
+        In-memory databases are always validated sequentially.
+
+    :attr:`pya2l.model.A2LDatabase.session` is neither committed nor closed: file based
+    databases are validated as committed, in-memory databases as flushed.
+
+    Returns
+    -------
+    :class:`Report`
+
+    Raises
+    ------
+    KeyError
+        Unknown rule.
+    """
+    selected = [RULES[name] for name in rules] if rules is not None else list(RULES.values())
+    jobs = min(len(selected), jobs or os.cpu_count() or 1)
+    if db.dbname:
+        created = db._read_sessions is None
+        db.create_read_sessions(pool_size = jobs)
+
+        def task(rule):
+            with db.read_session() as session:
+                return run_rule(rule, session)
+
+        try:
+            with ThreadPoolExecutor(max_workers = jobs) as executor:
+                results = list(executor.map(task, selected))
+        finally:
+            if created:
+                db.close_read_sessions()
+    else:
+        # In-memory databases exist only in the connection of db.session, just read through it.
+        connection = db.session.connection()
+        results = [run_rule(rule, connection) for rule in selected]
+    findings = []
+    timings = OrderedDict()
+    for rule, (rule_findings, seconds) in zip(selected, results):
+        findings.extend(rule_findings)
+        timings[rule.name] = seconds
+    return Report(findings, timings)
@@ -0,0 +1,466 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Variant coding: valid criterion combinations and per-variant addresses and names.
+
+A `VARIANT_CODING` defines criteria (`VAR_CRITERION`, e.g. ``Car``: ``Limousine Kombi Cabrio``)
+and forbidden combinations of their values (`VAR_FORBIDDEN_COMB`). A variant coded characteristic
+(`VAR_CHARACTERISTIC`) depends on some of the criteria and has one address (`VAR_ADDRESS`) per valid
+combination of their values -- in the order of :meth:`Space.combinations`: the values of every criterion
+in definition order, the last criterion varying fastest. The variants are named like the characteristic,
+followed by `VAR_SEPARATOR` (default ``"."``) and a number (`VAR_NAMING` ``NUMERIC``, from 1) or
+letters (``ALPHA``, from ``A``).
+
+Combinations are never filtered after the fact: :class:`Space` counts the valid completions of
+partial combinations (memoized by the forbidden combinations still matching), so the enumeration never
+enters a subtree without valid combinations, and the position of a combination -- hence its address --
+is computed without enumerating at all. Spaces are cached per list of criteria, resolved characteristics
+per name.
+
+Example
+-------
+.. code-block:: python
+
+    from pya2l.model import variants
+
+    coding = variants.for_database(db)
+    coding.space.count()
+    coding.variants("NLLM")         # [Variant(name = 'NLLM.1', combination = ('Manual', 'Kombi'), address = 34880), ...]
+    coding.resolve({"Gear": "Automatic", "Car": "Kombi"})["NLLM"].address
+"""
+
+__copyright__="""
+    pySART - Simplified AUTOSAR-Toolkit for Python.
+
+   (C) 2009-2020 by Christoph Schueler <github.com/Christoph2,
+                                        cpu12.gems@googlemail.com>
+
+   All Rights Reserved
+
+  This program is free software; you can redistribute it and/or modify
+  it under the terms of the GNU General Public License as published by
+  the Free Software Foundation; either version 2 of the License, or
+  (at your option) any later version.
+
+  This program is distributed in the hope that it will be useful,
+  but WITHOUT ANY WARRANTY; without even the implied warranty of
+  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+  GNU General Public License for more details.
+
+  You should have received a copy of the GNU General Public License along
+  with this program; if not, write to the Free Software Foundation, Inc.,
+  51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+"""
+
+from collections import namedtuple, OrderedDict
+import weakref
+
+from sqlalchemy import select
+
+import pya2l.model as model
+
+
+SEPARATOR = "."
+NAMING = "NUMERIC"
+
+Criterion = namedtuple("Criterion", "name longIdentifier values measurement selection_characteristic")
+
+Variant = namedtuple("Variant", "name combination address")
+
+
+class Space(object):
+    """Combinations of values of `criteria` (list of :class:`Criterion`) except `forbidden` ones.
+
+    A combination is a tuple of values, one per criterion.
+
+    Parameters
+    ----------
+    forbidden: iterable
+        Forbidden combinations, each as a sequence of ``(criterion name, value)`` pairs; a combination
+        is forbidden if it matches all pairs of any of them. Forbidden combinations involving other
+        criteria are ignored (see :meth:`Coding.space_of`).
+    """
+
+    def __init__(self, criteria, forbidden = ()):
+        self.criteria = tuple(criteria)
+        depths = {criterion.name: depth for depth, criterion in enumerate(self.criteria)}
+        self._values = [{value: idx for idx, value in enumerate(criterion.values)} for criterion in self.criteria]
+        # Per depth: (bit of forbidden combination, value index) pairs, and the combinations completed there.
+        self._pairs = [[] for _ in self.criteria]
+        self._last = [0] * len(self.criteria)
+        self.forbidden = []
+        for pairs in forbidden:
+            pairs = OrderedDict.fromkeys(tuple(pair) for pair in pairs)
+            if not pairs or any(name not in depths for name, _ in pairs):
+                continue
+            if len({name for name, _ in pairs}) != len(pairs):
+                continue        # Two values of one criterion never match.
+            if any(value not in self._values[depths[name]] for name, value in pairs):
+                continue
+            bit = 1 << len(self.forbidden)
+            self.forbidden.append(tuple(pairs))
+            for name, value in pairs:
+                self._pairs[depths[name]].append((bit, self._values[depths[name]][value]))
+            self._last[max(depths[name] for name, _ in pairs)] |= bit
+        self._all = (1 << len(self.forbidden)) - 1
+        self._counts = {}
+
+    def _step(self, depth, alive, idx):
+        """Forbidden combinations still matching after value `idx` at `depth`, None if one is complete.
+        """
+        for bit, value in self._pairs[depth]:
+            if alive & bit and value != idx:
+                alive &= ~bit
+        if alive & self._last[depth]:
+            return None
+        return alive
+
+    def _count(self, depth, alive):
+        if depth == len(self.criteria):
+            return 1
+        key = (depth, alive)
+        result = self._counts.get(key)
+        if result is None:
+            result = 0
+            for idx in range(len(self._values[depth])):
+                following = self._step(depth, alive, idx)
+                if following is not None:
+                    result += self._count(depth + 1, following)
+            self._counts[key] = result
+        return result
+
+    def count(self):
+        """Number of valid combinations.
+        """
+        return self._count(0, self._all)
+
+    def combinations(self):
+        """Valid combinations, in order (see module documentation).
+        """
+        values = [criterion.values for criterion in self.criteria]
+        chosen = []
+
+        def search(depth, alive):
+            if depth == len(values):
+                yield tuple(chosen)
+                return
+            for idx, value in enumerate(values[depth]):
+                following = self._step(depth, alive, idx)
+                if following is None or not self._count(depth + 1, following):
+                    continue
+                chosen.append(value)
+                yield from search(depth + 1, following)
+                chosen.pop()
+
+        return search(0, self._all)
+
+    def _indices(self, combination):
+        if len(combination) != len(self.criteria):
+            raise ValueError("expected values of {}.".format(", ".join(criterion.name for criterion in self.criteria)))
+        result = []
+        for criterion, values, value in zip(self.criteria, self._values, combination):
+            idx = values.get(value)
+            if idx is None:
+                raise ValueError("'{}' is no value of criterion '{}'.".format(value, criterion.name))
+            result.append(idx)
+        return result
+
+    def is_valid(self, combination):
+        alive = self._all
+        for depth, idx in enumerate(self._indices(combination)):
+            alive = self._step(depth, alive, idx)
+            if alive is None:
+                return False
+        return True
+
+    def index(self, combination):
+        """Position of valid `combination` in :meth:`combinations`.
+
+        Raises
+        ------
+        ValueError
+            Unknown value or forbidden combination.
+        """
+        result = 0
+        alive = self._all
+        for depth, idx in enumerate(self._indices(combination)):
+            for smaller in range(idx):
+                following = self._step(depth, alive, smaller)
+                if following is not None:
+                    result += self._count(depth + 1, following)
+            alive = self._step(depth, alive, idx)
+            if alive is None:
+                raise ValueError("forbidden combination {}.".format(self._describe(combination)))
+        return result
+
+    def combination(self, index):
+        """Valid combination at position `index` of :meth:`combinations`.
+        """
+        if not 0 <= index < self.count():
+            raise IndexError("combination index out of range.")
+        result = []
+        alive = self._all
+        for depth, criterion in enumerate(self.criteria):
+            for idx, value in enumerate(criterion.values):
+                following = self._step(depth, alive, idx)
+                count = self._count(depth + 1, following) if following is not None else 0
+                if index < count:
+                    result.append(value)
+                    alive = following
+                    break
+                index -= count
+        return tuple(result)
+
+    def _describe(self, combination):
+        return ", ".join("{} = {}".format(criterion.name, value) for criterion, value in zip(self.criteria, combination))
+
+    def __len__(self):
+        return self.count()
+
+    def __repr__(self):
+        return "{}(criteria = [{}], forbidden = {})".format(self.__class__.__name__,
+            ", ".join(criterion.name for criterion in self.criteria), len(self.forbidden)
+        )
+
+    __str__ = __repr__
+
+
+def extension(index, naming = NAMING):
+    """Variant extension of the `index`\\th variant (from 0): ``"1"``, ``"2"``, ... or -- `naming` ``ALPHA`` --
+    ``"A"``, ..., ``"Z"``, ``"AA"``, ...
+    """
+    if naming == NAMING:
+        return str(index + 1)
+    result = ""
+    index += 1
+    while index:
+        index, digit = divmod(index - 1, 26)
+        result = chr(ord("A") + digit) + result
+    return result
+
+
+class Coding(object):
+    """Variant coding of a `MODULE`, see :func:`build`.
+
+    Attributes
+    ----------
+    criteria: OrderedDict
+        :class:`Criterion`\\s by name.
+
+    characteristics: OrderedDict
+        Variant coded characteristics by name: (criterion names, addresses or None).
+
+    space: :class:`Space`
+        Combinations of all criteria.
+    """
+
+    def __init__(self, criteria, forbidden, characteristics, naming = None, separator = None):
+        self.criteria = OrderedDict((criterion.name, criterion) for criterion in criteria)
+        self.forbidden = [tuple(pairs) for pairs in forbidden]
+        self.characteristics = characteristics
+        self.naming = NAMING if naming is None else naming
+        self.separator = SEPARATOR if separator is None else separator
+        self.space = Space(self.criteria.values(), self.forbidden)
+        self._spaces = {tuple(self.criteria): self.space}
+        self._variants = {}
+
+    def space_of(self, criterion_names):
+        """:class:`Space` of `criterion_names` (in this order) with the forbidden combinations
+        involving only these criteria; cached.
+
+        Raises
+        ------
+        KeyError
+            Unknown criterion.
+        """
+        criterion_names = tuple(criterion_names)
+        result = self._spaces.get(criterion_names)
+        if result is None:
+            for name in criterion_names:
+                if name not in self.criteria:
+                    raise KeyError("unknown criterion '{}'.".format(name))
+            names = set(criterion_names)
+            result = self._spaces[criterion_names] = Space([self.criteria[name] for name in criterion_names],
+                [pairs for pairs in self.forbidden if all(name in names for name, _ in pairs)]
+            )
+        return result
+
+    def _characteristic(self, name):
+        result = self.characteristics.get(name)
+        if result is None:
+            raise KeyError("'{}' is not variant coded.".format(name))
+        return result
+
+    def variant_name(self, name, index):
+        return "{}{}{}".format(name, self.separator, extension(index, self.naming))
+
+    def variants(self, name):
+        """All :class:`Variant`\\s of characteristic `name`, address None if not given; cached.
+
+        Raises
+        ------
+        KeyError
+            Characteristic not variant coded or unknown criterion.
+        """
+        result = self._variants.get(name)
+        if result is None:
+            criterion_names, addresses = self._characteristic(name)
+            addresses = addresses or ()
+            result = self._variants[name] = [Variant(self.variant_name(name, index), combination,
+                addresses[index] if index < len(addresses) else None)
+                for index, combination in enumerate(self.space_of(criterion_names).combinations())
+            ]
+        return result
+
+    def variant(self, name, selection):
+        """:class:`Variant` of characteristic `name` selected by `selection` (criterion name -> value,
+        criteria the characteristic doesn't depend on are ignored).
+
+        Raises
+        ------
+        KeyError
+            Characteristic not variant coded, unknown criterion or criterion missing in `selection`.
+
+        ValueError
+            Unknown value or forbidden combination.
+        """
+        criterion_names, addresses = self._characteristic(name)
+        space = self.space_of(criterion_names)
+        combination = tuple(selection[criterion] for criterion in criterion_names)
+        index = space.index(combination)
+        return Variant(self.variant_name(name, index), combination,
+            addresses[index] if addresses and index < len(addresses) else None
+        )
+
+    def resolve(self, selection):
+        """:class:`Variant` of every characteristic selected by `selection` (values of all criteria).
+
+        Returns
+        -------
+        OrderedDict
+            Characteristic name -> :class:`Variant`.
+
+        Raises
+        ------
+        KeyError, ValueError
+            See :meth:`variant`; `selection` must be a valid combination of all criteria.
+        """
+        combination = tuple(selection[name] for name in self.criteria)
+        if not self.space.is_valid(combination):
+            raise ValueError("forbidden combination {}.".format(self.space._describe(combination)))
+        return OrderedDict((name, self.variant(name, selection)) for name in self.characteristics)
+
+    def mismatches(self):
+        """Characteristics whose number of addresses differs from their number of variants.
+
+        Returns
+        -------
+        list
+            (name, number of addresses, number of variants) tuples.
+        """
+        result = []
+        for name, (criterion_names, addresses) in self.characteristics.items():
+            if addresses is None:
+                continue
+            try:
+                count = self.space_of(criterion_names).count()
+            except KeyError:
+                count = 0
+            if count != len(addresses):
+                result.append((name, len(addresses), count))
+        return result
+
+    def __repr__(self):
+        return "{}(criteria = {}, characteristics = {}, combinations = {})".format(self.__class__.__name__,
+            len(self.criteria), len(self.characteristics), self.space.count()
+        )
+
+    __str__ = __repr__
+
+
+def _lists(session, table, parent_column, value_column, parent, where):
+    """Values of `table` per `rid` of its `parent` table, in `position` order.
+    """
+    result = {}
+    stmt = select([table.c[parent_column], table.c[value_column]]).select_from(
+        parent.join(table, parent.c.rid == table.c[parent_column])
+    ).where(where).order_by(table.c[parent_column], table.c.position)
+    for rid, value in session.execute(stmt):
+        result.setdefault(rid, []).append(value)
+    return result
+
+
+def build(session, module_name = None):
+    """Build the :class:`Coding` of `MODULE` `module_name` (default: the first `MODULE` with a `VARIANT_CODING`).
+
+    A `MODULE` without `VARIANT_CODING` gives a :class:`Coding` without criteria and characteristics.
+    """
+    coding = model.VariantCoding.__table__
+    module = model.Module.__table__
+    stmt = select([coding.c.rid]).select_from(coding.join(module, module.c.rid == coding.c._module_rid))
+    if module_name is not None:
+        stmt = stmt.where(module.c.name == module_name)
+    rid = session.execute(stmt.order_by(coding.c.rid).limit(1)).scalar()
+    if rid is None:
+        return Coding((), (), OrderedDict())
+
+    criterion = model.VarCriterion.__table__
+    measurement = model.VarMeasurement.__table__
+    selection = model.VarSelectionCharacteristic.__table__
+    values = _lists(session, model.VarCriterionIdentifiers.__table__, "rm_rid", "value", criterion,
+        criterion.c._variant_coding_rid == rid
+    )
+    stmt = select([criterion.c.rid, criterion.c.name, criterion.c.longIdentifier, measurement.c.name, selection.c.name]).select_from(
+        criterion.outerjoin(measurement, measurement.c._var_criterion_rid == criterion.c.rid)
+        .outerjoin(selection, selection.c._var_criterion_rid == criterion.c.rid)
+    ).where(criterion.c._variant_coding_rid == rid).order_by(criterion.c.rid)
+    criteria = [Criterion(name, long_identifier, tuple(values.get(criterion_rid, ())), measurement_name, selection_name)
+        for criterion_rid, name, long_identifier, measurement_name, selection_name in session.execute(stmt)
+    ]
+
+    comb = model.VarForbiddenComb.__table__
+    pair = model.VarForbiddedCombPair.__table__
+    forbidden = OrderedDict()
+    stmt = select([pair.c.vfc_rid, pair.c.criterionName, pair.c.criterionValue]).select_from(
+        pair.join(comb, comb.c.rid == pair.c.vfc_rid)
+    ).where(comb.c._variant_coding_rid == rid).order_by(pair.c.vfc_rid, pair.c.position)
+    for comb_rid, name, value in session.execute(stmt):
+        forbidden.setdefault(comb_rid, []).append((name, value))
+
+    characteristic = model.VarCharacteristic.__table__
+    address = model.VarAddress.__table__
+    where = characteristic.c._variant_coding_rid == rid
+    criterion_names = _lists(session, model.VarCharacteristicIdentifiers.__table__, "rm_rid", "criterionName",
+        characteristic, where
+    )
+    address_values = _lists(session, model.VarAddressValues.__table__, "va_rid", "address", address,
+        address.c._var_characteristic_rid.in_(select([characteristic.c.rid]).where(where))
+    )
+    stmt = select([characteristic.c.rid, characteristic.c.name, address.c.rid]).select_from(
+        characteristic.outerjoin(address, address.c._var_characteristic_rid == characteristic.c.rid)
+    ).where(where).order_by(characteristic.c.rid)
+    characteristics = OrderedDict()
+    for characteristic_rid, name, address_rid in session.execute(stmt):
+        characteristics[name] = (tuple(criterion_names.get(characteristic_rid, ())),
+            None if address_rid is None else address_values.get(address_rid, [])
+        )
+
+    naming = model.VarNaming.__table__
+    separator = model.VarSeparator.__table__
+    tag = session.execute(select([naming.c.tag]).where(naming.c._variant_coding_rid == rid)).scalar()
+    sep = session.execute(select([separator.c.separator]).where(separator.c._variant_coding_rid == rid)).scalar()
+    return Coding(criteria, forbidden.values(), characteristics, tag, sep)
+
+
+_codings = weakref.WeakKeyDictionary()
+
+def for_database(db, module_name = None):
+    """The :class:`Coding` of `db`, built on first use.
+
+    Cached per :class:`pya2l.model.A2LDatabase` object and `module_name`; call :func:`build` after modifying the database.
+    """
+    codings = _codings.setdefault(db, {})
+    coding = codings.get(module_name)
+    if coding is None:
+        coding = codings[module_name] = build(db.session, module_name)
+    return coding
@@ -4,6 +4,15 @@
 """Do preprocessing of files:
 - Removal of comments.
 - '/include' mechanism.
+
+`/include` directives are replaced by the content of the named file (recursively).
+Files are searched in the directory of the including file first, then in `include_paths`.
+The lines of the expanded text are mapped back to their origin by a :class:`SourceMap`,
+columns are kept.
+
+Expanded includes are cached per process (:data:`INCLUDE_CACHE`), validated by
+modification time and content hash, so includes shared by many files of a batch
+import are read and expanded only once.
 """
 
 __copyright__ = """
@@ -33,14 +42,31 @@ __author__  = 'Christoph Schueler'
 __version__ = '0.1.0'
 
 
+from array import array
+import bisect
+from collections import namedtuple
+import hashlib
+import io
+import os
 import re
 import string
+import threading
+
+from pya2l.exceptions import IncludeError
 
 
 CPP_COMMENT = re.compile(r"""(?://)(?P<cmt>.*)""", re.DOTALL | re.UNICODE | re.VERBOSE)
 MULTILINE_START = re.compile(r"""(?:/\*)(?P<cmt>[^*]*)(?P<close>\*/)?""", re.DOTALL | re.UNICODE | re.VERBOSE)
 MULTILINE_END = re.compile(r"""(?:\*/)(?P<text>.*)""", re.DOTALL | re.UNICODE | re.VERBOSE)
 
+# Strings and comments are matched, so directives within them are skipped.
+INCLUDE = re.compile(r"""
+    "(?:\\.|[^\\"])*"
+  | //[^\n]*
+  | /\*.*?\*/
+  | /include[ \t]+(?:"(?P<quoted>[^"\n]*)"|(?P<plain>[^\s"]+))
+""", re.DOTALL | re.VERBOSE)
+
 PRINTABLES = string.printable[ : string.printable.find(" ")]
 TR_PRINTABLES = str.maketrans(PRINTABLES, " " * len(PRINTABLES))
 
@@ -70,12 +96,33 @@ def blank_out(text, span):
     return text
 
 
+Preprocessed = namedtuple("Preprocessed", "text source_map source_hash")
+
+
 class Preprocessor:
     """
+    Parameters
+    ----------
+    include_paths: list of str
+        Directories searched for `/include`\\d files.
+
+    cache: :class:`IncludeCache` or None
+        Defaults to the process-wide :data:`INCLUDE_CACHE`.
     """
 
-    def __init__(self):
-        pass
+    def __init__(self, include_paths = None, cache = None):
+        self.includes = Includes(include_paths, cache)
+
+    def read(self, file_name):
+        """Read `file_name` and expand `/include` directives; comments are left to the lexer.
+
+        Returns
+        -------
+        :class:`Preprocessed`
+            `source_hash` covers the included files too, see :func:`source_hash`.
+        """
+        expanded, sha = self.includes.read(file_name)
+        return Preprocessed(expanded.text, expanded.source_map, source_hash(sha, expanded.dependencies))
 
     def __call__(self, lines):
         result = []
@@ -114,3 +161,247 @@ class Preprocessor:
             else:
                 result.append(line)
         return '\n'.join(result)
+
+
+def read_text(file_name):
+    """Contents of `file_name` (decoded like :func:`open` does) and its SHA-256.
+    """
+    with open(file_name, "rb") as inf:
+        raw = inf.read()
+    return io.TextIOWrapper(io.BytesIO(raw)).read(), hashlib.sha256(raw).hexdigest()
+
+
+class SourceMap:
+    """Maps lines of preprocessed text to file and line they originate from.
+
+    Run-length encoded: every run of consecutive lines from the same file is one segment,
+    stored in three :class:`array.array`\\s (12 bytes per segment), so the size depends
+    on the number of `/include`\\s, not on the number of lines.
+    """
+
+    def __init__(self):
+        self.files = []
+        self._file_index = {}
+        self._starts = array("I")   # First line (of the preprocessed text) of each segment.
+        self._file_ids = array("I")
+        self._origins = array("I")  # Line in file of the first line of each segment.
+
+    def add(self, line, file_name, origin):
+        """Line `line` and following ones originate from `file_name`, starting at line `origin`.
+        """
+        idx = self._file_index.get(file_name)
+        if idx is None:
+            idx = self._file_index[file_name] = len(self.files)
+            self.files.append(file_name)
+        if self._starts:
+            start = self._starts[-1]
+            if start == line:
+                self._file_ids[-1] = idx
+                self._origins[-1] = origin
+                return
+            if self._file_ids[-1] == idx and self._origins[-1] + line - start == origin:
+                return  # Continuation of the current segment.
+        self._starts.append(line)
+        self._file_ids.append(idx)
+        self._origins.append(origin)
+
+    def extend(self, other, line):
+        """Add segments of `other`, whose text is inserted at line `line`.
+        """
+        for start, idx, origin in zip(other._starts, other._file_ids, other._origins):
+            self.add(line + start - 1, other.files[idx], origin)
+
+    def lookup(self, line):
+        """Origin of `line` (1-based) of the preprocessed text.
+
+        Returns
+        -------
+        (str, int)
+            File name and line.
+        """
+        pos = bisect.bisect_right(self._starts, line) - 1
+        if pos < 0:
+            return None, line
+        return self.files[self._file_ids[pos]], self._origins[pos] + line - self._starts[pos]
+
+    def location(self, line, column):
+        """``file:line:column`` (or ``line:column`` for unnamed input) of `line` of the preprocessed text.
+        """
+        file_name, line = self.lookup(line)
+        if file_name is None:
+            return "{}:{}".format(line, column)
+        return "{}:{}:{}".format(file_name, line, column)
+
+    @property
+    def nbytes(self):
+        """Size of the segment tables.
+        """
+        return sum(a.itemsize * len(a) for a in (self._starts, self._file_ids, self._origins))
+
+    def __len__(self):
+        return len(self._starts)
+
+
+Expanded = namedtuple("Expanded", "text source_map dependencies")
+Expanded.__doc__ = """Result of include expansion; `dependencies` are (file name, SHA-256) of all included files."""
+
+
+class IncludeCache:
+    """Expanded included files by path, validated by modification time and content hash.
+    """
+
+    def __init__(self):
+        self._entries = {}
+        self._stats = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is not None and all(self._unchanged(file_name, sha) for file_name, sha in entry.dependencies):
+            return entry
+        return None
+
+    def put(self, key, entry):
+        with self._lock:
+            self._entries[key] = entry
+
+    def remember(self, file_name, sha):
+        try:
+            stat = os.stat(file_name)
+        except OSError:
+            return
+        with self._lock:
+            self._stats[file_name] = (stat.st_mtime_ns, stat.st_size, sha)
+
+    def _unchanged(self, file_name, sha):
+        try:
+            stat = os.stat(file_name)
+        except OSError:
+            return False
+        known = self._stats.get(file_name)
+        if known and known[ : 2] == (stat.st_mtime_ns, stat.st_size):
+            return known[2] == sha
+        # Touched or rewritten: compare contents.
+        try:
+            _, current = read_text(file_name)
+        except OSError:
+            return False
+        self.remember(file_name, current)
+        return current == sha
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._stats.clear()
+
+
+INCLUDE_CACHE = IncludeCache()
+
+
+class Includes:
+    """`/include` expansion.
+
+    Parameters
+    ----------
+    include_paths: list of str
+        Directories searched for included files, after the directory of the including file.
+
+    cache: :class:`IncludeCache` or None
+        Defaults to the process-wide :data:`INCLUDE_CACHE`.
+    """
+
+    def __init__(self, include_paths = None, cache = None):
+        self.include_paths = tuple(include_paths or ())
+        self.cache = INCLUDE_CACHE if cache is None else cache
+
+    def resolve(self, name, directory):
+        for path in (directory, ) + self.include_paths:
+            candidate = os.path.join(path, name)
+            if os.path.isfile(candidate):
+                return os.path.realpath(candidate)
+        raise IncludeError("included file '{}' not found (searched: {}).".format(name,
+            ", ".join((directory, ) + self.include_paths))
+        )
+
+    def read(self, file_name):
+        """Read and expand `file_name`.
+
+        Returns
+        -------
+        (:class:`Expanded`, str)
+            Expanded text and SHA-256 of the file itself.
+        """
+        text, sha = read_text(file_name)
+        return self.expand(text, file_name), sha
+
+    def expand(self, text, file_name = None, _stack = ()):
+        """Replace `/include` directives in `text`, `file_name` is used to resolve relative names.
+
+        Returns
+        -------
+        :class:`Expanded`
+        """
+        source_map = SourceMap()
+        source_map.add(1, file_name, 1)
+        if "/include" not in text:
+            return Expanded(text, source_map, ())
+        directory = os.path.dirname(os.path.abspath(file_name)) if file_name else os.getcwd()
+        pieces = []
+        dependencies = []
+        pos = 0
+        line = out_line = 1
+        for match in INCLUDE.finditer(text):
+            name = match.group("quoted") or match.group("plain")
+            if name is None:
+                continue
+            before = text[pos : match.start()]
+            pieces.append(before)
+            newlines = before.count("\n")
+            line += newlines
+            out_line += newlines
+            included = self._include(self.resolve(name, directory), _stack + (file_name, ))
+            dependencies.extend(included.dependencies)
+            pieces.append("\n")
+            out_line += 1
+            source_map.extend(included.source_map, out_line)
+            pieces.append(included.text)
+            pieces.append("\n")
+            out_line += included.text.count("\n") + 1
+            # Rest of the directive's line keeps its columns.
+            line += text.count("\n", match.start(), match.end())
+            pieces.append(" " * (match.end() - (text.rfind("\n", 0, match.end()) + 1)))
+            source_map.add(out_line, file_name, line)
+            pos = match.end()
+        if not dependencies:
+            return Expanded(text, source_map, ())
+        pieces.append(text[pos : ])
+        return Expanded("".join(pieces), source_map, tuple(dependencies))
+
+    def _include(self, file_name, stack):
+        if file_name in stack:
+            raise IncludeError("recursive /include: {}.".format(" -> ".join(stack[stack.index(file_name) : ] +
+                (file_name, )))
+            )
+        key = (file_name, self.include_paths)
+        entry = self.cache.get(key)
+        if entry is None:
+            text, sha = read_text(file_name)
+            self.cache.remember(file_name, sha)
+            expanded = self.expand(text, file_name, stack)
+            entry = Expanded(expanded.text, expanded.source_map, ((file_name, sha), ) + expanded.dependencies)
+            self.cache.put(key, entry)
+        return entry
+
+
+def source_hash(sha, dependencies):
+    """Hash identifying a file together with the files it includes.
+
+    Files without `/include` are identified by their own SHA-256 `sha`.
+    """
+    if not dependencies:
+        return sha
+    digest = hashlib.sha256(sha.encode("ascii"))
+    for _, dependency in dependencies:
+        digest.update(dependency.encode("ascii"))
+    return digest.hexdigest()
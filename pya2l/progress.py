@@ -0,0 +1,152 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Progress reporting and cooperative cancellation of imports.
+
+Example
+-------
+.. code-block:: python
+
+    from pya2l import DB
+    from pya2l.exceptions import ImportCancelled
+    from pya2l.progress import CancellationToken
+
+    token = CancellationToken()     # call token.cancel() from another thread, e.g. a GUI.
+
+    def show(progress):
+        print("{0.phase}: {0.bytes_lexed} / {0.total_bytes} bytes, {0.tokens} tokens, {0.objects} objects".format(progress))
+
+    try:
+        DB().import_a2l("ASAP2_Demo_V161.a2l", progress = show, cancel = token)
+    except ImportCancelled:
+        pass    # Nothing written, the database file is removed.
+"""
+
+__copyright__ = """
+   pySART - Simplified AUTOSAR-Toolkit for Python.
+
+   (C) 2010-2020 by Christoph Schueler <cpu12.gems.googlemail.com>
+
+   All Rights Reserved
+
+   This program is free software; you can redistribute it and/or modify
+   it under the terms of the GNU General Public License as published by
+   the Free Software Foundation; either version 2 of the License, or
+   (at your option) any later version.
+
+   This program is distributed in the hope that it will be useful,
+   but WITHOUT ANY WARRANTY; without even the implied warranty of
+   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+   GNU General Public License for more details.
+
+   You should have received a copy of the GNU General Public License along
+   with this program; if not, write to the Free Software Foundation, Inc.,
+   51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+
+   s. FLOSS-EXCEPTION.txt
+"""
+__author__  = 'Christoph Schueler'
+__version__ = '0.1.0'
+
+from collections import namedtuple
+import threading
+import time
+
+from pya2l.exceptions import ImportCancelled
+
+
+DEFAULT_INTERVAL = 0.1  # Seconds between two reports.
+
+Progress = namedtuple("Progress", "phase bytes_lexed total_bytes tokens objects")
+Progress.__doc__ = """Snapshot of a running import.
+
+`bytes_lexed` and `total_bytes` count characters of the (latin-1 decoded) input.
+"""
+
+
+class CancellationToken(object):
+    """Thread-safe flag, checked by the import at regular intervals.
+
+    Parameters
+    ----------
+    event: :class:`threading.Event` or None
+        Backing flag; pass e.g. a :meth:`multiprocessing.Manager.Event` to cancel imports running
+        in other processes.
+    """
+
+    def __init__(self, event = None):
+        self._event = threading.Event() if event is None else event
+
+    def cancel(self):
+        self._event.set()
+
+    @property
+    def cancelled(self):
+        return self._event.is_set()
+
+    def raise_if_cancelled(self):
+        if self._event.is_set():
+            raise ImportCancelled("Import cancelled.")
+
+
+class Monitor(object):
+    """Collects counters from the import phases, throttles reports and checks for cancellation.
+
+    Parameters
+    ----------
+    callback: callable or None
+        Called with a :class:`Progress` at most every `interval` seconds (and once at the end of every phase).
+
+    token: :class:`CancellationToken` or None
+
+    interval: float
+    """
+
+    def __init__(self, callback = None, token = None, interval = DEFAULT_INTERVAL):
+        self.callback = callback
+        self.token = token
+        self.interval = interval
+        self.phase = None
+        self.bytes_lexed = 0
+        self.total_bytes = None
+        self.tokens = 0
+        self.objects = 0
+        self._last = None
+
+    @property
+    def active(self):
+        return self.callback is not None or self.token is not None
+
+    def check(self):
+        if self.token is not None:
+            self.token.raise_if_cancelled()
+
+    def update(self, phase, force = False, **counters):
+        """Set `phase` and `counters` (attributes of :class:`Progress`), report if due.
+
+        Raises
+        ------
+        :class:`pya2l.exceptions.ImportCancelled`
+        """
+        self.check()
+        self.phase = phase
+        for name, value in counters.items():
+            setattr(self, name, value)
+        if self.callback is not None:
+            now = time.monotonic()
+            if force or self._last is None or now - self._last >= self.interval:
+                self._last = now
+                self.callback(Progress(self.phase, self.bytes_lexed, self.total_bytes, self.tokens, self.objects))
+
+
+NULL_MONITOR = Monitor()
+
+
+def get(callback = None, token = None, interval = DEFAULT_INTERVAL):
+    """Monitor for `callback` and `token`, or a shared inactive one.
+    """
+    if isinstance(callback, Monitor):
+        return callback
+    if callback is None and token is None:
+        return NULL_MONITOR
+    return Monitor(callback, token, interval)
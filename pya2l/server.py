@@ -0,0 +1,415 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Long-running query server keeping databases open.
+
+Short-lived scripts pay for opening a database, configuring mappers and warming SQLite's
+page cache on every run. :class:`Server` does this once and answers queries over HTTP/JSON,
+either on a localhost TCP port or on a Unix domain socket.
+
+Up to `capacity` databases are kept open (least recently used ones are closed). Per database,
+symbols are indexed by name on first use and compu methods are cached, so a lookup is a
+dictionary access plus a round-trip.
+
+Requests (all ``GET``, parameter `db` is the path of an `.a2ldb` file)::
+
+    /lookup?db=...&kind=MEASUREMENT&name=...
+    /search?db=...&q=...[&kind=...][&limit=...]
+    /convert?db=...&conversion=...&value=...[&inverse=1]
+    /info?db=...
+    /databases
+
+Responses are ``{"result": ...}`` or ``{"error": "..."}`` with an HTTP status >= 400.
+
+Example
+-------
+.. code-block:: shell
+
+    pya2l serve --socket /tmp/pya2l.sock
+
+.. code-block:: python
+
+    from pya2l.server import Client
+
+    client = Client("/tmp/pya2l.sock")
+    meas = client.lookup("ecu1.a2ldb", "MEASUREMENT", "ENGINE_SPEED")
+    print(client.convert("ecu1.a2ldb", meas["conversion"], 1234))
+"""
+
+__copyright__ = """
+   pySART - Simplified AUTOSAR-Toolkit for Python.
+
+   (C) 2010-2020 by Christoph Schueler <cpu12.gems.googlemail.com>
+
+   All Rights Reserved
+
+   This program is free software; you can redistribute it and/or modify
+   it under the terms of the GNU General Public License as published by
+   the Free Software Foundation; either version 2 of the License, or
+   (at your option) any later version.
+
+   This program is distributed in the hope that it will be useful,
+   but WITHOUT ANY WARRANTY; without even the implied warranty of
+   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+   GNU General Public License for more details.
+
+   You should have received a copy of the GNU General Public License along
+   with this program; if not, write to the Free Software Foundation, Inc.,
+   51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+
+   s. FLOSS-EXCEPTION.txt
+"""
+
+from collections import OrderedDict
+from contextlib import contextmanager
+import http.client
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import json
+import os
+import socket
+import socketserver
+import threading
+from urllib.parse import parse_qs, urlencode, urlsplit
+
+from pya2l import exceptions
+from pya2l.logger import Logger
+import pya2l.model as model
+from pya2l.model import search
+
+
+DEFAULT_PORT = 8642
+DEFAULT_CAPACITY = 8
+
+
+class RequestError(Exception):
+    """Invalid request, answered with `status`.
+    """
+
+    def __init__(self, message, status = 400):
+        super(RequestError, self).__init__(message)
+        self.status = status
+
+
+def _scalar(value):
+    """Plain Python value of NumPy scalars (results of :mod:`pya2l.functions`).
+    """
+    return value.item() if hasattr(value, "item") else value
+
+
+class HotDatabase(object):
+    """Database opened read-only, with symbol index and compu method cache.
+
+    Neither locks nor upgrades the file, see :class:`pya2l.model.A2LDatabase`.
+
+    Parameters
+    ----------
+    file_name: str
+        Absolute path of an existing `.a2ldb` file.
+    """
+
+    def __init__(self, file_name):
+        self.file_name = file_name
+        self.mtime = os.stat(file_name).st_mtime
+        self.db = model.A2LDatabase(file_name, read_only = True)
+        self.db.create_read_sessions()
+        self._symbols = {}
+        self._conversions = {}
+        self._lock = threading.Lock()
+        self._users = 0
+        self._evicted = False
+
+    def symbols(self, kind):
+        """Dictionary name -> column values of all elements of `kind`, built on first use.
+        """
+        index = self._symbols.get(kind)
+        if index is None:
+            source = next((s for s in search.SOURCES if s.kind == kind), None)
+            if source is None:
+                raise RequestError("cannot look up kind '{}'.".format(kind))
+            table = source.klass.__table__
+            with self._lock, self.db.read_session() as session:
+                index = self._symbols.get(kind)
+                if index is None:
+                    keys = table.columns.keys()
+                    index = {}
+                    for row in session.execute(table.select()):
+                        values = dict(zip(keys, row))
+                        index[values[source.name]] = values
+                    self._symbols[kind] = index
+        return index
+
+    def lookup(self, kind, name):
+        return self.symbols(kind).get(name)
+
+    def compu_method(self, name):
+        """Cached :class:`pya2l.functions.CompuMethod` evaluator.
+        """
+        from pya2l import functions
+
+        evaluator = self._conversions.get(name)
+        if evaluator is None:
+            with self.db.read_session() as session:
+                compu_method = session.query(model.CompuMethod).filter(model.CompuMethod.name == name).first()
+                if compu_method is None:
+                    raise RequestError("unknown compu method '{}'.".format(name), 404)
+                evaluator = functions.CompuMethod(session, compu_method)
+            if not hasattr(evaluator, "evaluator"):
+                raise RequestError("conversion type '{}' not supported.".format(compu_method.conversionType), 422)
+            evaluator = self._conversions.setdefault(name, evaluator)   # Concurrent requests share the first one.
+        return evaluator
+
+    def convert(self, conversion, value, inverse = False):
+        evaluator = self.compu_method(conversion)
+        return _scalar(evaluator.inv(value) if inverse else evaluator(value))
+
+    def search(self, query, kinds = None, limit = 50):
+        with self.db.read_session() as session:
+            return [hit._asdict() for hit in search.search(session, query, kinds = kinds, limit = limit)]
+
+    def info(self):
+        from pya2l import cli
+
+        with self.db.read_session() as session:
+            return cli.info(self.db, session)
+
+    def acquire(self):
+        self._users += 1
+
+    def release(self):
+        """Close the database if evicted and no longer used.
+        """
+        self._users -= 1
+        if self._evicted and self._users == 0:
+            self.db.close()
+
+    def evict(self):
+        self._evicted = True
+        if self._users == 0:
+            self.db.close()
+
+
+class DatabaseCache(object):
+    """Least recently used `capacity` databases, re-opened if the file was modified.
+    """
+
+    def __init__(self, capacity = DEFAULT_CAPACITY):
+        self.capacity = capacity
+        self._databases = OrderedDict()
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def get(self, file_name):
+        """Context manager yielding the :class:`HotDatabase` for `file_name`.
+        """
+        file_name = os.path.abspath(file_name)
+        if not file_name.lower().endswith(".{}".format(model.DB_EXTENSION)):
+            file_name = "{}.{}".format(file_name, model.DB_EXTENSION)
+        if not os.path.isfile(file_name):
+            raise RequestError("database '{}' does not exist.".format(file_name), 404)
+        with self._lock:
+            database = self._databases.get(file_name)
+            if database is not None and database.mtime != os.stat(file_name).st_mtime:
+                del self._databases[file_name]
+                database.evict()
+                database = None
+            if database is None:
+                try:
+                    database = HotDatabase(file_name)
+                except exceptions.SchemaVersionError as e:
+                    raise RequestError(str(e), 409)
+                self._databases[file_name] = database
+                while len(self._databases) > self.capacity:
+                    _, lru = self._databases.popitem(last = False)
+                    lru.evict()
+            else:
+                self._databases.move_to_end(file_name)
+            database.acquire()
+        try:
+            yield database
+        finally:
+            with self._lock:
+                database.release()
+
+    def names(self):
+        with self._lock:
+            return list(self._databases)
+
+    def close(self):
+        with self._lock:
+            while self._databases:
+                self._databases.popitem()[1].evict()
+
+
+class RequestHandler(BaseHTTPRequestHandler):
+
+    protocol_version = "HTTP/1.1"   # Keep-alive.
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        query = parse_qs(url.query)
+        params = {key: values[-1] for key, values in query.items()}
+        params["kind"] = query.get("kind")
+        command = getattr(self.server, "command_{}".format(url.path.strip("/")), None)
+        try:
+            if command is None:
+                raise RequestError("unknown request '{}'.".format(url.path), 404)
+            status, body = 200, {"result": command(params)}
+        except RequestError as e:
+            status, body = e.status, {"error": str(e)}
+        except Exception as e:
+            self.server.logger.error("{} failed: {}: {}".format(self.path, e.__class__.__name__, e))
+            status, body = 500, {"error": "{}: {}".format(e.__class__.__name__, e)}
+        data = json.dumps(body, default = str).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        self.server.logger.debug(format, *args)
+
+
+def _required(params, name):
+    value = params.get(name)
+    if value is None:
+        raise RequestError("parameter '{}' missing.".format(name))
+    return value
+
+
+class Queries(object):
+    """Request handlers shared by the TCP and the Unix domain socket server.
+    """
+
+    logger = Logger(__name__)
+
+    def command_lookup(self, params):
+        kind = (params["kind"] or [None])[-1]
+        if kind is None:
+            raise RequestError("parameter 'kind' missing.")
+        with self.databases.get(_required(params, "db")) as database:
+            result = database.lookup(kind.upper(), _required(params, "name"))
+        if result is None:
+            raise RequestError("{} '{}' not found.".format(kind.upper(), params["name"]), 404)
+        return result
+
+    def command_search(self, params):
+        kinds = [kind.upper() for kind in params["kind"]] if params["kind"] else None
+        with self.databases.get(_required(params, "db")) as database:
+            return database.search(_required(params, "q"), kinds, int(params.get("limit", 50)))
+
+    def command_convert(self, params):
+        try:
+            value = float(_required(params, "value"))
+        except ValueError:
+            value = params["value"]     # Verbal tables are inverted from text.
+        inverse = params.get("inverse", "0") not in ("0", "false", "")
+        with self.databases.get(_required(params, "db")) as database:
+            return database.convert(_required(params, "conversion"), value, inverse)
+
+    def command_info(self, params):
+        with self.databases.get(_required(params, "db")) as database:
+            return database.info()
+
+    def command_databases(self, params):
+        return self.databases.names()
+
+
+class Server(Queries, ThreadingHTTPServer):
+    """HTTP/JSON server on `host`:`port`; don't expose it beyond localhost.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, host = "127.0.0.1", port = DEFAULT_PORT, capacity = DEFAULT_CAPACITY):
+        self.databases = DatabaseCache(capacity)
+        ThreadingHTTPServer.__init__(self, (host, port), RequestHandler)
+
+    def server_close(self):
+        ThreadingHTTPServer.server_close(self)
+        self.databases.close()
+
+
+class UnixServer(Queries, socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """HTTP/JSON server on Unix domain socket `path`.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, path, capacity = DEFAULT_CAPACITY):
+        self.databases = DatabaseCache(capacity)
+        if os.path.exists(path):
+            os.unlink(path)
+        socketserver.UnixStreamServer.__init__(self, path, RequestHandler)
+
+    def server_close(self):
+        socketserver.UnixStreamServer.server_close(self)
+        self.databases.close()
+        try:
+            os.unlink(self.server_address)
+        except OSError:
+            pass
+
+
+class UnixHTTPConnection(http.client.HTTPConnection):
+
+    def __init__(self, path, timeout = None):
+        super(UnixHTTPConnection, self).__init__("localhost", timeout = timeout)
+        self.path = path
+
+    def connect(self):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        if self.timeout is not None:
+            self.sock.settimeout(self.timeout)
+        self.sock.connect(self.path)
+
+
+class Client(object):
+    """Client of :class:`Server` / :class:`UnixServer`, keeps its connection open.
+
+    Parameters
+    ----------
+    address: str
+        ``"host:port"`` or path of a Unix domain socket.
+
+    Raises
+    ------
+    :class:`RequestError`
+        Errors reported by the server.
+    """
+
+    def __init__(self, address = "127.0.0.1:{}".format(DEFAULT_PORT), timeout = None):
+        host, sep, port = address.rpartition(":")
+        if sep and port.isdigit():
+            self.connection = http.client.HTTPConnection(host, int(port), timeout = timeout)
+        else:
+            self.connection = UnixHTTPConnection(address, timeout = timeout)
+
+    def request(self, command, **params):
+        query = urlencode([(k, v) for k, v in params.items() if v is not None], doseq = True)
+        self.connection.request("GET", "/{}?{}".format(command, query))
+        response = self.connection.getresponse()
+        body = json.loads(response.read().decode("utf-8"))
+        if response.status >= 400:
+            raise RequestError(body["error"], response.status)
+        return body["result"]
+
+    def lookup(self, db, kind, name):
+        return self.request("lookup", db = os.path.abspath(db), kind = kind, name = name)
+
+    def search(self, db, query, kinds = None, limit = 50):
+        return self.request("search", db = os.path.abspath(db), q = query, kind = kinds, limit = limit)
+
+    def convert(self, db, conversion, value, inverse = False):
+        return self.request("convert", db = os.path.abspath(db), conversion = conversion, value = value,
+            inverse = int(inverse)
+        )
+
+    def info(self, db):
+        return self.request("info", db = os.path.abspath(db))
+
+    def databases(self):
+        return self.request("databases")
+
+    def close(self):
+        self.connection.close()
@@ -0,0 +1,29 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Element factories shared by the model tests.
+"""
+
+import pya2l.model as model
+
+
+def measurement(name, conversion = "CM", address = None, upper = 100.0, datatype = "UWORD", byte_order = None, **kws):
+    """`MEASUREMENT` with placeholders for the mandatory parameters.
+
+    `address` and `byte_order` add `ECU_ADDRESS` and `BYTE_ORDER`, `kws` are further elements.
+    """
+    if address is not None:
+        kws["ecu_address"] = model.EcuAddress(address = address)
+    if byte_order is not None:
+        kws["byte_order"] = model.ByteOrder(byteOrder = byte_order)
+    return model.Measurement(name = name, longIdentifier = "", datatype = datatype, conversion = conversion,
+        resolution = 0, accuracy = 0.0, lowerLimit = 0.0, upperLimit = upper, **kws
+    )
+
+
+def identifiers(klass, *names):
+    """Identifier list `klass` (e.g. :class:`pya2l.model.InMeasurement`) of `names`.
+    """
+    element = klass()
+    element.identifier = list(names)
+    return element
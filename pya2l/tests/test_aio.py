@@ -0,0 +1,132 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import asyncio
+
+import pytest
+
+import pya2l.model as model
+from pya2l.aio import AsyncA2LDatabase
+
+
+@pytest.fixture
+def db(tmp_path):
+    db = model.A2LDatabase(str(tmp_path / "aio"))
+    session = db.session
+    session.add(model.Measurement(name = "ENGINE_SPEED", longIdentifier = "", datatype = "UWORD", conversion = "CM.RPM",
+        resolution = 0, accuracy = 0.0, lowerLimit = 0.0, upperLimit = 8000.0, ecu_address = model.EcuAddress(address = 0x4711),
+        byte_order = model.ByteOrder(byteOrder = "MSB_FIRST"))
+    )
+    session.add(model.Characteristic(name = "KL_IGN", longIdentifier = "", type = "CURVE", address = 0x8000,
+        deposit = "RL.CURVE", maxDiff = 0.0, conversion = "CM.STATE", lowerLimit = 0.0, upperLimit = 100.0)
+    )
+    session.add(model.RecordLayout(name = "RL.CURVE", fnc_values = model.FncValues(position = 1, datatype = "UBYTE",
+        indexMode = "ROW_DIR", addresstype = "DIRECT"))
+    )
+    session.add(model.CompuMethod(name = "CM.RPM", longIdentifier = "", conversionType = "LINEAR", format = "%6.1",
+        unit = "rpm", coeffs_linear = model.CoeffsLinear(a = 4.0, b = 0.0))
+    )
+    session.add(model.CompuMethod(name = "CM.STATE", longIdentifier = "", conversionType = "TAB_VERB", format = "%6.1",
+        unit = "", compu_tab_ref = model.CompuTabRef(conversionTable = "VT.STATE"))
+    )
+    vtab = model.CompuVtab(name = "VT.STATE", longIdentifier = "", conversionType = "TAB_VERB", numberValuePairs = 2)
+    vtab.pairs.append(model.CompuVtabPair(inVal = 0, outVal = "off"))
+    vtab.pairs.append(model.CompuVtabPair(inVal = 1, outVal = "on"))
+    session.add(vtab)
+    session.commit()
+    yield db
+    db.close()
+
+
+def run(coro):
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(coro)
+    finally:
+        loop.close()
+
+
+def test_measurement(db):
+    async def lookup():
+        adb = AsyncA2LDatabase(db, max_workers = 2)
+        meas = await adb.measurement("ENGINE_SPEED")
+        missing = await adb.measurement("NO_SUCH_SIGNAL")
+        await adb.close()
+        return meas, missing
+
+    meas, missing = run(lookup())
+    assert meas.ecu_address.address == 0x4711
+    assert meas.byte_order.byteOrder == "MSB_FIRST"
+    assert missing is None
+
+
+def test_measurements(db):
+    async def lookup():
+        async with AsyncA2LDatabase(db, max_workers = 2) as adb:
+            return await adb.measurements(["ENGINE_SPEED", "NO_SUCH_SIGNAL"])
+
+    result = run(lookup())
+    assert list(result.keys()) == ["ENGINE_SPEED"]
+
+
+def test_characteristic_with_record_layout(db):
+    async def lookup():
+        async with AsyncA2LDatabase(db, max_workers = 2) as adb:
+            return await adb.characteristic("KL_IGN")
+
+    chx, layout = run(lookup())
+    assert chx.address == 0x8000
+    assert layout.name == "RL.CURVE"
+    assert layout.fnc_values.datatype == "UBYTE"
+
+
+def test_compu_method_and_conversion(db):
+    async def lookup():
+        async with AsyncA2LDatabase(db, max_workers = 2) as adb:
+            cm = await adb.compu_method("CM.STATE")
+            state = await adb.conversion("CM.STATE")
+            rpm = await adb.conversion("CM.RPM")
+            return cm, state, rpm
+
+    cm, state, rpm = run(lookup())
+    assert cm.compu_method.conversionType == "TAB_VERB"
+    assert [p.outVal for p in cm.table.pairs] == ["off", "on"]
+    assert state(1) == "on"
+    assert rpm(1000) == 4000.0
+
+
+def test_close_keeps_callers_database(db):
+    async def lookup(db):
+        async with AsyncA2LDatabase(db, max_workers = 2) as adb:
+            return await adb.measurement("ENGINE_SPEED")
+
+    registry = db.create_read_sessions()
+    run(lookup(db))
+    assert db.read_sessions is registry     # Not created by the wrapper, left open.
+    db.close_read_sessions()
+    run(lookup(db))
+    assert db._read_sessions is None
+    assert db.session.query(model.Measurement).count() == 1
+
+
+def test_open_read_only(db, tmp_path, monkeypatch):
+    async def lookup():
+        async with AsyncA2LDatabase.open("aio", max_workers = 2) as adb:
+            return adb.db.read_only, await adb.measurement("ENGINE_SPEED")
+
+    db.close()
+    monkeypatch.chdir(tmp_path)
+    read_only, meas = run(lookup())
+    assert read_only
+    assert meas.ecu_address.address == 0x4711
+
+
+def test_nested_elements(db):
+    async def lookup():
+        async with AsyncA2LDatabase(db, max_workers = 2) as adb:
+            return await adb.measurement("ENGINE_SPEED"), await adb.characteristic("KL_IGN")
+
+    meas, (chx, _) = run(lookup())
+    assert meas.compu_method.coeffs_linear.a == 4.0
+    assert chx.record_layout.fnc_values.datatype == "UBYTE"
+    assert chx.compu_method.compu_tab_ref.conversionTable == "VT.STATE"
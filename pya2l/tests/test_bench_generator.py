@@ -0,0 +1,56 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import re
+
+import pytest
+
+from pya2l.a2l_listener import cut_a2ml
+from pya2l.bench import generator
+
+
+def count(text, keyword):
+    return len(re.findall(r"/begin\s+{}\b".format(keyword), text))
+
+
+def test_reproducible():
+    config = generator.Config(measurements = 20, characteristics = 30)
+    assert generator.generate(config) == generator.generate(config)
+    assert generator.generate(config) != generator.generate(generator.Config(measurements = 20, characteristics = 30, seed = 1))
+
+
+def test_size_and_mix():
+    config = generator.Config(measurements = 50, characteristics = 60, compu_methods = 12, functions = 7, groups = 5,
+        axis_pts = 3, record_layouts = 4, if_data = 1.0, annotations = 0.0)
+    text = generator.generate(config)
+    assert count(text, "MEASUREMENT") == 50
+    assert count(text, "CHARACTERISTIC") == 60
+    for type_ in generator.CHARACTERISTIC_TYPES:
+        assert len(re.findall(r"^\s+{}$".format(type_), text, re.M)) == 10
+    assert count(text, "COMPU_METHOD") == 12
+    assert count(text, "COMPU_TAB") == count(text, "COMPU_VTAB") == count(text, "COMPU_VTAB_RANGE") == 2
+    assert count(text, "RECORD_LAYOUT") == 5 * len(generator.DATATYPES) + 4
+    assert count(text, "AXIS_PTS") == 3
+    assert count(text, "FUNCTION") == 7
+    assert count(text, "GROUP") == 5
+    assert count(text, "IF_DATA") == 110
+    assert count(text, "ANNOTATION") == 0
+    assert len(re.findall(r"/begin\s", text)) == len(re.findall(r"/end\s", text))
+
+
+def test_references_resolve():
+    text = generator.generate(generator.Config(measurements = 10, characteristics = 12))
+    defined = set(re.findall(r"/begin\s+(?:RECORD_LAYOUT|COMPU_METHOD|MEASUREMENT|AXIS_PTS)\s+(\S+)", text))
+    for name in re.findall(r"^\s+(RL\.\S+|CM\.[^\s.]+\.\d+|A\.AXIS_\d+)$", text, re.M):
+        assert name in defined
+
+
+def test_if_data_is_cut():
+    text, _ = cut_a2ml(generator.generate(generator.Config(measurements = 10, characteristics = 0, if_data = 1.0)))
+    assert count(text, "IF_DATA") == 0
+    assert count(text, "MEASUREMENT") == 10
+
+
+def test_unknown_characteristic_type():
+    with pytest.raises(ValueError):
+        generator.Config(characteristic_types = ("VALUE", "CUBE_4"))
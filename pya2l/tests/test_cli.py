@@ -0,0 +1,107 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import csv
+import json
+import os
+import sqlite3
+
+import pytest
+
+from pya2l import cli
+import pya2l.model as model
+from pya2l.preprocessor import Preprocessor
+from pya2l.progress import CancellationToken
+
+
+A2L = 'ASAP2_VERSION 1 61\n/begin PROJECT P ""\n/end PROJECT\n'
+
+
+@pytest.fixture
+def a2l_dir(tmpdir):
+    sub = tmpdir.mkdir("variants")
+    for name in ("ecu1.a2l", "ecu2.a2l"):
+        sub.join(name).write(A2L)
+    return tmpdir
+
+
+@pytest.fixture
+def dbname(a2l_dir):
+    a2l_name = str(a2l_dir.join("variants", "ecu1.a2l"))
+    name = cli.database_name(a2l_name)
+    db = model.A2LDatabase(name)
+    db.session.add(model.Measurement(name = "ENGINE_SPEED", longIdentifier = "crankshaft speed", datatype = "UWORD",
+        conversion = "NO_COMPU_METHOD", resolution = 0, accuracy = 0.0, lowerLimit = 0.0, upperLimit = 8000.0)
+    )
+    db.session.commit()
+    db.source_hash = Preprocessor().read(a2l_name).source_hash
+    db.close()
+    return name
+
+
+def test_expand(a2l_dir):
+    pattern = os.path.join(str(a2l_dir), "**", "*.a2l")
+    files = cli.expand([pattern, pattern])
+    assert [os.path.basename(f) for f in files] == ["ecu1.a2l", "ecu2.a2l"]
+    assert cli.main(["import", os.path.join(str(a2l_dir), "*.none")]) == cli.EXIT_USAGE
+
+
+def test_import_skips_unchanged(a2l_dir, dbname):
+    a2l_name = str(a2l_dir.join("variants", "ecu1.a2l"))
+    assert cli.up_to_date(a2l_name)
+    assert cli.import_file(a2l_name).status == cli.SKIPPED
+    a2l_dir.join("variants", "ecu1.a2l").write(A2L + "\n")
+    assert not cli.up_to_date(a2l_name)
+
+
+def test_up_to_date_leaves_database_alone(a2l_dir, dbname):
+    conn = sqlite3.connect(dbname)
+    conn.execute("UPDATE metadata SET schema_version = 12")
+    conn.commit()
+    assert cli.up_to_date(str(a2l_dir.join("variants", "ecu1.a2l")))
+    assert conn.execute("SELECT schema_version FROM metadata").fetchone() == (12, )
+    conn.close()
+
+
+@pytest.mark.parametrize("jobs", [1, 2])
+def test_import_cancelled(a2l_dir, jobs):
+    token = CancellationToken()
+    token.cancel()
+    file_names = cli.expand([os.path.join(str(a2l_dir), "variants", "*.a2l")])
+    reported = []
+    results = cli.run_import(file_names, jobs, report = reported.append, progress = lambda *args: None, cancel = token)
+    assert [r.status for r in results] == [cli.CANCELLED, cli.CANCELLED]
+    assert sorted(reported) == sorted(results)
+    assert not any(os.path.exists(cli.database_name(f)) for f in file_names)
+
+
+def test_info(dbname, capsys):
+    assert cli.main(["info", dbname, "--json"]) == cli.EXIT_OK
+    result = json.loads(capsys.readouterr().out)
+    assert result["schema_version"] == model.CURRENT_SCHEMA_VERSION
+    assert result["elements"]["MEASUREMENT"] == 1
+    assert len(result["source_hash"]) == 64
+
+
+def test_query_export_validate(dbname, tmpdir, capsys):
+    assert cli.main(["query", dbname, "crankshaft"]) == cli.EXIT_OK
+    assert "ENGINE_SPEED" in capsys.readouterr().out
+    assert cli.main(["query", dbname, "ENGINE_SPEED", "--name", "--kind", "characteristic"]) == cli.EXIT_FAILED
+    assert cli.main(["query", dbname, "x", "--kind", "foo"]) == cli.EXIT_USAGE
+    output = str(tmpdir.join("measurements.csv"))
+    assert cli.main(["export", dbname, "measurement", "-o", output]) == cli.EXIT_OK
+    rows = list(csv.DictReader(open(output)))
+    assert [row["name"] for row in rows] == ["ENGINE_SPEED"]
+    assert cli.main(["validate", dbname]) == cli.EXIT_OK
+    assert cli.main(["validate", dbname, "--rule", "no-such-rule"]) == cli.EXIT_USAGE
+    capsys.readouterr()
+    db = model.A2LDatabase(dbname)
+    db.session.add(model.Characteristic(name = "ENGINE_SPEED", longIdentifier = "", type = "VALUE", address = 0,
+        deposit = "RL", maxDiff = 0.0, conversion = "NO_COMPU_METHOD", lowerLimit = 0.0, upperLimit = 1.0)
+    )
+    db.session.commit()
+    db.close()
+    assert cli.main(["validate", dbname, "--json", "-r", "duplicate-names"]) == cli.EXIT_FAILED
+    result = json.loads(capsys.readouterr().out)
+    assert (result["errors"], result["integrity"]) == (2, [])
+    assert cli.main(["info", str(tmpdir.join("missing"))]) == cli.EXIT_USAGE
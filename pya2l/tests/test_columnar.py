@@ -0,0 +1,70 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import pytest
+
+import pya2l.model as model
+from pya2l.model import columnar
+
+
+def elements():
+    return [
+        model.CompuMethod(name = "CM.RPM", longIdentifier = "", conversionType = "IDENTICAL", format = "%6.0", unit = "rpm"),
+        model.Measurement(name = "N", longIdentifier = "engine speed", datatype = "UWORD", conversion = "CM.RPM",
+            resolution = 0, accuracy = 0.0, lowerLimit = 0.0, upperLimit = 8000.0,
+            ecu_address = model.EcuAddress(address = 0x1000), byte_order = model.ByteOrder(byteOrder = "MSB_LAST"),
+            matrix_dim = model.MatrixDim(xDim = 2, yDim = 1, zDim = 1), read_write = model.ReadWrite()
+        ),
+        model.Measurement(name = "T", longIdentifier = "", datatype = "SBYTE", conversion = "CM.RPM",
+            resolution = 0, accuracy = 0.0, lowerLimit = -40.0, upperLimit = 120.0, phys_unit = model.PhysUnit(unit = "degC")
+        ),
+    ]
+
+
+def database(tmpdir, name, denormalized):
+    db = model.A2LDatabase(str(tmpdir.join(name)))
+    db.session.add(model.Module(name = "ECU", longIdentifier = "", compu_method = elements()[ : 1],
+        measurement = elements()[1 : ])
+    )
+    db.session.commit()
+    db.resolve_references()
+    if denormalized:
+        db.denormalize()
+    return db
+
+
+def rows(db, klass, chunk_size = columnar.CHUNK_SIZE):
+    view = columnar.view(db, klass)
+    names = [field.name for field in view.fields]
+    return [dict(zip(names, row)) for columns in view.chunks(db.session, chunk_size) for row in zip(*columns)]
+
+
+@pytest.fixture(params = [False, True], ids = ["normalized", "denormalized"])
+def db(request, tmpdir):
+    db = database(tmpdir, "flat", request.param)
+    yield db
+    db.close()
+
+
+def test_view(db):
+    n, t = rows(db, model.Measurement, chunk_size = 1)
+    assert (n["module"], n["name"], n["datatype"], n["conversion"], n["upperLimit"]) == ("ECU", "N", "UWORD", "CM.RPM", 8000.0)
+    assert (n["ecu_address"], n["byte_order"], n["unit"], n["read_write"]) == (0x1000, "MSB_LAST", "rpm", True)
+    assert (n["matrix_dim_xDim"], n["matrix_dim_yDim"], n["matrix_dim_zDim"]) == (2, 1, 1)
+    assert (t["ecu_address"], t["byte_order"], t["unit"], t["read_write"]) == (None, None, "degC", False)
+    assert "annotation" not in n
+    assert [row["unit"] for row in rows(db, model.CompuMethod)] == ["rpm"]
+
+
+def test_write(db, tmpdir):
+    pa = pytest.importorskip("pyarrow")
+    import pyarrow.parquet as pq
+
+    result = columnar.export(db, str(tmpdir.join("parquet")), ["MEASUREMENT", "COMPU_METHOD"])
+    assert [(kind, count) for kind, (_, count) in result.items()] == [("MEASUREMENT", 2), ("COMPU_METHOD", 1)]
+    table = pq.read_table(result["MEASUREMENT"][0])
+    assert table.column("ecu_address").to_pylist() == [0x1000, None]
+    assert table.schema.field("read_write").type == pa.bool_()
+    file_name = str(tmpdir.join("measurement.arrow"))
+    assert columnar.write(db, model.Measurement, file_name, "arrow", chunk_size = 1) == 2
+    assert pa.ipc.open_file(file_name).read_all().column("unit").to_pylist() == ["rpm", "degC"]
@@ -0,0 +1,98 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import pytest
+from sqlalchemy import event
+
+import pya2l.model as model
+
+
+@pytest.fixture
+def db(tmpdir):
+    db = model.A2LDatabase(str(tmpdir.join("flat.a2ldb")))
+    session = db.session
+    for idx in range(1000):
+        session.add(model.Measurement(name = "M{}".format(idx), longIdentifier = "", datatype = "UBYTE",
+            conversion = "CM", resolution = 0, accuracy = 0.0, lowerLimit = 0.0, upperLimit = 255.0,
+            ecu_address = model.EcuAddress(address = 0x1000 + idx), byte_order = model.ByteOrder(byteOrder = "MSB_LAST"),
+            bit_mask = model.BitMask(mask = 0x0f), format = model.Format(formatString = "%3.1"),
+            phys_unit = model.PhysUnit(unit = "km/h"), display_identifier = model.DisplayIdentifier(display_name = "D{}".format(idx)),
+            ecu_address_extension = model.EcuAddressExtension(extension = 2))
+        )
+    session.add(model.Characteristic(name = "C0", longIdentifier = "", type = "VALUE", address = 0x2000,
+        deposit = "RL", maxDiff = 0.0, conversion = "CM", lowerLimit = 0.0, upperLimit = 100.0,
+        byte_order = model.ByteOrder(byteOrder = "MSB_FIRST"))
+    )
+    session.add(model.AxisDescr(attribute = "STD_AXIS", inputQuantity = "M0", conversion = "CM",
+        maxAxisPoints = 8, lowerLimit = 0.0, upperLimit = 10.0, byte_order = model.ByteOrder(byteOrder = "MSB_FIRST"))
+    )
+    session.commit()
+    return db
+
+
+def test_values_are_preserved(db):
+    assert not db.denormalized
+    db.denormalize()
+    assert db.denormalized
+    meas = db.session.query(model.Measurement).filter(model.Measurement.name == "M7").one()
+    assert meas.flat_ecu_address == 0x1007
+    assert meas.ecu_address.address == 0x1007
+    assert meas.byte_order.byteOrder == "MSB_LAST"
+    assert meas.bit_mask.mask == 0x0f
+    assert meas.format.formatString == "%3.1"
+    assert meas.phys_unit.unit == "km/h"
+    assert meas.display_identifier.display_name == "D7"
+    assert meas.ecu_address_extension.extension == 2
+    assert meas.array_size is None
+    chx = db.session.query(model.Characteristic).one()
+    assert chx.byte_order.byteOrder == "MSB_FIRST"
+    assert chx.bit_mask is None
+
+
+def test_no_lazy_loads(db):
+    db.denormalize()
+    count = [0]
+    event.listen(db.engine, "before_cursor_execute", lambda *args: count.__setitem__(0, count[0] + 1))
+    for meas in db.session.query(model.Measurement):
+        meas.ecu_address.address, meas.byte_order.byteOrder, meas.phys_unit.unit
+    assert count[0] == 1
+
+
+def test_redundant_rows_removed(db):
+    db.denormalize()
+    session = db.session
+    for klass in (model.BitMask, model.DisplayIdentifier, model.EcuAddress, model.EcuAddressExtension, model.Format,
+            model.PhysUnit):
+        assert session.query(klass).count() == 0
+    # Still referenced by AXIS_DESCR.
+    assert session.query(model.ByteOrder).count() == 1
+    assert session.query(model.AxisDescr).one().byte_order.byteOrder == "MSB_FIRST"
+
+
+def test_denormalize_twice(db):
+    db.denormalize()
+    db.denormalize()
+    meas = db.session.query(model.Measurement).filter(model.Measurement.name == "M7").one()
+    assert meas.flat_ecu_address == 0x1007 and meas.flat_byte_order == "MSB_LAST"
+    assert meas.ecu_address.address == 0x1007 and meas.phys_unit.unit == "km/h"
+
+
+def test_restored_elements_are_not_saved(db):
+    db.denormalize()
+    session = db.session
+    meas = session.query(model.Measurement).filter(model.Measurement.name == "M7").one()
+    meas.upperLimit = 200.0
+    session.add(meas)
+    session.commit()
+    assert session.query(model.EcuAddress).count() == 0
+    assert session.query(model.ByteOrder).count() == 1
+    with pytest.raises(AttributeError, match = "flat_ecu_address"):
+        meas.ecu_address.address = 0x99
+    meas.flat_ecu_address = 0x99
+    meas.phys_unit = model.PhysUnit(unit = "m/s")
+    session.commit()
+    session.expire_all()
+    meas = session.query(model.Measurement).filter(model.Measurement.name == "M7").one()
+    assert meas.upperLimit == 200.0 and meas.ecu_address.address == 0x99
+    assert meas.flat_phys_unit is None and meas.phys_unit.unit == "m/s"
+    assert session.query(model.PhysUnit).count() == 1
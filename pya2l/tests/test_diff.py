@@ -0,0 +1,72 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+from functools import partial
+import json
+
+import pytest
+
+from pya2l import cli
+
+import pya2l.model as model
+from pya2l.model import content, diff
+from pya2l.tests import helpers
+
+
+measurement = partial(helpers.measurement, address = 0x1000, byte_order = "MSB_LAST")
+
+
+def database(tmpdir, name, elements, denormalized = False):
+    db = model.A2LDatabase(str(tmpdir.join(name)))
+    db.session.add(model.Module(name = "ECU", longIdentifier = "", measurement = elements))
+    db.session.commit()
+    if denormalized:
+        db.denormalize()
+    return db
+
+
+@pytest.fixture
+def databases(tmpdir):
+    old = database(tmpdir, "v1", [measurement("N"), measurement("TQ"), measurement("GONE")])
+    new = database(tmpdir, "v2", [measurement("NEW"), measurement("TQ", upper = 200.0, address = 0x2000,
+        annotation = [model.Annotation(annotation_label = model.AnnotationLabel(label = "changed"))]), measurement("N")],
+        denormalized = True
+    )
+    yield old, new
+    old.close()
+    new.close()
+
+
+def test_digests(databases):
+    old, new = (content.Snapshot(db.session) for db in databases)
+    old_digests, new_digests = old.digests(), new.digests()
+    assert old_digests[("MEASUREMENT", "N", 0)][1] == new_digests[("MEASUREMENT", "N", 0)][1]
+    assert old_digests[("MEASUREMENT", "TQ", 0)][1] != new_digests[("MEASUREMENT", "TQ", 0)][1]
+    assert old_digests[("MODULE", "ECU", 0)][1] == new_digests[("MODULE", "ECU", 0)][1]
+
+
+def test_diff(databases):
+    changes = diff.diff(*databases)
+    assert [(change.kind, change.name, change.status) for change in changes.changes] == [
+        ("MEASUREMENT", "TQ", "modified"),
+        ("MEASUREMENT", "GONE", "removed"),
+        ("MEASUREMENT", "NEW", "added"),
+    ]
+    assert changes.modified[0].deltas == [
+        diff.Delta("upperLimit", 100.0, 200.0),
+        diff.Delta("ecu_address[0].address", 0x1000, 0x2000),
+        diff.Delta("annotation[0].annotation_label[0].label", None, "changed"),
+    ]
+    assert changes.summary()["MEASUREMENT"] == {"added": 1, "removed": 1, "modified": 1}
+    assert len(diff.diff(databases[0], databases[0])) == 0
+
+
+def test_cli(databases, capsys):
+    old, new = (db.dbname for db in databases)
+    for db in databases:
+        db.close()
+    assert cli.main(["diff", old, old]) == cli.EXIT_OK
+    capsys.readouterr()
+    assert cli.main(["diff", old, new, "--json"]) == cli.EXIT_FAILED
+    result = json.loads(capsys.readouterr().out)
+    assert result["summary"]["MEASUREMENT"] == {"added": 1, "removed": 1, "modified": 1}
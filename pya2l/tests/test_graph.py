@@ -0,0 +1,66 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import pytest
+
+import pya2l.model as model
+from pya2l.model import graph
+from pya2l.tests.helpers import identifiers, measurement
+
+
+@pytest.fixture
+def db():
+    db = model.A2LDatabase(":memory:")
+    session = db.session
+    session.add_all([measurement(name, "NO_COMPU_METHOD") for name in ("N", "TQ", "TQ_REQ", "IGN", "UNUSED")])
+    session.add(model.Characteristic(name = "KF_IGN", longIdentifier = "", type = "MAP", address = 0, deposit = "RL",
+        maxDiff = 0.0, conversion = "NO_COMPU_METHOD", lowerLimit = 0.0, upperLimit = 1.0)
+    )
+    session.add_all([
+        model.Function(name = "ENGINE", longIdentifier = "", sub_function = identifiers(model.SubFunction, "TORQUE", "MISSING")),
+        model.Function(name = "TORQUE", longIdentifier = "", sub_function = identifiers(model.SubFunction, "IGNITION"),
+            in_measurement = identifiers(model.InMeasurement, "N", "TQ_REQ"),
+            out_measurement = identifiers(model.OutMeasurement, "TQ")
+        ),
+        model.Function(name = "IGNITION", longIdentifier = "", in_measurement = identifiers(model.InMeasurement, "TQ"),
+            out_measurement = identifiers(model.OutMeasurement, "IGN"),
+            def_characteristic = identifiers(model.DefCharacteristic, "KF_IGN")
+        ),
+        model.Group(groupName = "ALL", groupLongIdentifier = "", root = model.Root(),
+            sub_group = identifiers(model.SubGroup, "SPARK")
+        ),
+        model.Group(groupName = "SPARK", groupLongIdentifier = "",
+            ref_characteristic = identifiers(model.RefCharacteristic, "KF_IGN"),
+            ref_measurement = identifiers(model.RefMeasurement, "IGN")
+        ),
+        model.Group(groupName = "OTHER", groupLongIdentifier = "", ref_measurement = identifiers(model.RefMeasurement, "IGN")),
+    ])
+    session.commit()
+    return db
+
+
+@pytest.mark.parametrize("vectorized", [True, False])
+def test_queries(db, vectorized, monkeypatch):
+    if not vectorized:
+        monkeypatch.setattr(graph, "np", None)
+    elif graph.np is None:
+        pytest.skip("NumPy not installed")
+    g = graph.for_database(db)
+    assert graph.for_database(db) is g
+    assert g.unresolved["sub_function"] == 1
+    assert g.sub_functions("ENGINE") == ["TORQUE", "IGNITION"]
+    assert g.sub_functions("ENGINE", transitive = False) == ["TORQUE"]
+    assert g.downstream("N") == ["TQ", "IGN"]
+    assert g.upstream("IGN") == ["N", "TQ", "TQ_REQ"]
+    assert g.upstream("UNUSED") == g.downstream("NO_SUCH_SIGNAL") == []
+    assert g.groups_containing("IGN") == ["ALL", "SPARK", "OTHER"]
+    assert g.groups_containing("KF_IGN", transitive = False) == ["SPARK"]
+    assert g.root_groups() == ["ALL"]
+
+
+def test_adjacency():
+    adjacency = graph.Adjacency.from_edges(4, [2, 0, 2], [1, 3, 0])
+    assert list(adjacency.offsets) == [0, 1, 1, 3, 3]
+    assert list(adjacency.neighbours(2)) == [1, 0]
+    transposed = adjacency.transposed()
+    assert [list(transposed.neighbours(node)) for node in range(4)] == [[2], [2], [], [0]]
@@ -0,0 +1,65 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import io
+import json
+import tracemalloc
+
+import pytest
+
+from pya2l import instrumentation as instr
+
+
+def test_reporter():
+    with instr.Reporter(trace_memory = True) as reporter:
+        with reporter.phase("lex") as phase:
+            phase.tokens = 42
+        with reporter.phase("listener") as phase:
+            data = [bytearray(1024) for _ in range(1024)]
+            phase.nodes = 7
+        del data
+        assert tracemalloc.is_tracing()
+    assert not tracemalloc.is_tracing()
+    lex, listener = reporter.phases
+    assert (lex.name, lex.tokens, listener.nodes) == ("lex", 42, 7)
+    assert listener.memory_peak > 1024 * 1024
+    assert reporter.total == lex.elapsed + listener.elapsed
+    result = json.loads(reporter.json())
+    assert [p["name"] for p in result["phases"]] == ["lex", "listener"]
+    out = io.StringIO()
+    reporter.print_table(file = out)
+    lines = out.getvalue().splitlines()
+    assert lines[0].split() == ["phase", "seconds", "peak", "MiB", "tokens", "nodes", "objects"]
+    assert lines[1].split()[0 : 1] + lines[1].split()[3 : ] == ["lex", "42", "-", "-"]
+    assert lines[-1].startswith("total")
+
+
+def test_print_table_to_current_stdout(capsys):
+    reporter = instr.Reporter()
+    with reporter.phase("parse"):
+        pass
+    reporter.print_table()
+    assert capsys.readouterr().out.splitlines()[1].startswith("parse")
+
+
+def test_callback_on_error():
+    events = []
+    callback = instr.Callback(lambda event, phase: events.append((event, phase.name, phase.elapsed is not None)))
+    with pytest.raises(ValueError):
+        with callback.phase("commit"):
+            raise ValueError()
+    assert events == [("start", "commit", False), ("stop", "commit", True)]
+
+
+def test_null_instrumentation():
+    null = instr.get(None)
+    assert not null.counting
+    with null.phase("parse") as phase:
+        pass
+    assert phase.elapsed is None
+    reporter = instr.Reporter()
+    assert instr.get(reporter) is reporter
+    assert reporter.counting
+    with reporter.phase("parse") as phase:
+        pass
+    assert phase.memory_peak is None and not tracemalloc.is_tracing()
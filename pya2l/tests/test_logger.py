@@ -0,0 +1,62 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import logging
+from collections import namedtuple
+
+from pya2l.a2l_listener import BaseListener
+from pya2l.logger import Logger
+
+Token = namedtuple("Token", "line column")
+Location = namedtuple("Location", "start")
+
+
+def test_handler_installed_once():
+    loggers = [Logger("test_handler") for _ in range(10)]
+    assert len(loggers[-1].logger.handlers) == 1
+    for _ in range(10):
+        BaseListener()
+    assert len(logging.getLogger("pya2l.pya2l.a2l_listener").handlers) == 1
+
+
+def test_level_kept():
+    Logger("test_level").setLevel("DEBUG")
+    assert Logger("test_level").isEnabledFor(logging.DEBUG)
+    assert not Logger("test_level", logging.ERROR).isEnabledFor(logging.WARN)
+
+
+def test_lazy_formatting():
+    logger = Logger("test_lazy")
+    logger.info("%s", 42)
+    logger.error("%d%%", 100)
+    assert logger.getLastError() == (logging.ERROR, "100%")
+    assert logger.getLastError() == (None, None)
+
+
+def test_disabled_levels_not_formatted(monkeypatch):
+    listener = BaseListener()
+    calls = []
+    monkeypatch.setattr(listener, "_formatMessage", lambda msg, location: calls.append(msg) or msg)
+    location = Location(Token(1, 0))
+    listener.debug("debug", location)
+    listener.info("info", location)
+    assert calls == []
+    listener.warn("warning", location)
+    assert calls == ["warning"]
+    assert listener.logger.getLastError() == (logging.WARN, "warning")
+
+
+def test_locations_from_source_map(capsys):
+    from pya2l.a2l_listener import MyErrorListener
+    from pya2l.preprocessor import SourceMap
+
+    source_map = SourceMap()
+    source_map.add(1, "main.a2l", 1)
+    source_map.add(3, "inc.a2l", 1)
+    listener = BaseListener()
+    listener.source_map = source_map
+    listener.warn("strange", Location(Token(4, 2)))
+    assert listener.logger.getLastError() == (logging.WARN, "[inc.a2l:2:3] strange")
+    assert "[inc.a2l:2:3] strange" in capsys.readouterr().err
+    MyErrorListener(source_map).syntaxError(None, None, 2, 0, "extraneous input", None)
+    assert capsys.readouterr().err == "main.a2l:2:0: extraneous input\n"
@@ -0,0 +1,64 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import pytest
+
+import pya2l.model as model
+from pya2l.tests.helpers import identifiers
+
+
+@pytest.fixture
+def db():
+    db = model.A2LDatabase(":memory:")
+    db.session.add_all([
+        model.Function(name = "IGNITION", longIdentifier = "", in_measurement = identifiers(model.InMeasurement, "N", "TQ"),
+            def_characteristic = identifiers(model.DefCharacteristic, "KF_IGN"),
+            ref_characteristic = identifiers(model.RefCharacteristic, "KF_IGN")
+        ),
+        model.Group(groupName = "SPARK", groupLongIdentifier = "", ref_measurement = identifiers(model.RefMeasurement, "N"),
+            ref_characteristic = identifiers(model.RefCharacteristic, "KF_IGN")
+        ),
+    ])
+    db.session.commit()
+    return db
+
+
+def members(db, name, roles = None):
+    return [(member.kind, member.name, member.role) for member in db.memberships(name, roles)]
+
+
+@pytest.mark.parametrize("indexed", [False, True])
+def test_lookup(db, indexed):
+    if indexed:
+        db.index_members()
+    assert members(db, "KF_IGN") == [
+        ("FUNCTION", "IGNITION", "DEF_CHARACTERISTIC"),
+        ("FUNCTION", "IGNITION", "REF_CHARACTERISTIC"),
+        ("GROUP", "SPARK", "REF_CHARACTERISTIC"),
+    ]
+    assert members(db, "N", roles = ["REF_MEASUREMENT"]) == [("GROUP", "SPARK", "REF_MEASUREMENT")]
+    assert members(db, "UNKNOWN") == []
+    assert db.members_indexed == indexed
+    assert db.session.query(model.Membership).count() == (6 if indexed else 0)
+
+
+def test_incremental_updates(db):
+    db.index_members()
+    session = db.session
+    function = session.query(model.Function).one()
+    function.in_measurement.identifier.append("RL")
+    function.in_measurement.identifier.remove("N")
+    session.commit()
+    function.in_measurement.identifier.remove("TQ")
+    group = session.query(model.Group).one()
+    session.delete(group.ref_measurement)
+    group.ref_characteristic = identifiers(model.RefCharacteristic, "KF_DWELL")
+    session.add(model.Function(name = "DWELL", longIdentifier = "", out_measurement = identifiers(model.OutMeasurement, "RL")))
+    session.commit()
+    assert members(db, "RL") == [("FUNCTION", "IGNITION", "IN_MEASUREMENT"), ("FUNCTION", "DWELL", "OUT_MEASUREMENT")]
+    assert members(db, "N") == members(db, "TQ") == []
+    assert members(db, "KF_IGN") == [("FUNCTION", "IGNITION", "DEF_CHARACTERISTIC"), ("FUNCTION", "IGNITION", "REF_CHARACTERISTIC")]
+    assert members(db, "KF_DWELL") == [("GROUP", "SPARK", "REF_CHARACTERISTIC")]
+    rows = session.query(model.Membership).count()
+    db.index_members()
+    assert session.query(model.Membership).count() == rows
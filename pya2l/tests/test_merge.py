@@ -0,0 +1,80 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import json
+
+import pytest
+
+from pya2l import cli
+
+import pya2l.model as model
+from pya2l.model import merge, search
+from pya2l.tests.helpers import measurement
+
+
+def compu_method(name, format_ = "%6.2"):
+    return model.CompuMethod(name = name, longIdentifier = "", conversionType = "RAT_FUNC", format = format_, unit = "",
+        coeffs = model.Coeffs(a = 0.0, b = 1.0, c = 0.0, d = 0.0, e = 0.0, f = 1.0)
+    )
+
+
+def database(tmpdir, name, module, denormalized = False):
+    db = model.A2LDatabase(str(tmpdir.join(name)))
+    db.session.add(model.Asap2Version(versionNo = 1, upgradeNo = 61))
+    db.session.add(model.Project(name = name.upper(), longIdentifier = "", module = [module]))
+    db.session.commit()
+    if denormalized:
+        db.denormalize()
+    return db
+
+
+@pytest.fixture
+def sources(tmpdir):
+    engine = database(tmpdir, "engine", model.Module(name = "ENGINE", longIdentifier = "",
+        compu_method = [compu_method("CM.RPM"), compu_method("CM.PERCENT")],
+        measurement = [measurement("N", "CM.RPM", 0x1000)],
+        if_data = [model.IfData(name = "XCP_ENGINE")],
+    ))
+    gearbox = database(tmpdir, "gearbox", model.Module(name = "GEARBOX", longIdentifier = "",
+        compu_method = [compu_method("CM.RPM"), compu_method("CM.PERCENT", "%4.1")],
+        measurement = [measurement("N_OUT", "CM.RPM", 0x2000)],
+        if_data = [model.IfData(name = "XCP_GEARBOX")],
+    ), denormalized = True)
+    yield engine, gearbox
+    engine.close()
+    gearbox.close()
+
+
+def test_merge(sources, tmpdir):
+    target = model.A2LDatabase(str(tmpdir.join("powertrain")))
+    result = merge.merge(sources, target, module_name = "POWERTRAIN")
+    assert result.copied == {"COMPU_METHOD": 2, "MEASUREMENT": 2}
+    assert result.duplicates == {"COMPU_METHOD": 1}
+    assert [(c.kind, c.name) for c in result.conflicts] == [("COMPU_METHOD", "CM.PERCENT")]
+    assert result.conflicts[0].kept.endswith("engine.a2ldb") and result.conflicts[0].dropped.endswith("gearbox.a2ldb")
+    assert not result.ok and result.dangling_references == []
+    session = target.session
+    project, = session.query(model.Project).all()
+    assert project.name == "ENGINE"
+    assert [module.name for module in project.module] == ["POWERTRAIN"]
+    assert [item.name for item in project.module[0].if_data] == ["XCP_ENGINE", "XCP_GEARBOX"]
+    assert session.query(model.Asap2Version).count() == 1
+    assert session.query(model.CompuMethod).filter(model.CompuMethod.name == "CM.PERCENT").one().format == "%6.2"
+    measurements = {meas.name: meas for meas in session.query(model.Measurement)}
+    assert {name: meas.ecu_address.address for name, meas in measurements.items()} == {"N": 0x1000, "N_OUT": 0x2000}
+    assert measurements["N_OUT"].conversion_rid == measurements["N"].conversion_rid
+    assert measurements["N"].conversion_rid is not None
+    assert target.denormalized and target.members_indexed
+    assert [hit.name for hit in search.search(session, "N_OUT")] == ["N_OUT"]
+    target.close()
+
+
+def test_cli(sources, tmpdir, capsys):
+    names = [db.dbname for db in sources]
+    for db in sources:
+        db.close()
+    output = str(tmpdir.join("merged.a2ldb"))
+    assert cli.main(["merge", "-o", output, "--json"] + names) == cli.EXIT_FAILED
+    assert json.loads(capsys.readouterr().out)["duplicates"] == {"COMPU_METHOD": 1}
+    assert cli.main(["merge", "-o", output, names[0]]) == cli.EXIT_USAGE
+    assert cli.main(["merge", "-o", output, "--force", names[0]]) == cli.EXIT_OK
@@ -0,0 +1,88 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import io
+import json
+
+import pytest
+
+from pya2l import cli
+
+import pya2l.model as model
+from pya2l.model import content, ndjson, search
+from pya2l.tests import helpers
+
+
+def measurement(name, address):
+    return helpers.measurement(name, address = address,
+        function_list = model.FunctionList(name = ["F"]), if_data = [model.IfData(name = "XCP")],
+        annotation = [model.Annotation(annotation_label = model.AnnotationLabel(label = "doc"),
+            annotation_text = model.AnnotationText(text = ["line 1", "line 2"]))
+        ]
+    )
+
+
+@pytest.fixture
+def db():
+    db = model.A2LDatabase(":memory:")
+    db.session.add(model.Asap2Version(versionNo = 1, upgradeNo = 61))
+    db.session.add(model.Project(name = "P", longIdentifier = "", module = [model.Module(name = "ECU", longIdentifier = "",
+        measurement = [measurement("N", 0x1000), measurement("TQ", 0x2000)],
+        function = [model.Function(name = "F", longIdentifier = "", in_measurement = model.InMeasurement(identifier = ["TQ", "N"]))],
+    )]))
+    db.session.commit()
+    yield db
+    db.close()
+
+
+def test_round_trip(db):
+    out = io.StringIO()
+    assert ndjson.dump(db, out, chunk_size = 1) == 6
+    lines = [json.loads(line) for line in out.getvalue().splitlines()]
+    assert [line["kind"] for line in lines] == ["ASAP2_VERSION", "PROJECT", "MODULE", "FUNCTION", "MEASUREMENT", "MEASUREMENT"]
+    assert lines[3]["IN_MEASUREMENT"] == {"identifier": ["TQ", "N"]}
+    n = lines[4]
+    assert n["module"] == "ECU" and n["name"] == "N" and n["ECU_ADDRESS"] == {"address": 0x1000}
+    assert n["FUNCTION_LIST"] == {"name": ["F"]} and n["IF_DATA"] == [{"name": "XCP"}]
+    assert n["ANNOTATION"] == [{"ANNOTATION_LABEL": {"label": "doc"}, "ANNOTATION_TEXT": {"text": ["line 1", "line 2"]}}]
+
+    loaded = model.A2LDatabase(":memory:")
+    assert ndjson.load(loaded, io.StringIO(out.getvalue()), batch_size = 2) == 6
+    assert [digest for _, digest in content.Snapshot(loaded.session).digests().values()] == [
+        digest for _, digest in content.Snapshot(db.session).digests().values()
+    ]
+    again = io.StringIO()
+    ndjson.dump(loaded, again)
+    assert again.getvalue() == out.getvalue()
+    assert [(member.kind, member.name, member.role) for member in loaded.memberships("N")] == [("FUNCTION", "F", "IN_MEASUREMENT")]
+    assert [hit.name for hit in search.search(loaded.session, "TQ")] == ["TQ"]
+    loaded.close()
+
+
+def test_errors():
+    db = model.A2LDatabase(":memory:")
+    with pytest.raises(ValueError, match = "line 2: unknown kind 'MEASURMENT'"):
+        ndjson.load(db, ['{"kind": "MODULE", "name": "ECU", "longIdentifier": ""}', '{"kind": "MEASURMENT"}'])
+    with pytest.raises(ValueError, match = "line 1: "):
+        ndjson.load(db, ["{not json"])
+    for line in ('[1, 2]', '"x"'):
+        with pytest.raises(ValueError, match = "line 2: expected a JSON object"):
+            ndjson.load(db, ["", line])
+    db.close()
+
+
+def test_cli(db, tmpdir, capsys):
+    name = str(tmpdir.join("ecu.a2ldb"))
+    source = model.A2LDatabase(name)
+    out = io.StringIO()
+    ndjson.dump(db, out)
+    ndjson.load(source, io.StringIO(out.getvalue()))
+    source.close()
+    dump = str(tmpdir.join("ecu.ndjson"))
+    assert cli.main(["dump", name, "-o", dump]) == cli.EXIT_OK
+    assert cli.main(["load", dump, "-o", str(tmpdir.join("copy"))]) == cli.EXIT_OK
+    assert cli.main(["load", dump, "-o", str(tmpdir.join("copy"))]) == cli.EXIT_USAGE
+    capsys.readouterr()
+    assert cli.main(["export", name, "MEASUREMENT", "--format", "ndjson"]) == cli.EXIT_OK
+    assert [json.loads(line)["name"] for line in capsys.readouterr().out.splitlines()] == ["N", "TQ"]
+    assert cli.main(["dump", name, "-k", "ECU_ADDRESS"]) == cli.EXIT_USAGE
@@ -2,6 +2,7 @@
 import pytest
 
 from pya2l import preprocessor
+from pya2l.exceptions import IncludeError
 
 def splitter(text):
     return text.splitlines()
@@ -61,3 +62,83 @@ def test_c_comment_containing_a_cpp_comment3(prep):
     assert prep(splitter("C comment / multiline  /* containing a\n// C++ comment */after comment")) == \
                          "C comment / multiline                 \nafter comment"
 
+
+
+@pytest.fixture
+def includes(tmpdir):
+    shared = tmpdir.mkdir("shared")
+    shared.join("units.a2l").write('/begin UNIT U1 ""\n/end UNIT\n')
+    shared.join("methods.a2l").write('/include "units.a2l"\n/begin COMPU_METHOD CM ""\n/end COMPU_METHOD\n')
+    tmpdir.join("main.a2l").write('/begin PROJECT P ""\n  /* /include "nope.a2l" */ /include methods.a2l x\n'
+        '  "/include strings.a2l"\n/end PROJECT\n'
+    )
+    return tmpdir
+
+
+def test_include(includes):
+    cache = preprocessor.IncludeCache()
+    prep = preprocessor.Preprocessor([str(includes.join("shared"))], cache)
+    result = prep.read(str(includes.join("main.a2l")))
+    lines = result.text.splitlines()
+    assert "/begin UNIT U1" in result.text and "/begin COMPU_METHOD CM" in result.text
+    assert "nope.a2l" in result.text and "strings.a2l" in result.text
+    source_map = result.source_map
+    main = str(includes.join("main.a2l"))
+    units = str(includes.join("shared", "units.a2l"))
+    methods = str(includes.join("shared", "methods.a2l"))
+    assert source_map.lookup(1) == (main, 1)
+    unit = lines.index('/begin UNIT U1 ""') + 1
+    assert source_map.lookup(unit) == (units, 1)
+    assert source_map.lookup(lines.index('/begin COMPU_METHOD CM ""') + 1) == (methods, 2)
+    rest = [idx for idx, line in enumerate(lines, 1) if line.strip() == "x"][0]
+    assert source_map.lookup(rest) == (main, 2)
+    # Columns are kept.
+    assert lines[rest - 1].index("x") == '  /* /include "nope.a2l" */ /include methods.a2l x'.index("x")
+    assert source_map.lookup(len(lines)) == (main, 4)
+    # Cached, unless modified.
+    assert cache.get((methods, prep.includes.include_paths)) is not None
+    assert prep.read(main).source_hash == result.source_hash
+    includes.join("shared", "units.a2l").write('/begin UNIT U2 ""\n/end UNIT\n')
+    assert cache.get((methods, prep.includes.include_paths)) is None
+    changed = prep.read(main)
+    assert "U2" in changed.text and changed.source_hash != result.source_hash
+
+
+def test_include_errors(includes):
+    prep = preprocessor.Preprocessor(cache = preprocessor.IncludeCache())
+    with pytest.raises(IncludeError):
+        prep.read(str(includes.join("main.a2l")))
+    includes.join("a.a2l").write('/include "b.a2l"\n')
+    includes.join("b.a2l").write('/include "a.a2l"\n')
+    with pytest.raises(IncludeError, match = "recursive"):
+        prep.read(str(includes.join("a.a2l")))
+
+
+def test_no_include(includes):
+    text = '/begin PROJECT P ""\n/end PROJECT\n'
+    expanded = preprocessor.Includes().expand(text, "x.a2l")
+    assert expanded.text is text
+    assert expanded.source_map.lookup(2) == ("x.a2l", 2)
+
+
+def test_include_without_argument(includes):
+    # Not taken from the next line.
+    text = '/begin PROJECT P ""\n/include\nunits.a2l\n/end PROJECT\n'
+    expanded = preprocessor.Includes([str(includes.join("shared"))]).expand(text, "x.a2l")
+    assert expanded.text is text
+
+
+def test_source_map_is_run_length_encoded():
+    source_map = preprocessor.SourceMap()
+    source_map.add(1, "main.a2l", 1)
+    for line in range(2, 10000000, 100000):
+        source_map.add(line, "main.a2l", line)     # Continuations don't add segments.
+    assert len(source_map) == 1
+    for idx in range(1000):
+        source_map.add(10000000 + 2 * idx, "inc{}.a2l".format(idx % 10), 1)
+        source_map.add(10000000 + 2 * idx + 1, "main.a2l", 10000000 + idx)
+    assert len(source_map) == 2001
+    assert source_map.nbytes <= 12 * 2001
+    assert source_map.lookup(9999999) == ("main.a2l", 9999999)
+    assert source_map.lookup(10000000 + 2 * 999) == ("inc9.a2l", 1)
+    assert source_map.location(10000000 + 2 * 999 + 1, 5) == "main.a2l:10000999:5"
@@ -0,0 +1,81 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import pytest
+from sqlalchemy import event
+
+import pya2l.model as model
+from pya2l.model import profiles
+
+
+@pytest.fixture
+def session():
+    db = model.A2LDatabase(":memory:")
+    session = db.session
+    for idx in range(50):
+        session.add(model.Measurement(name = "M{}".format(idx), longIdentifier = "", datatype = "UBYTE",
+            conversion = "CM{}".format(idx % 5), resolution = 0, accuracy = 0.0, lowerLimit = 0.0, upperLimit = 255.0,
+            ecu_address = model.EcuAddress(address = idx), byte_order = model.ByteOrder(byteOrder = "MSB_LAST"),
+            bit_mask = model.BitMask(mask = 0x0f))
+        )
+        session.add(model.Characteristic(name = "C{}".format(idx), longIdentifier = "", type = "CURVE", address = idx,
+            deposit = "RL{}".format(idx % 2), maxDiff = 0.0, conversion = "CM0", lowerLimit = 0.0, upperLimit = 100.0,
+            extended_limits = model.ExtendedLimits(lowerLimit = -1.0, upperLimit = 101.0),
+            axis_descr = [model.AxisDescr(attribute = "STD_AXIS", inputQuantity = "M0", conversion = "CM1",
+                maxAxisPoints = 8, lowerLimit = 0.0, upperLimit = 10.0)])
+        )
+    for idx in range(5):
+        session.add(model.CompuMethod(name = "CM{}".format(idx), longIdentifier = "", conversionType = "LINEAR",
+            format = "%4.1", unit = "", coeffs_linear = model.CoeffsLinear(a = 1.0, b = float(idx)))
+        )
+    for idx in range(2):
+        session.add(model.RecordLayout(name = "RL{}".format(idx), fnc_values = model.FncValues(position = 1,
+            datatype = "UWORD", indexMode = "ROW_DIR", addresstype = "DIRECT"))
+        )
+    session.commit()
+    session.close()
+    return session
+
+
+class QueryCounter:
+
+    def __init__(self, session):
+        self.count = 0
+        event.listen(session.get_bind(), "before_cursor_execute", self)
+
+    def __call__(self, *args):
+        self.count += 1
+
+
+def test_daq_profile(session):
+    counter = QueryCounter(session)
+    query = profiles.apply(session.query(model.Measurement), "daq").order_by(model.Measurement.rid)
+    result = [(m.ecu_address.address, m.byte_order.byteOrder, m.bit_mask.mask, m.compu_method.coeffs_linear.b) for m in query]
+    assert result[7] == (7, "MSB_LAST", 0x0f, 2.0)
+    assert len(result) == 50
+    assert counter.count <= 4
+
+
+def test_calibration_profile(session):
+    counter = QueryCounter(session)
+    query = profiles.apply(session.query(model.Characteristic), "calibration")
+    for chx in query:
+        assert chx.record_layout.fnc_values.datatype == "UWORD"
+        assert chx.extended_limits.upperLimit == 101.0
+        assert chx.axis_descr[0].compu_method.name == "CM1"
+        assert chx.compu_method.coeffs_linear.a == 1.0
+    assert counter.count <= 10
+
+
+def test_lazy_loading_is_default(session):
+    counter = QueryCounter(session)
+    for meas in session.query(model.Measurement):
+        meas.ecu_address.address
+    assert counter.count > 50
+
+
+def test_unknown_profile():
+    with pytest.raises(KeyError):
+        profiles.options(model.Measurement, "no_such_profile")
+    with pytest.raises(KeyError):
+        profiles.options(model.Unit, "daq")
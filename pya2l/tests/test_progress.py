@@ -0,0 +1,44 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import threading
+
+import pytest
+
+from pya2l import progress
+from pya2l.exceptions import ImportCancelled
+
+
+def test_throttling(monkeypatch):
+    clock = [100.0]
+    monkeypatch.setattr(progress.time, "monotonic", lambda: clock[0])
+    reports = []
+    monitor = progress.Monitor(reports.append, interval = 0.5)
+    monitor.update("lex", total_bytes = 1000)
+    for idx in range(10):
+        clock[0] += 0.25
+        monitor.update("lex", bytes_lexed = idx * 100, tokens = idx * 10)
+    monitor.update("lex", force = True, bytes_lexed = 1000, tokens = 100)
+    assert [r.bytes_lexed for r in reports] == [0, 100, 300, 500, 700, 900, 1000]
+    assert reports[-1] == progress.Progress("lex", 1000, 1000, 100, 0)
+
+
+def test_cancellation():
+    token = progress.CancellationToken()
+    monitor = progress.get(None, token)
+    assert monitor.active
+    monitor.update("parse", tokens = 1)
+    thread = threading.Thread(target = token.cancel)
+    thread.start()
+    thread.join()
+    assert token.cancelled
+    with pytest.raises(ImportCancelled):
+        monitor.update("parse", tokens = 2)
+    assert monitor.tokens == 1
+
+
+def test_inactive():
+    monitor = progress.get()
+    assert monitor is progress.NULL_MONITOR
+    assert not monitor.active
+    assert progress.get(monitor) is monitor
@@ -0,0 +1,54 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+from concurrent.futures import ThreadPoolExecutor
+import threading
+
+import pytest
+from sqlalchemy.exc import OperationalError
+
+import pya2l.model as model
+from pya2l.bench.concurrent_reads import populate
+
+
+@pytest.fixture
+def db(tmp_path):
+    db = model.A2LDatabase(str(tmp_path / "reads"))
+    populate(db, 100)
+    yield db
+    db.close()
+
+
+def test_read_sessions_are_thread_local(db):
+    sessions = {}
+
+    def worker(idx):
+        with db.read_session() as session:
+            sessions[threading.get_ident()] = session
+            meas = session.query(model.Measurement).filter(model.Measurement.name == "SIGNAL_{}".format(idx)).one()
+            return meas.ecu_address.address
+
+    with ThreadPoolExecutor(max_workers = 4) as executor:
+        addresses = list(executor.map(worker, range(100)))
+    assert addresses == [0x1000 + idx * 2 for idx in range(100)]
+    assert len(set(id(s) for s in sessions.values())) == len(sessions)
+
+
+def test_read_session_is_read_only(db):
+    with db.read_session() as session:
+        session.add(model.Measurement(name = "NEW", longIdentifier = "", datatype = "UBYTE", conversion = "NO_COMPU_METHOD",
+            resolution = 0, accuracy = 0.0, lowerLimit = 0.0, upperLimit = 255.0)
+        )
+        with pytest.raises(OperationalError):
+            session.commit()
+
+
+def test_read_session_sees_committed_data(db):
+    with db.read_session() as session:
+        assert session.query(model.Measurement).count() == 100
+
+
+def test_read_sessions_require_file_database():
+    db = model.A2LDatabase(":memory:")
+    with pytest.raises(ValueError):
+        db.create_read_sessions()
@@ -0,0 +1,66 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import pytest
+
+import pya2l.model as model
+from pya2l.tests.helpers import measurement
+
+
+@pytest.fixture
+def db():
+    db = model.A2LDatabase(":memory:")
+    session = db.session
+    session.add_all([
+        measurement("N", "CM.RPM"),
+        measurement("STATE", "CM.STATE"),
+        measurement("RAW", "NO_COMPU_METHOD"),
+        measurement("BROKEN", "CM.MISSING"),
+        model.CompuMethod(name = "CM.RPM", longIdentifier = "", conversionType = "IDENTICAL", format = "%6.2",
+            unit = "rpm"
+        ),
+        model.CompuMethod(name = "CM.STATE", longIdentifier = "", conversionType = "TAB_VERB", format = "%6.2",
+            unit = "", compu_tab_ref = model.CompuTabRef(conversionTable = "VT.STATE")
+        ),
+        model.CompuVtab(name = "VT.STATE", longIdentifier = "", conversionType = "TAB_VERB", numberValuePairs = 0),
+        model.RecordLayout(name = "RL.MAP"),
+        model.Characteristic(name = "KF", longIdentifier = "", type = "CURVE", address = 0, deposit = "RL.MAP",
+            maxDiff = 0.0, conversion = "CM.RPM", lowerLimit = 0.0, upperLimit = 1.0, axis_descr = [
+                model.AxisDescr(attribute = "STD_AXIS", inputQuantity = "N", conversion = "CM.RPM", maxAxisPoints = 8,
+                    lowerLimit = 0.0, upperLimit = 1.0),
+                model.AxisDescr(attribute = "STD_AXIS", inputQuantity = "GONE", conversion = "CM.RPM", maxAxisPoints = 8,
+                    lowerLimit = 0.0, upperLimit = 1.0),
+        ]),
+    ])
+    session.commit()
+    return db
+
+
+def test_resolve(db):
+    assert not db.references_resolved
+    dangling = db.resolve_references()
+    assert db.references_resolved
+    assert sorted((d.kind, d.name, d.attribute, d.reference) for d in dangling) == [
+        ("AXIS_DESCR", None, "inputQuantity", "GONE"),
+        ("MEASUREMENT", "BROKEN", "conversion", "CM.MISSING"),
+    ]
+    session = db.session
+    cm = session.query(model.CompuMethod).filter(model.CompuMethod.name == "CM.STATE").one()
+    vtab = session.query(model.CompuVtab).one()
+    state = session.query(model.Measurement).filter(model.Measurement.name == "STATE").one()
+    assert state.conversion_rid == cm.rid
+    assert cm.compu_tab_ref.compu_vtab_rid == vtab.rid
+    assert cm.compu_tab_ref.compu_tab_rid is None
+    kf = session.query(model.Characteristic).one()
+    assert kf.deposit_rid == session.query(model.RecordLayout).one().rid
+    n = session.query(model.Measurement).filter(model.Measurement.name == "N").one()
+    assert [axis.input_quantity_rid for axis in kf.axis_descr] == [n.rid, None]
+
+
+def test_integer_join(db):
+    db.resolve_references()
+    query = db.session.query(model.Measurement.name, model.CompuVtab.name).\
+        join(model.CompuMethod, model.CompuMethod.rid == model.Measurement.conversion_rid).\
+        join(model.CompuTabRef, model.CompuTabRef._compu_method_rid == model.CompuMethod.rid).\
+        join(model.CompuVtab, model.CompuVtab.rid == model.CompuTabRef.compu_vtab_rid)
+    assert query.all() == [("STATE", "VT.STATE")]
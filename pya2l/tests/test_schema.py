@@ -0,0 +1,142 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import os
+import sqlite3
+
+import pytest
+from sqlalchemy import exc
+
+from pya2l import exceptions
+import pya2l.model as model
+
+
+def sqlite_master(dbname, type_):
+    conn = sqlite3.connect(dbname)
+    result = {name for name, in conn.execute("SELECT name FROM sqlite_master WHERE type = ? AND name NOT LIKE 'sqlite_%'", (type_, ))}
+    conn.close()
+    return result
+
+
+def test_older_schema_gets_new_indices(tmpdir):
+    db = model.A2LDatabase(str(tmpdir.join("old_indices")))
+    db.close()
+    conn = sqlite3.connect(db.dbname)
+    conn.execute("UPDATE metadata SET schema_version = 10")
+    conn.execute("DROP INDEX ix_measurement_name")
+    conn.commit()
+    conn.close()
+    db = model.A2LDatabase(db.dbname)
+    assert db.schema_version == model.CURRENT_SCHEMA_VERSION
+    db.close()
+    assert "ix_measurement_name" in sqlite_master(db.dbname, "index")
+
+
+def test_older_schema_gets_new_columns(tmpdir):
+    db = model.A2LDatabase(str(tmpdir.join("old_columns")))
+    db.close()
+    conn = sqlite3.connect(db.dbname)
+    conn.execute("UPDATE metadata SET schema_version = 11")
+    conn.execute("ALTER TABLE measurement DROP COLUMN flat_ecu_address")
+    conn.commit()
+    conn.close()
+    db = model.A2LDatabase(db.dbname)
+    db.session.add(model.Measurement(name = "M", longIdentifier = "", datatype = "UWORD", conversion = "CM",
+        resolution = 0, accuracy = 0.0, lowerLimit = 0.0, upperLimit = 100.0, ecu_address = model.EcuAddress(address = 0x1000))
+    )
+    db.session.commit()
+    db.denormalize()
+    assert db.session.query(model.Measurement.flat_ecu_address).scalar() == 0x1000
+    db.close()
+
+
+def test_schema_script_matches_metadata(tmpdir):
+    db = model.A2LDatabase(str(tmpdir.join("new")))
+    db.close()
+    assert sqlite_master(db.dbname, "table") == set(model.Base.metadata.tables)
+    indices = {index.name for table in model.Base.metadata.tables.values() for index in table.indexes}
+    assert indices and sqlite_master(db.dbname, "index") >= indices
+
+
+def test_reopen(tmpdir):
+    dbname = str(tmpdir.join("reopen"))
+    model.A2LDatabase(dbname).close()
+    for _ in range(3):
+        db = model.A2LDatabase(dbname)
+        assert db.schema_version == model.CURRENT_SCHEMA_VERSION
+        assert db.session.query(model.MetaData).count() == 1
+        db.close()
+
+
+def test_older_schema_is_completed(tmpdir):
+    db = model.A2LDatabase(str(tmpdir.join("old")))
+    db.close()
+    conn = sqlite3.connect(db.dbname)
+    conn.execute("UPDATE metadata SET schema_version = 1")
+    conn.execute("DROP TABLE var_naming")
+    conn.commit()
+    conn.close()
+    db = model.A2LDatabase(db.dbname)
+    assert db.schema_version == model.CURRENT_SCHEMA_VERSION
+    assert db.session.query(model.MetaData).count() == 1
+    db.close()
+    assert "var_naming" in sqlite_master(db.dbname, "table")
+
+
+def test_upgrade_runs_once(tmpdir, monkeypatch):
+    db = model.A2LDatabase(str(tmpdir.join("upgraded")))
+    db.close()
+    conn = sqlite3.connect(db.dbname)
+    conn.execute("UPDATE metadata SET schema_version = 11")
+    conn.commit()
+    conn.close()
+    upgrades = []
+    upgrade = model.A2LDatabase._upgrade_schema
+    monkeypatch.setattr(model.A2LDatabase, "_upgrade_schema", lambda self: upgrades.append(upgrade(self)))
+    for _ in range(2):
+        model.A2LDatabase(db.dbname).close()
+    assert len(upgrades) == 1
+
+
+def test_older_schema_gets_source_hash(tmpdir):
+    db = model.A2LDatabase(str(tmpdir.join("old_source_hash")))
+    db.close()
+    conn = sqlite3.connect(db.dbname)
+    conn.execute("UPDATE metadata SET schema_version = 12")
+    conn.execute("ALTER TABLE metadata DROP COLUMN source_hash")
+    conn.commit()
+    conn.close()
+    db = model.A2LDatabase(db.dbname)
+    assert db.source_hash is None
+    db.source_hash = "0" * 64
+    assert db.source_hash == "0" * 64
+    db.close()
+
+
+def test_read_only(tmpdir):
+    dbname = str(tmpdir.join("read_only.a2ldb"))
+    model.A2LDatabase(dbname).close()
+    mtime = os.path.getmtime(dbname)
+    first, second = model.A2LDatabase(dbname, read_only = True), model.A2LDatabase(dbname, read_only = True)
+    assert first.schema_version == model.CURRENT_SCHEMA_VERSION
+    assert first.session.query(model.MetaData).count() == second.session.query(model.MetaData).count() == 1
+    first.session.add(model.MetaData(schema_version = 0))
+    with pytest.raises(exc.OperationalError):
+        first.session.commit()
+    first.close()
+    second.close()
+    assert os.path.getmtime(dbname) == mtime
+
+
+def test_read_only_refuses_upgrade(tmpdir):
+    db = model.A2LDatabase(str(tmpdir.join("read_only_old")))
+    db.close()
+    conn = sqlite3.connect(db.dbname)
+    conn.execute("UPDATE metadata SET schema_version = 11")
+    conn.commit()
+    conn.close()
+    with pytest.raises(exceptions.SchemaVersionError):
+        model.A2LDatabase(db.dbname, read_only = True)
+    conn = sqlite3.connect(db.dbname)
+    assert conn.execute("SELECT schema_version FROM metadata").fetchall() == [(11, )]
+    conn.close()
@@ -0,0 +1,79 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import pytest
+
+from pya2l import exceptions
+import pya2l.model as model
+from pya2l.model import search
+
+
+@pytest.fixture
+def session():
+    db = model.A2LDatabase(":memory:")
+    session = db.session
+    session.add(model.Measurement(name = "BOOST_PRESSURE_ACT", longIdentifier = "actual boost pressure", datatype = "UWORD",
+        conversion = "CM", resolution = 0, accuracy = 0.0, lowerLimit = 0.0, upperLimit = 4000.0)
+    )
+    session.add(model.Measurement(name = "ENGINE_SPEED", longIdentifier = "crankshaft speed", datatype = "UWORD",
+        conversion = "CM", resolution = 0, accuracy = 0.0, lowerLimit = 0.0, upperLimit = 8000.0,
+        display_identifier = model.DisplayIdentifier(display_name = "nmot"),
+        annotation = [model.Annotation(annotation_text = model.AnnotationText(text = ["filtered, see", "boost control"]))])
+    )
+    session.add(model.Characteristic(name = "KL_LADEDRUCK", longIdentifier = "boost pressure setpoint", type = "MAP",
+        address = 0, deposit = "RL", maxDiff = 0.0, conversion = "CM", lowerLimit = 0.0, upperLimit = 4000.0)
+    )
+    session.add(model.Group(groupName = "AIR_SYSTEM", groupLongIdentifier = "air path and boost"))
+    session.commit()
+    return session
+
+
+@pytest.fixture
+def indexed(session):
+    search.build_index(session)
+    return session
+
+
+def test_index(indexed):
+    assert search.has_index(indexed)
+    result = search.search(indexed, "boost pressure")
+    assert {(r.kind, r.name) for r in result} == {("MEASUREMENT", "BOOST_PRESSURE_ACT"), ("CHARACTERISTIC", "KL_LADEDRUCK")}
+    # Name matches rank higher.
+    assert result[0].name == "BOOST_PRESSURE_ACT"
+
+
+def test_without_index(session):
+    result = search.search(session, "boost pressure")
+    assert not search.has_index(session)
+    assert [(r.kind, r.name) for r in result] == [("MEASUREMENT", "BOOST_PRESSURE_ACT"), ("CHARACTERISTIC", "KL_LADEDRUCK")]
+    assert [r.name for r in search.search(session, "nmot")] == [r.name for r in search.search(session, "CONTROL")] == ["ENGINE_SPEED"]
+    assert [r.kind for r in search.search(session, "boo*", kinds = ("GROUP", ))] == ["GROUP"]
+    assert search.search(session, "boost_pressure-") == result[ : 1]
+    assert search.search(session, "%") == []
+    with pytest.raises(exceptions.StructuralError):
+        search.search(session, "boost NOT setpoint", raw = True)
+    assert not search.has_index(session)
+
+
+def test_display_identifier_and_annotation(indexed):
+    session = indexed
+    assert [r.name for r in search.search(session, "nmot")] == ["ENGINE_SPEED"]
+    result = search.search(session, "control")
+    assert [r.name for r in result] == ["ENGINE_SPEED"]
+    assert "[control]" in result[0].snippet
+
+
+def test_kinds_and_prefix(indexed):
+    session = indexed
+    result = search.search(session, "boo*", kinds = ("GROUP", "CHARACTERISTIC"))
+    assert {r.kind for r in result} == {"GROUP", "CHARACTERISTIC"}
+    hit = result[0]
+    assert session.query(search.KINDS[hit.kind]).get(hit.rid) is not None
+
+
+def test_special_characters(indexed):
+    session = indexed
+    # Quoted as phrase, not taken as column filter or NOT operator.
+    assert len(search.search(session, "boost-pressure.")) == 2
+    assert search.search(session, "") == []
+    assert len(search.search(session, "boost NOT setpoint", raw = True)) == 3
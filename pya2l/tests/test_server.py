@@ -0,0 +1,107 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import os
+import sqlite3
+import threading
+
+import pytest
+
+import pya2l.model as model
+from pya2l import server
+from pya2l.model import search
+
+
+@pytest.fixture
+def dbname(tmpdir):
+    name = str(tmpdir.join("hot.a2ldb"))
+    db = model.A2LDatabase(name)
+    db.session.add(model.Measurement(name = "ENGINE_SPEED", longIdentifier = "crankshaft speed", datatype = "UWORD",
+        conversion = "CM.LINEAR", resolution = 0, accuracy = 0.0, lowerLimit = 0.0, upperLimit = 8000.0)
+    )
+    db.session.add(model.CompuMethod(name = "CM.LINEAR", longIdentifier = "", conversionType = "LINEAR",
+        format = "%6.2", unit = "rpm", coeffs_linear = model.CoeffsLinear(a = 2.0, b = 1.0))
+    )
+    db.session.commit()
+    db.close()
+    return name
+
+
+@pytest.fixture(params = ["tcp", "unix"])
+def client(request, tmpdir):
+    if request.param == "tcp":
+        srv = server.Server(port = 0, capacity = 1)
+        address = "{}:{}".format(*srv.server_address[ : 2])
+    else:
+        address = str(tmpdir.join("pya2l.sock"))
+        srv = server.UnixServer(address, capacity = 1)
+    thread = threading.Thread(target = srv.serve_forever)
+    thread.start()
+    client = server.Client(address, timeout = 10)
+    yield client
+    client.close()
+    srv.shutdown()
+    srv.server_close()
+    thread.join()
+
+
+def test_queries(client, dbname):
+    meas = client.lookup(dbname, "measurement", "ENGINE_SPEED")
+    assert meas["longIdentifier"] == "crankshaft speed"
+    assert client.convert(dbname, meas["conversion"], 10) == 21.0
+    assert client.convert(dbname, meas["conversion"], 21, inverse = True) == pytest.approx(10.0)
+    assert [hit["name"] for hit in client.search(dbname, "crankshaft")] == ["ENGINE_SPEED"]
+    db = model.A2LDatabase(dbname)
+    assert not search.has_index(db.session)     # Searched without index, not built by the server.
+    db.close()
+    assert client.info(dbname)["elements"]["COMPU_METHOD"] == 1
+    assert client.databases() == [dbname]
+    with pytest.raises(server.RequestError) as e:
+        client.lookup(dbname, "MEASUREMENT", "MISSING")
+    assert e.value.status == 404
+    with pytest.raises(server.RequestError):
+        client.info(dbname + ".missing")
+
+
+def test_lru_and_reload(dbname, tmpdir):
+    other = str(tmpdir.join("other.a2ldb"))
+    model.A2LDatabase(other).close()
+    cache = server.DatabaseCache(capacity = 1)
+    with cache.get(dbname) as database:
+        assert database.lookup("MEASUREMENT", "ENGINE_SPEED") is not None
+        with cache.get(other):
+            pass
+        # Evicted, but still usable until released.
+        assert cache.names() == [other]
+        assert database.convert("CM.LINEAR", 1.0) == 3.0
+    with cache.get(other) as first:
+        pass
+    os.utime(other, (0, 0))
+    with cache.get(other) as second:
+        assert second is not first
+    cache.close()
+
+
+def test_opened_read_only(dbname):
+    mtime = os.stat(dbname).st_mtime
+    cache = server.DatabaseCache()
+    with cache.get(dbname) as database:
+        assert database.convert("CM.LINEAR", 1.0) == 3.0
+        other = model.A2LDatabase(dbname, read_only = True)     # Not locked.
+        assert other.session.query(model.CompuMethod).count() == 1
+        other.close()
+    cache.close()
+    assert os.stat(dbname).st_mtime == mtime
+
+
+def test_outdated_schema(dbname):
+    conn = sqlite3.connect(dbname)
+    conn.execute("UPDATE metadata SET schema_version = 11")
+    conn.commit()
+    conn.close()
+    cache = server.DatabaseCache()
+    with pytest.raises(server.RequestError) as e:
+        with cache.get(dbname):
+            pass
+    assert e.value.status == 409
+    cache.close()
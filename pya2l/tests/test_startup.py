@@ -0,0 +1,20 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+from pya2l.bench import startup
+
+HEAVY = {"sqlalchemy", "numpy", "scipy", "antlr4", "pya2l.model", "pya2l.a2l_listener"}
+
+
+def test_import_pya2l_is_lightweight():
+    assert not startup.loaded_modules("import pya2l") & HEAVY
+
+
+def test_lazy_submodules():
+    modules = startup.loaded_modules("import pya2l; pya2l.model.A2LDatabase")
+    assert "sqlalchemy" in modules
+    assert "pya2l.a2l_listener" not in modules
+
+
+def test_scipy_is_deferred():
+    assert "scipy" not in startup.loaded_modules("import pya2l.functions")
@@ -0,0 +1,74 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import pytest
+
+from pya2l import exceptions
+import pya2l.model as model
+from pya2l.model import units
+
+
+def unit(name, exponents = None, ref_unit = None, conversion = None):
+    result = model.Unit(name = name, longIdentifier = "", display = name, type = "DERIVED" if ref_unit else "EXTENDED_SI")
+    if exponents:
+        result.si_exponents = model.SiExponents(**dict(zip(units.EXPONENTS, exponents)))
+    if ref_unit:
+        result.ref_unit = model.RefUnit(unit = ref_unit)
+    if conversion:
+        result.unit_conversion = model.UnitConversion(gradient = conversion[0], offset = conversion[1])
+    return result
+
+
+@pytest.fixture
+def db():
+    db = model.A2LDatabase(":memory:")
+    compu_method = model.CompuMethod(name = "CM.TEMP", longIdentifier = "", conversionType = "IDENTICAL", format = "%4.1", unit = "")
+    compu_method.ref_unit = model.RefUnit(unit = "degC")
+    db.session.add(model.Module(name = "ECU", longIdentifier = "", compu_method = [compu_method], unit = [
+        unit("K", exponents = units.TEMPERATURE),
+        unit("degC", ref_unit = "K", conversion = (1.0, -273.15)),
+        unit("degF", ref_unit = "degC", conversion = (1.8, 32.0)),
+        unit("m/s", exponents = units.LENGTH / units.TIME),
+        unit("km/h", ref_unit = "m/s", conversion = (3.6, 0.0)),
+        unit("A", ref_unit = "B"),
+        unit("B", ref_unit = "A"),
+        unit("C", ref_unit = "D"),
+    ]))
+    db.session.commit()
+    yield db
+    db.close()
+
+
+def test_convert(db):
+    u = units.for_database(db)
+    assert units.for_database(db) is u
+    assert u.dimension("degF") == units.TEMPERATURE and str(u.dimension("km/h")) == "m s^-1"
+    assert u.convert(32.0, "degF", "K") == pytest.approx(273.15)
+    assert u.convert(212.0, "degF", "degC") == pytest.approx(100.0)
+    assert list(u.convert([0.0, 36.0], "km/h", "m/s")) == pytest.approx([0.0, 10.0])
+    assert u.converter("degC", "degF") == pytest.approx((1.8, 32.0))
+    assert u.compatible("degC", "degF") and not u.compatible("degC", "km/h") and not u.compatible("A", "A")
+    assert u.units_of(units.TEMPERATURE) == ["K", "degC", "degF"]
+    assert u.unit_of_conversion("CM.TEMP") == "degC"
+    with pytest.raises(exceptions.MathError):
+        u.convert(1.0, "degC", "km/h")
+
+
+def test_vectorized(db):
+    np = pytest.importorskip("numpy")
+    result = units.for_database(db).convert(np.array([[0.0, 100.0], [-40.0, 37.0]]), "degC", "degF")
+    assert result.shape == (2, 2)
+    assert np.allclose(result, [[32.0, 212.0], [-40.0, 98.6]])
+
+
+def test_problems(db):
+    u = units.build(db.session)
+    assert u.problems() == {
+        "A": "circular REF_UNIT chain of 'A'.",
+        "B": "circular REF_UNIT chain of 'A'.",
+        "C": "unknown unit 'D'.",
+    }
+    with pytest.raises(exceptions.StructuralError, match = "unknown unit 'D'"):
+        u.canonical("C")
+    with pytest.raises(exceptions.StructuralError):
+        u.canonical("N")
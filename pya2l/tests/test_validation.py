@@ -0,0 +1,117 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+from functools import partial
+
+import pytest
+
+import pya2l.model as model
+from pya2l.model import validation
+from pya2l.tests import helpers
+
+
+measurement = partial(helpers.measurement, conversion = "CM.IDENT", datatype = "UBYTE", upper = 255.0)
+
+
+def characteristic(name, type_ = "VALUE", deposit = "RL.VALUE", address = 0, **kws):
+    return model.Characteristic(name = name, longIdentifier = "", type = type_, address = address, deposit = deposit,
+        maxDiff = 0.0, conversion = "CM.IDENT", lowerLimit = 0.0, upperLimit = 100.0, **kws
+    )
+
+
+def axis(attribute, conversion = "CM.IDENT", **kws):
+    return model.AxisDescr(attribute = attribute, inputQuantity = "N", conversion = conversion, maxAxisPoints = 8,
+        lowerLimit = 0.0, upperLimit = 100.0, **kws
+    )
+
+
+def elements():
+    return [
+        model.CompuMethod(name = "CM.IDENT", longIdentifier = "", conversionType = "IDENTICAL", format = "%6.2", unit = ""),
+        model.RecordLayout(name = "RL.VALUE", fnc_values = model.FncValues(position = 1, datatype = "UBYTE",
+            indexMode = "ROW_DIR", addresstype = "DIRECT")
+        ),
+        model.RecordLayout(name = "RL.EMPTY"),
+        measurement("N"),
+        measurement("N"),
+        measurement("WIDE", upper = 300.0),
+        measurement("SCALED", conversion = "CM.MISSING", upper = 300.0),
+        measurement("ARRAY", array_size = model.ArraySize(number = 6), matrix_dim = model.MatrixDim(xDim = 2, yDim = 3, zDim = 0)),
+        characteristic("AXIS", type_ = "CURVE", axis_descr = [axis("STD_AXIS")]),
+        characteristic("BLOCK", type_ = "VAL_BLK", number = model.Number(number = 4),
+            matrix_dim = model.MatrixDim(xDim = 2, yDim = 3, zDim = 1)
+        ),
+        characteristic("NO_DIM", type_ = "VAL_BLK"),
+        characteristic("NO_LAYOUT", deposit = "RL.MISSING"),
+        characteristic("NO_VALUES", deposit = "RL.EMPTY", address = 0x1ffffffff),
+        characteristic("AXES", type_ = "MAP", axis_descr = [
+            axis("CURVE_AXIS", curve_axis_ref = model.CurveAxisRef(curveAxis = "BLOCK")),
+            axis("COM_AXIS"),
+            axis("FIX_AXIS", conversion = "NO_COMPU_METHOD", curve_axis_ref = model.CurveAxisRef(curveAxis = "AXIS")),
+        ]),
+    ]
+
+
+def issues(report):
+    return sorted((f.rule, f.severity, f.kind, f.name, f.message) for f in report.findings)
+
+
+@pytest.fixture(params = [":memory:", "file"])
+def db(request, tmpdir):
+    db = model.A2LDatabase(request.param if request.param == ":memory:" else str(tmpdir.join("checked.a2ldb")))
+    db.session.add_all(elements())
+    db.session.commit()
+    yield db
+    db.close()
+
+
+def test_rules(db):
+    report = validation.validate(db)
+    assert list(report.timings) == list(validation.RULES)
+    assert not report.ok
+    assert issues(report) == [
+        ("axis-descriptions", "error", "AXIS_DESCR", "AXES", "COM_AXIS without AXIS_PTS_REF."),
+        ("axis-descriptions", "error", "AXIS_DESCR", "AXES",
+            "CURVE_AXIS have no input conversion, use 'NO_COMPU_METHOD' for argument 'conversion'."),
+        ("axis-descriptions", "error", "AXIS_DESCR", "AXES", "CURVE_AXIS_REF 'BLOCK' is no CURVE characteristic."),
+        ("axis-descriptions", "error", "AXIS_DESCR", "AXES",
+            "FIX_AXIS without FIX_AXIS_PAR, FIX_AXIS_PAR_DIST or FIX_AXIS_PAR_LIST."),
+        ("axis-descriptions", "warning", "AXIS_DESCR", "AXES", "CURVE_AXIS_REF ignored, axis is no CURVE_AXIS."),
+        ("duplicate-names", "error", "MEASUREMENT", "N", "'N' is defined 2 times in the data namespace."),
+        ("duplicate-names", "error", "MEASUREMENT", "N", "'N' is defined 2 times in the data namespace."),
+        ("limits", "error", "CHARACTERISTIC", "NO_VALUES", "address 8589934591 not in [0, 4294967295]."),
+        ("limits", "error", "MEASUREMENT", "WIDE", "limits [0.0, 300.0] exceed range of UBYTE."),
+        ("number-matrix-dim", "error", "CHARACTERISTIC", "BLOCK", "NUMBER 4 contradicts MATRIX_DIM 2 3 1."),
+        ("number-matrix-dim", "error", "CHARACTERISTIC", "NO_DIM", "VAL_BLK without NUMBER or MATRIX_DIM."),
+        ("record-layouts", "error", "CHARACTERISTIC", "NO_LAYOUT", "RECORD_LAYOUT 'RL.MISSING' not found."),
+        ("record-layouts", "error", "CHARACTERISTIC", "NO_VALUES", "RECORD_LAYOUT 'RL.EMPTY' has no FNC_VALUES."),
+        ("unresolved-references", "error", "MEASUREMENT", "SCALED", "conversion 'CM.MISSING' not found."),
+    ]
+    assert report.as_dict()["rules"]["duplicate-names"]["findings"] == 2
+
+
+def test_selected_rules(db):
+    report = validation.validate(db, rules = ["record-layouts"], jobs = 1)
+    assert list(report.counts().items()) == [("record-layouts", 2)]
+    with pytest.raises(KeyError):
+        validation.validate(db, rules = ["no-such-rule"])
+
+
+def test_session_untouched(db):
+    pending = measurement("PENDING", upper = 300.0)
+    db.session.add(pending)
+    report = validation.validate(db, rules = ["limits"])
+    assert [f.name for f in report.findings] == ["WIDE", "NO_VALUES"]
+    assert pending in db.session.new
+    db.session.rollback()
+    assert db.session.query(model.Measurement).filter(model.Measurement.name == "PENDING").count() == 0
+
+
+def test_flushed_in_memory():
+    db = model.A2LDatabase(":memory:")
+    db.session.add_all(elements())
+    db.session.flush()
+    assert not validation.validate(db).ok
+    db.session.rollback()   # Nothing committed.
+    assert db.session.query(model.Measurement).count() == 0
+    db.close()
@@ -0,0 +1,92 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import itertools
+
+import pytest
+
+import pya2l.model as model
+from pya2l.model import variants
+
+
+def forbidden(*pairs):
+    comb = model.VarForbiddenComb()
+    comb.pairs = [model.VarForbiddedCombPair(criterionName = name, criterionValue = value) for name, value in pairs]
+    return comb
+
+
+@pytest.fixture
+def db():
+    coding = model.VariantCoding()
+    coding.var_criterion = [
+        model.VarCriterion(name = "Car", longIdentifier = "Car body", value = ["Limousine", "Kombi", "Cabrio"]),
+        model.VarCriterion(name = "Gear", longIdentifier = "Gear box", value = ["Manual", "Automatic"]),
+    ]
+    coding.var_criterion[0].var_measurement = model.VarMeasurement(name = "S_CAR")
+    coding.var_forbidden_comb = [forbidden(("Car", "Limousine"), ("Gear", "Manual")), forbidden(("Car", "Cabrio"), ("Gear", "Automatic"))]
+    nllm = model.VarCharacteristic(name = "NLLM", criterionName = ["Gear", "Car"])
+    nllm.var_address = model.VarAddress(address = [0x8840, 0x8858, 0x8870, 0x8888])
+    pumkf = model.VarCharacteristic(name = "PUMKF", criterionName = ["Car"])
+    pumkf.var_address = model.VarAddress(address = [0x9000, 0x9010])
+    coding.var_characteristic = [nllm, pumkf]
+    coding.var_naming = model.VarNaming(tag = "APLHA")
+    db = model.A2LDatabase(":memory:")
+    db.session.add(model.Module(name = "ECU", longIdentifier = "", variant_coding = coding))
+    db.session.commit()
+    yield db
+    db.close()
+
+
+def test_coding(db):
+    coding = variants.for_database(db)
+    assert variants.for_database(db) is coding
+    assert coding.criteria["Car"] == variants.Criterion("Car", "Car body", ("Limousine", "Kombi", "Cabrio"), "S_CAR", None)
+    assert list(coding.space.combinations()) == [("Limousine", "Automatic"), ("Kombi", "Manual"), ("Kombi", "Automatic"),
+        ("Cabrio", "Manual")
+    ]
+    assert coding.variants("NLLM") == [
+        variants.Variant("NLLM.A", ("Manual", "Kombi"), 0x8840),
+        variants.Variant("NLLM.B", ("Manual", "Cabrio"), 0x8858),
+        variants.Variant("NLLM.C", ("Automatic", "Limousine"), 0x8870),
+        variants.Variant("NLLM.D", ("Automatic", "Kombi"), 0x8888),
+    ]
+    assert coding.variants("NLLM") is coding.variants("NLLM")
+    resolved = coding.resolve({"Car": "Kombi", "Gear": "Automatic"})
+    assert resolved["NLLM"] == variants.Variant("NLLM.D", ("Automatic", "Kombi"), 0x8888)
+    assert resolved["PUMKF"] == variants.Variant("PUMKF.B", ("Kombi", ), 0x9010)
+    assert coding.mismatches() == [("PUMKF", 2, 3)]
+    with pytest.raises(ValueError, match = "forbidden combination"):
+        coding.resolve({"Car": "Cabrio", "Gear": "Automatic"})
+    with pytest.raises(KeyError):
+        coding.variants("N")
+    assert variants.build(db.session, "OTHER").space.count() == 1
+
+
+def test_space():
+    criteria = [variants.Criterion("C{}".format(idx), "", tuple("abcd"[ : size]), None, None)
+        for idx, size in enumerate((3, 1, 4, 2))
+    ]
+    forbidden = [[("C0", "a"), ("C2", "c")], [("C3", "b")], [("C1", "a"), ("C2", "b"), ("C0", "c")], [("C9", "a")], [("C0", "z")]]
+    space = variants.Space(criteria, forbidden)
+    assert len(space.forbidden) == 3
+    expected = [combination for combination in itertools.product(*(criterion.values for criterion in criteria))
+        if not any(all(combination[int(name[1 : ])] == value for name, value in pairs) for pairs in forbidden[ : 3])
+    ]
+    assert list(space.combinations()) == expected and space.count() == len(expected)
+    assert [space.index(combination) for combination in expected] == list(range(len(expected)))
+    assert [space.combination(idx) for idx in range(len(expected))] == expected
+    assert not space.is_valid(("a", "a", "c", "a"))
+    with pytest.raises(ValueError):
+        space.index(("a", "a", "a", "b"))
+
+
+def test_many_criteria():
+    criteria = [variants.Criterion("C{}".format(idx), "", ("x", "y", "z"), None, None) for idx in range(16)]
+    # A chain of exclusions: C[i] == "z" forbids C[i + 1] == "z".
+    space = variants.Space(criteria, [[("C{}".format(idx), "z"), ("C{}".format(idx + 1), "z")] for idx in range(15)])
+    counts = [2, 1]     # Valid sequences ending with "x"/"y" and with "z".
+    for _ in range(15):
+        counts = [2 * (counts[0] + counts[1]), counts[0]]
+    assert space.count() == sum(counts)
+    last = space.combination(space.count() - 1)
+    assert last == ("z", "y") * 8 and space.index(last) == space.count() - 1
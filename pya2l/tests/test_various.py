@@ -54,5 +54,12 @@ def test_filename_with_arbitrary_ext():
     assert db._dbfn == r'example-a2l-file.a2ldb'
     assert db._a2lfn == r'example-a2l-file.foobar'
 
+def test_filename_keeps_a2l_ext_case():
+    db = DB()
+    db._set_path_components("ECU.A2L")
+
+    assert db._dbfn == "ECU.a2ldb"
+    assert db._a2lfn == "ECU.A2L"
+
 def test_cse_units():
     assert CSE.get(2) == CSE_Type(2, "100 sec", Referer.TIME, "")
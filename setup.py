@@ -2,11 +2,10 @@
 # pylint: disable=C0111
 import distutils.cmd
 import distutils.log
-from distutils.core import setup
 import os
 from glob import glob
 import subprocess
-from setuptools import find_packages
+from setuptools import find_packages, setup
 import setuptools.command.build_py
 import setuptools.command.develop
 
@@ -131,6 +130,11 @@ setup(
         "develop": CustomDevelop,
     },
     packages=find_packages(),
+    entry_points={
+        "console_scripts": [
+            "pya2l = pya2l.cli:main",
+        ],
+    },
     install_requires=INSTALL_REQS,
     tests_require=["pytest", "pytest-runner"],
     test_suite="pya2l.tests",